@@ -1,49 +1,754 @@
-
+import logging
 import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from sqlalchemy import case, distinct, func
 from sqlalchemy.orm import Session
 from . import models
+from .cache import cached
 from .config import settings
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
 # --- Data Analysis for Job Technologies ---
 
 # Use centralized configuration
 TECHNOLOGIES = settings.TECHNOLOGIES
 
-def analyze_technology_demand(db: Session):
+
+class TechnologyMatcher:
+    """
+    Finds every known technology in a text with a single regex scan.
+
+    All technologies are compiled into one alternation (longest first, so
+    'JavaScript' wins over 'Java'). Boundaries are lookarounds on word
+    characters instead of `\\b`, which lets tokens that start or end with
+    punctuation such as 'C#', 'C++', 'ASP.NET' or 'Node.js' match while
+    still rejecting substrings (e.g. 'Go' in 'Google').
+    """
+
+    def __init__(self, technologies: Iterable[str]):
+        self.technologies = list(technologies)
+        self._canonical = {tech.lower(): tech for tech in self.technologies}
+        alternatives = sorted(self._canonical, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<!\w)(' + '|'.join(re.escape(alt) for alt in alternatives) + r')(?!\w)'
+        )
+
+    def match(self, text: str) -> Set[str]:
+        """Returns the set of technologies mentioned in `text`."""
+        if not text:
+            return set()
+        return {self._canonical[token] for token in self._pattern.findall(text.lower())}
+
+    def count(self, texts: Iterable[str]) -> Counter:
+        """Counts, per technology, how many of `texts` mention it."""
+        counts: Counter = Counter()
+        for text in texts:
+            counts.update(self.match(text))
+        return counts
+
+
+# Built once at import time and shared by every request.
+TECHNOLOGY_MATCHER = TechnologyMatcher(TECHNOLOGIES)
+
+# --- Experience level classification ---
+
+EXPERIENCE_LEVELS = ("junior", "mid", "senior")
+JUNIOR_KEYWORDS = ("junior", "jr", "entry", "trainee", "intern")
+SENIOR_KEYWORDS = ("senior", "sr", "lead", "principal", "architect")
+
+
+def classify_experience_level(title: Optional[str]) -> str:
+    """
+    Classifies a job title as 'junior', 'mid' or 'senior'.
+
+    Senior keywords take precedence; titles without any keyword are 'mid'.
+    """
+    title_lower = (title or "").lower()
+    if any(keyword in title_lower for keyword in SENIOR_KEYWORDS):
+        return "senior"
+    if any(keyword in title_lower for keyword in JUNIOR_KEYWORDS):
+        return "junior"
+    return "mid"
+
+
+# --- Salary extraction ---
+
+# Monthly COP amounts outside this range are treated as parsing noise
+MIN_MONTHLY_SALARY = 300_000
+MAX_MONTHLY_SALARY = 100_000_000
+
+_AMOUNT_PATTERN = re.compile(
+    r'(\$|cop|col\$)?\s*'
+    r"(\d{1,3}(?:[.,'’]\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d+)?)"
+    r'\s*(millones|millon|mill|mm|m|mil|k)?(?![a-z])'
+)
+_UNIT_MULTIPLIERS = {"millones": 1e6, "millon": 1e6, "mill": 1e6, "mm": 1e6, "m": 1e6, "mil": 1e3, "k": 1e3}
+# 'anual(es)', '/año', 'al año', 'por año' (accents are stripped before matching)
+_YEARLY_PATTERN = re.compile(r'(\b(anual(es)?|annual|yearly|per year)|(\bal|\bpor|/)\s*ano)\b')
+_SALARY_KEYWORDS = re.compile(r'\b(salario|sueldo|remuneracion|asignacion salarial)\b')
+
+
+def _normalize_text(text: str) -> str:
+    """Lowercases `text` and strips accents ('Bogotá' -> 'bogota')."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _parse_number(token: str) -> float:
+    """Parses '2.500.000,00', "3'000.000", '2,500,000', '2,5' or '2.5' into a float."""
+    # Colombian apostrophe for millions: 3'000.000
+    token = re.sub(r"['’]", '.', token)
+    if re.fullmatch(r'\d{1,3}(\.\d{3})+(,\d{1,2})?', token):
+        return float(token.replace('.', '').replace(',', '.'))
+    if re.fullmatch(r'\d{1,3}(,\d{3})+(\.\d{1,2})?', token):
+        return float(token.replace(',', ''))
+    return float(token.replace(',', '.'))
+
+
+def parse_salary(text: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parses a Colombian salary text into a monthly (min, max) range in COP.
+
+    Handles formats such as '$ 2.500.000,00 (Mensual)', '3 a 4 millones',
+    'entre 4,5 y 6 millones', 'COP 60.000.000 anual', "$ 3'000.000" or
+    '$4M'. Yearly
+    amounts are converted to monthly. Returns None when no plausible salary
+    is found (e.g. 'A convenir').
+    """
+    if not text:
+        return None
+    normalized = _normalize_text(text)
+
+    amounts = []
+    for match in _AMOUNT_PATTERN.finditer(normalized):
+        currency, number, unit = match.groups()
+        amounts.append([_parse_number(number), _UNIT_MULTIPLIERS.get(unit, 1), bool(currency or unit)])
+        if len(amounts) == 2:
+            break
+
+    # '3 a 4 millones': the unit of the upper bound applies to the lower one
+    if len(amounts) == 2 and amounts[0][1] == 1 and amounts[1][1] > 1 and amounts[0][0] < 1000:
+        amounts[0][1:] = [amounts[1][1], True]
+
+    divisor = 12 if _YEARLY_PATTERN.search(normalized) else 1
+    values = [
+        value * multiplier / divisor
+        for value, multiplier, explicit in amounts
+        if explicit or value * multiplier >= MIN_MONTHLY_SALARY
+    ]
+    values = [int(round(v)) for v in values if MIN_MONTHLY_SALARY <= v <= MAX_MONTHLY_SALARY]
+    if not values:
+        return None
+    return min(values), max(values)
+
+
+def extract_salary_from_description(description: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Looks for a salary right after a salary keyword ('salario', 'sueldo', ...)
+    in a free-text description.
+    """
+    if not description:
+        return None
+    normalized = _normalize_text(description)
+    for match in _SALARY_KEYWORDS.finditer(normalized):
+        salary = parse_salary(normalized[match.end():match.end() + 80])
+        if salary:
+            return salary
+    return None
+
+# --- Parallel counting across worker processes ---
+
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pools_lock = threading.Lock()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Returns a process pool with `workers` processes, created on first use."""
+    with _process_pools_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _process_pools[workers] = pool
+        return pool
+
+
+def shutdown_process_pools():
+    """Stops the worker processes of every pool (on application shutdown)."""
+    with _process_pools_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
+def _count_chunk(descriptions: List[str]) -> Counter:
+    """Worker entry point: counts technologies in one chunk of descriptions."""
+    return TECHNOLOGY_MATCHER.count(descriptions)
+
+
+def _parallel_count(chunks: Iterable[List[str]], workers: int) -> Counter:
+    """
+    Counts technologies over `chunks` on a process pool and merges the results.
+
+    At most two chunks per worker are in flight, so a streamed corpus is
+    never fully materialized.
+    """
+    pool = _get_process_pool(workers)
+    counts: Counter = Counter()
+    pending = set()
+    for chunk in chunks:
+        pending.add(pool.submit(_count_chunk, chunk))
+        if len(pending) >= workers * 2:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                counts.update(future.result())
+    for future in pending:
+        counts.update(future.result())
+    return counts
+
+
+def _use_parallel(corpus_size: int, workers: int) -> bool:
+    return workers > 1 and corpus_size >= settings.PARALLEL_ANALYSIS_THRESHOLD
+
+
+def count_technologies(descriptions: List[str], workers: Optional[int] = None) -> Counter:
+    """
+    Counts, per technology, how many descriptions mention it.
+
+    Corpora of at least `settings.PARALLEL_ANALYSIS_THRESHOLD` descriptions
+    are split across `workers` processes (default `settings.ANALYZER_WORKERS`);
+    smaller ones are scanned in-process. Both paths return identical counts.
+    """
+    workers = settings.ANALYZER_WORKERS if workers is None else workers
+    if not _use_parallel(len(descriptions), workers):
+        return TECHNOLOGY_MATCHER.count(descriptions)
+
+    # A few chunks per worker keeps the pool busy if chunks are uneven
+    size = -(-len(descriptions) // (workers * 4))
+    chunks = (descriptions[i:i + size] for i in range(0, len(descriptions), size))
+    return _parallel_count(chunks, workers)
+
+
+def rank_technology_counts(counts: Dict[str, int], total_offers: Optional[int] = None) -> List[dict]:
+    """
+    Turns per-technology counts into the API result format,
+    sorted by count in descending order.
+
+    Args:
+        counts: Number of offers mentioning each technology.
+        total_offers: If given, each result also carries the percentage of offers.
+    """
+    results = []
+    for tech in TECHNOLOGIES:
+        count = int(counts.get(tech, 0))
+        if count > 0:
+            result = {"technology": tech, "count": count}
+            if total_offers:
+                result["percentage"] = round(count / total_offers * 100, 1)
+            results.append(result)
+    return sorted(results, key=lambda x: x['count'], reverse=True)
+
+
+def iter_offer_chunks(db: Session, *columns, chunk_size: int = 1000):
+    """
+    Yields the offers table in primary-key order, `chunk_size` rows at a time.
+
+    Each chunk is a keyset query (`id > last_id ORDER BY id LIMIT n`), so
+    only one chunk is held in memory regardless of the table size or of
+    whether the database driver supports server-side cursors.
+
+    Args:
+        db: The database session.
+        columns: Columns to fetch in addition to `JobOffer.id`.
+        chunk_size: Maximum number of rows per chunk.
+    """
+    last_id = 0
+    while True:
+        chunk = db.query(
+            models.JobOffer.id, *columns
+        ).filter(
+            models.JobOffer.id > last_id
+        ).order_by(
+            models.JobOffer.id
+        ).limit(chunk_size).all()
+
+        if not chunk:
+            return
+
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def analyze_technology_demand(db: Session, chunk_size: Optional[int] = None, workers: Optional[int] = None):
     """
     Analyzes the demand for technologies based on job descriptions in the database.
 
     Args:
         db: The database session.
+        chunk_size: If given, descriptions are streamed in chunks of this size
+            and per-chunk counts are added up, keeping memory flat.
+        workers: Worker processes for large corpora (see `count_technologies`).
 
     Returns:
         A list of dictionaries with technology and its count.
     """
+    workers = settings.ANALYZER_WORKERS if workers is None else workers
+
+    if chunk_size:
+        chunks = (
+            [row.description for row in chunk]
+            for chunk in iter_offer_chunks(db, models.JobOffer.description, chunk_size=chunk_size)
+        )
+        corpus_size = db.query(func.count(models.JobOffer.id)).scalar() if workers > 1 else 0
+        if _use_parallel(corpus_size, workers):
+            counts = _parallel_count(chunks, workers)
+        else:
+            counts = Counter()
+            for chunk in chunks:
+                counts.update(TECHNOLOGY_MATCHER.count(chunk))
+        return rank_technology_counts(counts)
+
     # Query all job offers from the database
     query = db.query(models.JobOffer.description).all()
-    
+
     # Check if there is data to analyze
     if not query:
         return []
 
-    # Use pandas for efficient text processing
-    df = pd.DataFrame(query, columns=['description'])
-    
-    # Convert descriptions to lowercase for case-insensitive matching
-    df['description_lower'] = df['description'].str.lower()
+    # Scan each description once, matching all technologies in a single pass
+    counts = count_technologies([row.description for row in query], workers)
+
+    return rank_technology_counts(counts)
+
+
+# Descriptions per round trip when technology_demand has to scan them
+DEMAND_SCAN_CHUNK_SIZE = 5000
+
+@cached("technology_demand")
+def technology_demand(db: Session):
+    """
+    Returns technology demand from the offer_technologies table.
+
+    Unlike `analyze_technology_demand`, this normally never reads
+    descriptions: the technologies of each offer are stored at ingest time,
+    so demand is a single indexed GROUP BY. Offers stored before tagging
+    existed have no rows until `ingest.backfill_offer_technologies` runs;
+    while none are tagged, demand falls back to streaming the descriptions
+    through `analyze_technology_demand` (on ANALYZER_WORKERS processes).
+
+    Args:
+        db: The database session.
+
+    Returns:
+        A list of dictionaries with technology, count and percentage of offers.
+        The list is cached until the next data commit and must not be mutated.
+    """
+    rows = db.query(
+        models.OfferTechnology.technology,
+        func.count(models.OfferTechnology.offer_id)
+    ).group_by(
+        models.OfferTechnology.technology
+    ).all()
+
+    total_offers = db.query(func.count(models.JobOffer.id)).scalar()
+    if not total_offers:
+        return []
+    if rows:
+        counts = dict(rows)
+    else:
+        logger.warning("⚠️ No offer is tagged yet; scanning descriptions (run scripts/backfill.py technologies)")
+        counts = {
+            result["technology"]: result["count"]
+            for result in analyze_technology_demand(db, chunk_size=DEMAND_SCAN_CHUNK_SIZE)
+        }
+    return rank_technology_counts(counts, total_offers)
+
+
+def period_technology_demand(
+    db: Session, start: Optional[datetime], total_offers: Optional[int] = None, end: Optional[datetime] = None
+):
+    """
+    Returns the demand of each technology among the offers scraped since `start`.
+
+    A GROUP BY over offer_technologies joined to the offers of the period;
+    the date range uses the scraped_at index. Not cached: callers cache the
+    result they build from it.
 
+    Args:
+        db: The database session.
+        start: Beginning of the period, or None for no beginning.
+        total_offers: Number of offers in the period, if already known.
+        end: End of the period (exclusive), or None for no end.
+
+    Returns:
+        A list of dictionaries with technology, count and percentage of the
+        period's offers.
+    """
+    period = []
+    if start is not None:
+        period.append(models.JobOffer.scraped_at >= start)
+    if end is not None:
+        period.append(models.JobOffer.scraped_at < end)
+    rows = db.query(
+        models.OfferTechnology.technology,
+        func.count(models.OfferTechnology.offer_id)
+    ).join(
+        models.JobOffer, models.JobOffer.id == models.OfferTechnology.offer_id
+    ).filter(
+        *period
+    ).group_by(
+        models.OfferTechnology.technology
+    ).all()
+
+    if not rows:
+        return []
+
+    if total_offers is None:
+        total_offers = db.query(func.count(models.JobOffer.id)).filter(*period).scalar()
+    return rank_technology_counts(dict(rows), total_offers)
+
+
+# --- Company and location rollups ---
+
+ROLLUP_COLUMNS = {
+    "company": models.DailyOfferStat.company,
+    "location": models.DailyOfferStat.location,
+}
+
+def _day_range(query, start: Optional[date], end: Optional[date]):
+    """Restricts a daily_offer_stats query to the days from `start` to `end`, both included."""
+    if start is not None:
+        query = query.filter(models.DailyOfferStat.day >= start)
+    if end is not None:
+        query = query.filter(models.DailyOfferStat.day <= end)
+    return query
+
+def rollup_top_values(
+    db: Session, column: str, start: Optional[date] = None, end: Optional[date] = None, limit: int = 20
+) -> List[Tuple[str, int]]:
+    """
+    The companies or locations with the most offers scraped between two days.
+
+    Sums the daily_offer_stats rows of the range (one per day, company,
+    location and source) instead of grouping the offers themselves.
+
+    Args:
+        db: The database session.
+        column: "company" or "location".
+        start: First day included, or None for no lower bound.
+        end: Last day included, or None for no upper bound.
+        limit: Number of values returned.
+
+    Returns:
+        (value, offer count) pairs by decreasing count.
+    """
+    attribute = ROLLUP_COLUMNS[column]
+    total = func.sum(models.DailyOfferStat.offer_count)
+    query = db.query(attribute, total).filter(attribute != "")
+    return [
+        (value, int(count)) for value, count in
+        _day_range(query, start, end).group_by(attribute).order_by(total.desc(), attribute).limit(limit)
+    ]
+
+def rollup_totals(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, int, int]:
+    """
+    Offers, distinct companies and distinct locations scraped between two days.
+
+    Returns:
+        (total offers, unique companies, unique locations)
+    """
+    stat = models.DailyOfferStat
+    total_offers, unique_companies, unique_locations = _day_range(db.query(
+        func.sum(stat.offer_count),
+        func.count(distinct(case((stat.company != "", stat.company)))),
+        func.count(distinct(case((stat.location != "", stat.location)))),
+    ), start, end).one()
+    return int(total_offers or 0), unique_companies, unique_locations
+
+
+# --- Technology demand over time ---
+
+def week_start(moment: datetime) -> date:
+    """Returns the Monday of the ISO week containing `moment`."""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day - timedelta(days=day.weekday())
+
+
+def iso_week_label(day: date) -> str:
+    """Formats a date as its ISO week, e.g. '2026-W07'."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _growth_rate(current: int, previous: int) -> Optional[float]:
+    if not previous:
+        return None
+    return round((current - previous) / previous * 100, 1)
+
+
+@cached("technology_trends")
+def technology_trends(db: Session, weeks: int = 12, technologies: Optional[tuple] = None):
+    """
+    Returns weekly offer counts per technology from the technology_weekly_counts rollup.
+
+    Args:
+        db: The database session.
+        weeks: Number of ISO weeks to return, ending with the current week.
+        technologies: Restrict the result to these technologies (default: all).
+
+    Returns:
+        A dictionary with the week labels and, per technology, its weekly
+        series (with week-over-week change) and the growth rate of the
+        second half of the window over the first half.
+    """
+    last_week = week_start(datetime.utcnow())
+    week_starts = [last_week - timedelta(weeks=i) for i in reversed(range(weeks))]
+
+    query = db.query(
+        models.TechnologyWeeklyCount.technology,
+        models.TechnologyWeeklyCount.week_start,
+        models.TechnologyWeeklyCount.offer_count
+    ).filter(
+        models.TechnologyWeeklyCount.week_start >= week_starts[0]
+    )
+    if technologies:
+        query = query.filter(models.TechnologyWeeklyCount.technology.in_(technologies))
+
+    counts: Dict[str, Dict[date, int]] = {}
+    for tech, week, offer_count in query.all():
+        counts.setdefault(tech, {})[week] = offer_count
+
+    half = weeks // 2
     results = []
     for tech in TECHNOLOGIES:
-        # Use regex to find whole words to avoid matching substrings (e.g., 'Go' in 'Google')
-        # The `\b` is a word boundary.
-        tech_pattern = r'\b' + re.escape(tech.lower()) + r'\b'
-        count = df['description_lower'].str.contains(tech_pattern, regex=True).sum()
-        
-        if count > 0:
-            results.append({"technology": tech, "count": int(count)})
+        if tech not in counts:
+            continue
+        values = [counts[tech].get(week, 0) for week in week_starts]
+        series = [
+            {
+                "week": iso_week_label(week),
+                "week_start": week.isoformat(),
+                "offers": value,
+                "change": _growth_rate(value, values[i - 1]) if i else None,
+            }
+            for i, (week, value) in enumerate(zip(week_starts, values))
+        ]
+        results.append({
+            "technology": tech,
+            "total": sum(values),
+            "growth_rate": _growth_rate(sum(values[-half:]), sum(values[-2 * half:-half])) if half else None,
+            "series": series,
+        })
+
+    return {
+        "weeks": [iso_week_label(week) for week in week_starts],
+        "technologies": sorted(results, key=lambda x: x["total"], reverse=True),
+    }
+
+
+# --- Offer volume over time ---
+
+def month_starts(months: int, today: Optional[date] = None) -> List[datetime]:
+    """
+    Calendar month boundaries for the last `months` months, oldest first.
+
+    Returns `months + 1` datetimes: the first day of each month, followed by
+    the first day of the next month, so bucket i is [starts[i], starts[i + 1]).
+    """
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1
+    return [
+        datetime((index - offset) // 12, (index - offset) % 12 + 1, 1)
+        for offset in range(months - 1, -2, -1)
+    ]
+
+
+def monthly_offer_counts(db: Session, months: int = 6, today: Optional[date] = None) -> List[dict]:
+    """
+    Number of offers scraped in each of the last `months` calendar months.
+
+    A single GROUP BY over a CASE expression mapping `scraped_at` to its
+    month bucket; the range predicate uses the scraped_at index.
+
+    Returns:
+        [{"month": "Jan", "offers": 12}, ...], oldest month first.
+    """
+    starts = month_starts(months, today)
+    bucket = case(
+        *[
+            (models.JobOffer.scraped_at < boundary, index)
+            for index, boundary in enumerate(starts[1:])
+        ],
+    )
+    rows = dict(
+        db.query(bucket, func.count(models.JobOffer.id)).filter(
+            models.JobOffer.scraped_at >= starts[0],
+            models.JobOffer.scraped_at < starts[-1],
+        ).group_by(bucket).all()
+    )
+    return [
+        {"month": start.strftime("%b"), "offers": rows.get(index, 0)}
+        for index, start in enumerate(starts[:-1])
+    ]
+
+
+# --- Technology co-occurrence ---
+
+TechnologyIncidence = namedtuple("TechnologyIncidence", ["matrix", "offer_ids", "technologies"])
+
+
+@cached("technology_incidence")
+def technology_incidence(db: Session, chunk_size: int = 50000) -> TechnologyIncidence:
+    """
+    Builds the sparse offer × technology incidence matrix from offer_technologies.
+
+    Row i is offer `offer_ids[i]`, column j is `technologies[j]`; only tagged
+    offers get a row. The matrix is cached until the next data commit.
+
+    Args:
+        db: The database session.
+        chunk_size: Rows fetched per round trip while streaming the table.
+    """
+    columns = {tech: index for index, tech in enumerate(TECHNOLOGIES)}
+    offer_column = array('l')
+    tech_column = array('l')
+    rows = db.query(
+        models.OfferTechnology.offer_id,
+        models.OfferTechnology.technology
+    ).yield_per(chunk_size)
+    for offer_id, tech in rows:
+        index = columns.get(tech)
+        if index is not None:
+            offer_column.append(offer_id)
+            tech_column.append(index)
+
+    # Both arrays hold C longs, which NumPy reads without copying
+    offer_ids, row_index = np.unique(np.frombuffer(offer_column, dtype='l'), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(tech_column), dtype=np.int64), (row_index, np.frombuffer(tech_column, dtype='l'))),
+        shape=(len(offer_ids), len(TECHNOLOGIES)),
+    )
+    return TechnologyIncidence(matrix, offer_ids, list(TECHNOLOGIES))
+
+
+@cached("technology_cooccurrence")
+def technology_cooccurrence(db: Session, limit: int = 20, min_count: int = 1, technology: Optional[str] = None):
+    """
+    Returns the technology pairs that appear together most often.
+
+    The co-occurrence counts are the off-diagonal entries of Xᵀ·X for the
+    incidence matrix X, computed with a single sparse product.
+
+    Args:
+        db: The database session.
+        limit: Maximum number of pairs to return.
+        min_count: Minimum number of offers a pair must share.
+        technology: If given, only pairs involving this technology.
+
+    Returns:
+        A dictionary with the number of offers analyzed and the top pairs,
+        each with its shared offer count, support and lift.
+    """
+    incidence = technology_incidence(db)
+    total_offers = db.query(func.count(models.JobOffer.id)).scalar() or 0
+    if not total_offers or incidence.matrix.nnz == 0:
+        return {"total_offers": total_offers, "pairs": []}
+
+    cooccurrence = (incidence.matrix.T @ incidence.matrix).toarray()
+    counts = np.diag(cooccurrence)
+
+    first, second = np.triu_indices(len(incidence.technologies), k=1)
+    shared = cooccurrence[first, second]
+    keep = shared >= max(min_count, 1)
+    if technology:
+        selected = incidence.technologies.index(technology) if technology in incidence.technologies else -1
+        keep &= (first == selected) | (second == selected)
+
+    pairs = []
+    for a, b, count in zip(first[keep], second[keep], shared[keep].tolist()):
+        pairs.append({
+            "technologies": [incidence.technologies[a], incidence.technologies[b]],
+            "count": int(count),
+            "support": round(count / total_offers, 4),
+            # How much more often the pair appears than if both were independent
+            "lift": round(count * total_offers / (int(counts[a]) * int(counts[b])), 2),
+        })
+
+    pairs.sort(key=lambda pair: (pair["count"], pair["lift"]), reverse=True)
+    return {"total_offers": total_offers, "pairs": pairs[:limit]}
+
+
+# --- Salary analysis ---
+
+@cached("salary_trends")
+def salary_trends(db: Session, months: int = 6):
+    """
+    Average monthly salary by technology and experience level, and per month.
+
+    Only offers with a parsed salary are read; the midpoint of each salary
+    range is averaged with vectorized pandas group-bys.
+
+    Args:
+        db: The database session.
+        months: Number of calendar months in the monthly trend.
+    """
+    rows = db.query(
+        models.JobOffer.id,
+        models.JobOffer.experience_level,
+        models.JobOffer.salary_min,
+        models.JobOffer.salary_max,
+        models.JobOffer.scraped_at
+    ).filter(
+        models.JobOffer.salary_min.isnot(None)
+    ).all()
+
+    if not rows:
+        return {"average_salaries": {}, "trends": [], "sample_size": 0}
+
+    offers = pd.DataFrame(rows, columns=["offer_id", "experience_level", "salary_min", "salary_max", "scraped_at"])
+    offers["salary"] = (offers["salary_min"] + offers["salary_max"]) / 2
+    offers["experience_level"] = offers["experience_level"].fillna("mid")
+
+    tagged = pd.DataFrame(
+        db.query(
+            models.OfferTechnology.offer_id,
+            models.OfferTechnology.technology
+        ).join(
+            models.JobOffer, models.JobOffer.id == models.OfferTechnology.offer_id
+        ).filter(
+            models.JobOffer.salary_min.isnot(None)
+        ).all(),
+        columns=["offer_id", "technology"]
+    )
+
+    average_salaries: Dict[str, Dict[str, int]] = {}
+    if not tagged.empty:
+        by_technology = tagged.merge(offers, on="offer_id").groupby(
+            ["technology", "experience_level"]
+        )["salary"].mean().round()
+        for (tech, level), average in by_technology.items():
+            average_salaries.setdefault(tech, {})[level] = int(average)
+
+    offers["month"] = offers["scraped_at"].dt.to_period("M")
+    monthly = offers.groupby("month")["salary"].agg(["mean", "size"]).sort_index().tail(months)
+    trends = [
+        {"month": period.strftime("%b"), "avg_salary": int(round(row["mean"])), "offers": int(row["size"])}
+        for period, row in monthly.iterrows()
+    ]
 
-    # Sort results by count in descending order
-    sorted_results = sorted(results, key=lambda x: x['count'], reverse=True)
-    
-    return sorted_results
+    return {
+        "average_salaries": average_salaries,
+        "trends": trends,
+        "sample_size": len(offers),
+    }
@@ -0,0 +1,222 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
+from sqlalchemy.orm import Session
+from .config import settings
+
+# --- In-process caching of aggregate results ---
+
+class DataVersion:
+    """
+    Monotonic counter identifying the current state of the job offer data.
+
+    Every code path that commits new or deleted offers calls `bump()`, so
+    anything keyed by the version is invalidated by the next commit. The
+    version is per process: it starts from the process start time so a
+    restarted worker never reuses keys handed out by a previous one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = int(time.time() * 1000)
+        self.updated_at = datetime.now()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            self.updated_at = datetime.now()
+            return self._value
+
+data_version = DataVersion()
+
+def bump_data_version() -> int:
+    """Marks the offer data as changed, invalidating every cached result."""
+    return data_version.bump()
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int = 0):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+class _Flight:
+    """A computation in progress that concurrent callers wait on."""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class VersionedCache:
+    """
+    Thread-safe LRU cache whose keys are scoped to the current data version.
+
+    - Entries expire after `ttl_seconds` even if the data did not change.
+    - At most `max_entries` are kept; the least recently used go first.
+    - With `max_bytes`, entries are also evicted until their total size, as
+      estimated by `sizeof(value)`, fits the budget.
+    - Concurrent misses on the same key are coalesced (single-flight): one
+      caller computes, the others wait and receive the same result.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._bytes = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for `key`, calling `compute()` on a miss.
+
+        Exceptions raised by `compute` are propagated to every waiting
+        caller and nothing is cached.
+        """
+        entry_key = (data_version.value, key)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return entry.value
+                self._discard(entry_key)
+
+            flight = self._in_flight.get(entry_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._in_flight[entry_key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            size = self.sizeof(flight.value) if self.sizeof and self.max_bytes else 0
+            with self._lock:
+                if self.max_bytes is None or size <= self.max_bytes:
+                    self._discard(entry_key)
+                    self._entries[entry_key] = _Entry(flight.value, time.monotonic() + self.ttl_seconds, size)
+                    self._bytes += size
+                while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes
+                ):
+                    self._discard(next(iter(self._entries)))
+                    self.evictions += 1
+        finally:
+            with self._lock:
+                self._in_flight.pop(entry_key, None)
+            flight.event.set()
+
+        return flight.value
+
+    def _discard(self, entry_key: Hashable):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self):
+        """Drops every cached entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                "data_version": data_version.value,
+            }
+
+analysis_cache = VersionedCache(
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+)
+
+# Short-lived totals of /offers/search/ per normalized filter set
+search_count_cache = VersionedCache(
+    ttl_seconds=settings.SEARCH_COUNT_TTL_SECONDS,
+    max_entries=1024,
+)
+
+# Whole /offers/search/ responses per canonical request fingerprint
+search_result_cache = VersionedCache(
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    sizeof=lambda response: len(response.model_dump_json()),
+)
+
+def cached(name: str, cache: VersionedCache = analysis_cache):
+    """
+    Decorator caching a function's result per data version.
+
+    The cache key is `name` plus the call arguments, ignoring database
+    sessions. It works on FastAPI endpoints as well, since the wrapper keeps
+    the original signature for dependency injection.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name,) + tuple(
+                (param, value) for param, value in bound.arguments.items()
+                if not isinstance(value, Session)
+            )
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from . import analyzer, dashboard, models
+from .config import settings
+from .database import SessionLocal
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Conditional GET (ETag / Last-Modified) for read-only endpoints ---
+
+# Responses under these paths only change with the job offer data (or the clock)
+CONDITIONAL_PATHS = ("/dashboard/", "/analytics/", "/stats/technologies/")
+
+# Served from the dashboard snapshot, which changes when it is rebuilt
+SNAPSHOT_PATHS = ("/dashboard/stats/", "/stats/technologies/")
+
+# Rendered relative to the current time ("5m ago", notification timestamps),
+# so they change without new data and are never answered with a 304
+UNCONDITIONAL_PATHS = ("/dashboard/recent-activity/", "/dashboard/bundle/")
+
+# Sessions used to read the state of the offer table (patched in tests)
+session_factory = SessionLocal
+
+def _current_day() -> datetime:
+    return datetime.combine(date.today(), time()).astimezone()
+
+def _current_week() -> datetime:
+    # Trend weeks are UTC ISO weeks (see analyzer.technology_trends)
+    return datetime.combine(analyzer.week_start(datetime.utcnow()), time(), tzinfo=timezone.utc)
+
+def _current_cache_period() -> datetime:
+    period = settings.CACHE_TTL_SECONDS
+    return datetime.fromtimestamp(datetime.now(timezone.utc).timestamp() // period * period, tz=timezone.utc)
+
+# Windows that move with the clock: the start of the current day or week is
+# part of the validators, so responses expire when the window moves on
+TIME_BUCKETS = {
+    "/analytics/market-insights/": _current_day,  # last 30 days vs the 30 before
+    "/analytics/technology-trends/": _current_week,  # weeks ending with the current one
+}
+
+def offer_table_state() -> Tuple[int, int, Optional[datetime]]:
+    """
+    (count, max id, latest scraped_at) of job_offers.
+
+    Read from the database rather than the per-process data version, so
+    every worker agrees on it and writes by other processes (other
+    workers, scripts/backfill.py) change it too.
+    """
+    db = session_factory()
+    try:
+        return tuple(db.query(
+            func.count(models.JobOffer.id), func.max(models.JobOffer.id), func.max(models.JobOffer.scraped_at)
+        ).one())
+    finally:
+        db.close()
+
+def validators(request: Request) -> Tuple[str, datetime]:
+    """
+    The ETag and Last-Modified time of the response to `request`.
+
+    Snapshot-backed endpoints derive them from the dashboard snapshot. The
+    others derive them from the state of the offer table and the current
+    CACHE_TTL_SECONDS period: changes the table state does not reveal
+    (retagging, edits, windows relative to now) are picked up when the
+    period ends, as the analysis cache recomputes them. Endpoints in
+    TIME_BUCKETS also depend on the start of the current day or week.
+    """
+    snapshot = dashboard.current_snapshot()
+    if request.url.path in SNAPSHOT_PATHS and snapshot is not None:
+        version = f"snapshot-{snapshot.data_version}-{snapshot.last_updated.timestamp()}"
+        last_modified = snapshot.last_updated.astimezone(timezone.utc)
+    else:
+        count, max_id, latest = offer_table_state()
+        period_start = _current_cache_period()
+        version = f"{count}-{max_id}-{period_start.timestamp()}"
+        # scraped_at is stored in naive UTC
+        last_modified = max(latest.replace(tzinfo=timezone.utc), period_start) if latest else period_start
+
+    bucket = TIME_BUCKETS.get(request.url.path)
+    if bucket is not None:
+        bucket_start = bucket()
+        version = f"{version}-{bucket_start.date().isoformat()}"
+        last_modified = max(last_modified, bucket_start.astimezone(timezone.utc))
+
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{version}:{request.url.path}?{query}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"', last_modified.replace(microsecond=0)
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Evaluates If-None-Match (which takes precedence) and If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" and "x" are the same validator
+        return "*" in tags or _opaque_tag(etag) in [_opaque_tag(tag) for tag in tags]
+
+    since = _parse_http_date(request.headers.get("if-modified-since"))
+    return since is not None and last_modified <= since
+
+async def conditional_get(request: Request, call_next):
+    """
+    HTTP middleware adding ETag/Last-Modified to GETs under CONDITIONAL_PATHS.
+
+    Requests whose validators still match get an empty 304 without running
+    the endpoint: one aggregate query of the offer table replaces its
+    queries and serialization.
+    """
+    path = request.url.path
+    if request.method != "GET" or not path.startswith(CONDITIONAL_PATHS) or path in UNCONDITIONAL_PATHS:
+        return await call_next(request)
+
+    try:
+        etag, last_modified = await run_in_threadpool(validators, request)
+    except Exception as e:
+        logger.error(f"❌ Error computing validators for {path}: {e}")
+        return await call_next(request)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        # Clients may keep the response but must revalidate it each time
+        "Cache-Control": "no-cache",
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
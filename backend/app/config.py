@@ -17,8 +17,58 @@ class Settings:
     BASE_URL: str = os.getenv("BASE_URL", "https://www.computrabajo.com.co/ofertas-de-trabajo/?q=python")
     MAX_PAGES: int = int(os.getenv("MAX_PAGES", "10"))
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "15"))
+    # Retries of a failed page, after an exponential backoff with jitter (seconds)
     RETRY_ATTEMPTS: int = int(os.getenv("RETRY_ATTEMPTS", "3"))
+    RETRY_BACKOFF_BASE: float = float(os.getenv("RETRY_BACKOFF_BASE", "0.5"))
+    RETRY_BACKOFF_MAX: float = float(os.getenv("RETRY_BACKOFF_MAX", "30"))
+    # Longest Retry-After honored; pages asking for more are given up
+    RETRY_AFTER_MAX: float = float(os.getenv("RETRY_AFTER_MAX", "60"))
+    # Per-host rate limit: SCRAPER_HOST_BURST requests at once, then one every DELAY_BETWEEN_REQUESTS seconds
     DELAY_BETWEEN_REQUESTS: float = float(os.getenv("DELAY_BETWEEN_REQUESTS", "1.0"))
+    SCRAPER_HOST_BURST: int = int(os.getenv("SCRAPER_HOST_BURST", "2"))
+    # Pages downloaded at the same time
+    SCRAPER_CONCURRENCY: int = int(os.getenv("SCRAPER_CONCURRENCY", "4"))
+    # Idle keep-alive connections of the shared scraper client are closed after this
+    SCRAPER_KEEPALIVE_SECONDS: float = float(os.getenv("SCRAPER_KEEPALIVE_SECONDS", "60"))
+    
+    # Caching of aggregate results
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    
+    # Dashboard snapshot rebuilt in the background
+    DASHBOARD_SNAPSHOT_ENABLED: bool = os.getenv("DASHBOARD_SNAPSHOT_ENABLED", "true").lower() == "true"
+    DASHBOARD_REFRESH_SECONDS: float = float(os.getenv("DASHBOARD_REFRESH_SECONDS", "300"))
+    # Threads computing the widgets of /dashboard/bundle/
+    DASHBOARD_BUNDLE_WORKERS: int = int(os.getenv("DASHBOARD_BUNDLE_WORKERS", "4"))
+    
+    # Streaming sketches of distinct and top companies/locations
+    SKETCHES_ENABLED: bool = os.getenv("SKETCHES_ENABLED", "true").lower() == "true"
+    SKETCH_TOP_K_CAPACITY: int = int(os.getenv("SKETCH_TOP_K_CAPACITY", "1000"))
+    SKETCH_PERSIST_SECONDS: float = float(os.getenv("SKETCH_PERSIST_SECONDS", "300"))
+    
+    # Search result counts
+    SEARCH_COUNT_TTL_SECONDS: float = float(os.getenv("SEARCH_COUNT_TTL_SECONDS", "30"))
+    SEARCH_COUNT_CAP: int = int(os.getenv("SEARCH_COUNT_CAP", "10000"))
+    # Cached /offers/search/ responses
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+    SEARCH_CACHE_MAX_BYTES: int = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Share of a company/location filter's trigrams a value must contain to match it
+    FUZZY_MATCH_THRESHOLD: float = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.5"))
+    # In-memory BM25 index for relevance ranking (built at startup)
+    SEARCH_INDEX_ENABLED: bool = os.getenv("SEARCH_INDEX_ENABLED", "true").lower() == "true"
+    # Full rebuild interval of the search indexes, to pick up writes from other processes
+    SEARCH_INDEX_REBUILD_SECONDS: float = float(os.getenv("SEARCH_INDEX_REBUILD_SECONDS", "900"))
+    # Filtered relevance pages rank at most (skip + limit) * factor matches, up to the max;
+    # more selective filters fall back to the database ordering
+    SEARCH_RELEVANCE_CANDIDATE_FACTOR: int = int(os.getenv("SEARCH_RELEVANCE_CANDIDATE_FACTOR", "20"))
+    SEARCH_RELEVANCE_MAX_CANDIDATES: int = int(os.getenv("SEARCH_RELEVANCE_MAX_CANDIDATES", "20000"))
+    
+    # Technology analysis
+    # Worker processes for the parallel analyzer (1 disables it)
+    ANALYZER_WORKERS: int = int(os.getenv("ANALYZER_WORKERS", "1"))
+    # Minimum number of descriptions before the parallel path is used
+    PARALLEL_ANALYSIS_THRESHOLD: int = int(os.getenv("PARALLEL_ANALYSIS_THRESHOLD", "50000"))
     
     # Headers for web scraping
     HEADERS: dict = {
@@ -0,0 +1,198 @@
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from apscheduler.schedulers.background import BackgroundScheduler
+from fastapi import HTTPException
+from sqlalchemy import case, distinct, func
+from sqlalchemy.orm import Session
+from . import analyzer, models
+from .cache import cached, data_version
+from .config import settings
+from .database import SessionLocal
+from .sketches import offer_sketches
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Dashboard data ---
+
+@cached("dashboard_stats")
+def compute_stats(db: Session) -> dict:
+    """
+    Headline numbers of the dashboard: one summary query and one monthly query.
+
+    The distinct company count comes from `offer_sketches` once it is loaded.
+
+    Args:
+        db: Database session
+    """
+    week_ago = datetime.now() - timedelta(days=7)
+    sketched = offer_sketches.ready
+    total_offers, recent_offers, unique_technologies, *companies = db.query(
+        func.count(models.JobOffer.id),
+        func.sum(case((models.JobOffer.scraped_at >= week_ago, 1), else_=0)),
+        db.query(func.count(distinct(models.OfferTechnology.technology))).scalar_subquery(),
+        # COUNT(DISTINCT) is skipped when the HyperLogLog sketch can answer it
+        *([] if sketched else [func.count(distinct(models.JobOffer.company))])
+    ).one()
+    unique_companies = offer_sketches.unique_companies() if sketched else companies[0]
+
+    return {
+        "total_offers": total_offers,
+        "unique_companies": unique_companies,
+        # unique_companies is a HyperLogLog estimate (about 0.8% standard error)
+        "approximate": sketched,
+        "recent_offers": recent_offers or 0,
+        "unique_technologies": unique_technologies,
+        # Last 6 calendar months in one grouped statement
+        "monthly_trend": analyzer.monthly_offer_counts(db, months=6),
+        "last_updated": datetime.now().isoformat()
+    }
+
+RecentOffer = namedtuple("RecentOffer", ["company", "title", "url", "scraped_at"])
+
+def recent_offers(db: Session, limit: int = 10) -> tuple:
+    """The most recently scraped offers, newest first."""
+    rows = db.query(
+        models.JobOffer.company, models.JobOffer.title, models.JobOffer.url, models.JobOffer.scraped_at
+    ).order_by(models.JobOffer.scraped_at.desc()).limit(limit).all()
+    return tuple(RecentOffer(*row) for row in rows)
+
+def format_activity(offers: tuple, now: Optional[datetime] = None) -> List[dict]:
+    """
+    Renders recent offers as dashboard activity entries ("5m ago").
+
+    The relative time is computed when serving, so it stays accurate while
+    a snapshot ages.
+    """
+    now = now or datetime.now()
+    activity = []
+    for offer in offers:
+        time_diff = now - offer.scraped_at
+        if time_diff.days > 0:
+            time_ago = f"{time_diff.days}d ago"
+        elif time_diff.seconds > 3600:
+            time_ago = f"{time_diff.seconds // 3600}h ago"
+        else:
+            time_ago = f"{time_diff.seconds // 60}m ago"
+
+        activity.append({
+            "company": offer.company or "Unknown",
+            "position": offer.title,
+            "time": time_ago,
+            "url": offer.url
+        })
+    return activity
+
+# --- Background-refreshed snapshot ---
+
+# Everything the dashboard page loads. Snapshots are never mutated: a
+# refresh builds a new one and swaps the module-level reference.
+DashboardSnapshot = namedtuple(
+    "DashboardSnapshot", ["stats", "recent_offers", "technologies", "data_version", "last_updated"]
+)
+
+_snapshot: Optional[DashboardSnapshot] = None
+_refresh_lock = threading.Lock()
+
+scheduler = BackgroundScheduler(daemon=True)
+
+def current_snapshot() -> Optional[DashboardSnapshot]:
+    """The latest dashboard snapshot, or None before the first refresh."""
+    return _snapshot
+
+def refresh_snapshot(session_factory: Callable[[], Session] = SessionLocal) -> Optional[DashboardSnapshot]:
+    """
+    Rebuilds the dashboard snapshot from the database and publishes it.
+
+    Refreshes are serialized; a failed refresh keeps serving the previous
+    snapshot.
+    """
+    global _snapshot
+    with _refresh_lock:
+        db = session_factory()
+        try:
+            version = data_version.value
+            built_at = datetime.now()
+            stats = dict(compute_stats(db), last_updated=built_at.isoformat())
+            _snapshot = DashboardSnapshot(
+                stats=stats,
+                recent_offers=recent_offers(db),
+                technologies=tuple(analyzer.technology_demand(db)),
+                data_version=version,
+                last_updated=built_at,
+            )
+            logger.info(f"📸 Dashboard snapshot refreshed ({stats['total_offers']} offers)")
+        except Exception as e:
+            logger.error(f"❌ Error refreshing dashboard snapshot: {e}")
+        finally:
+            db.close()
+    return _snapshot
+
+def start_refresher():
+    """Builds the first snapshot right away and then every DASHBOARD_REFRESH_SECONDS."""
+    scheduler.add_job(
+        refresh_snapshot, "interval", seconds=settings.DASHBOARD_REFRESH_SECONDS,
+        id="dashboard-refresh", next_run_time=datetime.now(),
+        max_instances=1, coalesce=True, replace_existing=True,
+    )
+    if not scheduler.running:
+        scheduler.start()
+
+def stop_refresher():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+
+def request_refresh():
+    """Schedules an immediate refresh, e.g. after a scrape committed new offers."""
+    if scheduler.running:
+        scheduler.add_job(refresh_snapshot, id="dashboard-refresh-now", replace_existing=True)
+
+# --- Dashboard bundle ---
+
+_widget_pool = ThreadPoolExecutor(max_workers=settings.DASHBOARD_BUNDLE_WORKERS, thread_name_prefix="dashboard-widget")
+
+def _run_widget(widget: Callable[[Session], Any], session_factory: Callable[[], Session]):
+    # Sessions are not thread-safe, so each widget gets its own
+    db = session_factory()
+    try:
+        return widget(db)
+    finally:
+        db.close()
+
+def compute_widgets(
+    widgets: Dict[str, Callable[[Session], Any]],
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Computes dashboard widgets concurrently in a thread pool.
+
+    Intermediate results shared between widgets (technology demand, offer
+    counts) go through the analysis cache, whose single-flight lookups make
+    concurrent widgets compute them once.
+
+    Args:
+        widgets: Widget name -> function of a database session.
+        session_factory: Creates the per-widget sessions.
+
+    Returns:
+        (results, errors): the value of each widget that succeeded and the
+        error message of each one that failed.
+    """
+    futures = {
+        name: _widget_pool.submit(_run_widget, widget, session_factory)
+        for name, widget in widgets.items()
+    }
+    results, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except HTTPException as e:
+            errors[name] = e.detail
+        except Exception as e:
+            logger.error(f"❌ Error computing dashboard widget {name}: {e}")
+            errors[name] = "Error computing widget"
+    return results, errors
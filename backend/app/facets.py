@@ -0,0 +1,315 @@
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from . import models
+from .analyzer import TECHNOLOGIES, iter_offer_chunks
+from .search_index import offer_index
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Facet counts for search results ---
+
+FACETS = ("company", "location", "technology")
+
+TECHNOLOGY_CODES = {tech: code for code, tech in enumerate(TECHNOLOGIES)}
+
+class _Vocabulary:
+    """Dictionary encoding of a text column; code -1 stands for NULL."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Iterable[str]) -> List[int]:
+        """Codes of the given values; unknown values are skipped."""
+        return [self.codes[value] for value in values if value in self.codes]
+
+class FacetIndex:
+    """
+    Column-oriented in-memory copy of the filterable offer columns.
+
+    One slot per offer, in id order: dictionary codes for company, location
+    and experience level, the salary range, and (offer slot, technology code)
+    pairs. A search's filters are evaluated as a boolean mask over the slots
+    and every facet is counted from that one mask with `np.bincount`, so no
+    database round trip is needed. Deleted offers are flagged dead.
+    """
+
+    def __init__(self):
+        self._offer_ids = array('q')
+        self._companies = array('l')
+        self._locations = array('l')
+        self._levels = array('l')
+        self._salary_min = array('d')
+        self._salary_max = array('d')
+        self._alive = array('b')
+        self._tech_slots = array('q')
+        self._tech_codes = array('b')
+        self._slots: Dict[int, int] = {}
+        self.company_values = _Vocabulary()
+        self.location_values = _Vocabulary()
+        self.level_values = _Vocabulary()
+        self._lock = threading.Lock()
+        # Updates received while a build runs, replayed onto the new contents
+        self._pending: Optional[list] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def accepts_updates(self) -> bool:
+        """Whether committed offers should be passed on: the index is built or being built."""
+        return self.ready or self._pending is not None
+
+    def _append_locked(self, offer_id, company, location, level, salary_min, salary_max) -> int:
+        if offer_id in self._slots:
+            self._alive[self._slots[offer_id]] = 0
+        slot = len(self._offer_ids)
+        self._slots[offer_id] = slot
+        self._offer_ids.append(offer_id)
+        self._companies.append(self.company_values.encode(company))
+        self._locations.append(self.location_values.encode(location))
+        self._levels.append(self.level_values.encode(level))
+        self._salary_min.append(np.nan if salary_min is None else salary_min)
+        self._salary_max.append(np.nan if salary_max is None else salary_max)
+        self._alive.append(1)
+        return slot
+
+    def _tag_locked(self, slot: int, technologies: Iterable[str]):
+        for tech in technologies:
+            code = TECHNOLOGY_CODES.get(tech)
+            if code is not None:
+                self._tech_slots.append(slot)
+                self._tech_codes.append(code)
+
+    def _add_offers_locked(self, offers: Iterable):
+        for offer in offers:
+            slot = self._append_locked(
+                offer.id, offer.company, offer.location, offer.experience_level,
+                offer.salary_min, offer.salary_max,
+            )
+            self._tag_locked(slot, offer.technologies)
+
+    def _remove_locked(self, offer_ids: Iterable[int]):
+        for offer_id in offer_ids:
+            slot = self._slots.pop(offer_id, None)
+            if slot is not None:
+                self._alive[slot] = 0
+
+    def add(self, offers: Iterable):
+        """Adds committed offers (ingest.OfferSnapshot) to the index."""
+        offers = list(offers)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("add", offers))
+            self._add_offers_locked(offers)
+
+    def remove(self, offer_ids: Iterable[int]):
+        """Flags deleted offers so they are no longer counted."""
+        offer_ids = list(offer_ids)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("remove", offer_ids))
+            self._remove_locked(offer_ids)
+
+    def build(self, db: Session, chunk_size: int = 50000):
+        """
+        Replaces the index contents with every offer in the database.
+
+        The new index is built on the side and swapped in at the end.
+        Offers added or removed meanwhile, which the scan may have missed,
+        are replayed onto the new contents before the swap.
+        """
+        with self._lock:
+            self._pending = []
+        fresh = FacetIndex()
+        columns = (
+            models.JobOffer.company, models.JobOffer.location, models.JobOffer.experience_level,
+            models.JobOffer.salary_min, models.JobOffer.salary_max,
+        )
+        try:
+            for chunk in iter_offer_chunks(db, *columns, chunk_size=chunk_size):
+                for row in chunk:
+                    fresh._append_locked(*row)
+
+            for offer_id, tech in db.query(
+                models.OfferTechnology.offer_id, models.OfferTechnology.technology
+            ).yield_per(chunk_size):
+                slot = fresh._slots.get(offer_id)
+                if slot is not None:
+                    fresh._tag_locked(slot, (tech,))
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for action, update in self._pending:
+                if action == "add":
+                    fresh._add_offers_locked(update)
+                else:
+                    fresh._remove_locked(update)
+            fresh._pending = None
+            self.__dict__.update({name: value for name, value in fresh.__dict__.items() if name != "_lock"})
+            self.ready = True
+        logger.info(f"📊 Facet index built with {len(self)} offers")
+
+    def _slots_of(self, offer_ids: np.ndarray) -> np.ndarray:
+        """Slots of the given ids; ids that are not indexed are dropped."""
+        indexed = np.frombuffer(self._offer_ids, dtype=np.int64)
+        # Ids are appended in increasing order unless an offer was re-added
+        sorter = None if np.all(indexed[1:] > indexed[:-1]) else np.argsort(indexed, kind="stable")
+        positions = np.searchsorted(indexed, offer_ids, sorter=sorter)
+        found = positions < len(indexed)
+        slots = positions[found] if sorter is None else sorter[positions[found]]
+        return slots[indexed[slots] == offer_ids[found]]
+
+    def _mask_locked(self, filters: dict) -> Optional[np.ndarray]:
+        """
+        Evaluates the search filters over every slot.
+
+        Returns None when a filter cannot be evaluated in memory (free text
+        while the relevance index is not built yet).
+        """
+        # Views over the arrays must not outlive the lock: arrays cannot grow while exported
+        mask = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+
+        for name, vocabulary, column in (
+            ("company", self.company_values, self._companies),
+            ("location", self.location_values, self._locations),
+        ):
+            if filters.get(name) is not None:
+                mask &= np.isin(np.frombuffer(column, dtype='l'), vocabulary.lookup(filters[name]))
+
+        if filters.get("experience_level"):
+            code = self.level_values.codes.get(filters["experience_level"].lower(), -2)
+            mask &= np.frombuffer(self._levels, dtype='l') == code
+
+        if filters.get("min_salary") is not None:
+            mask &= np.frombuffer(self._salary_min, dtype=np.float64) >= filters["min_salary"]
+        if filters.get("max_salary") is not None:
+            mask &= np.frombuffer(self._salary_max, dtype=np.float64) <= filters["max_salary"]
+
+        texts = []
+        technology = filters.get("technology")
+        if technology:
+            code = next((code for tech, code in TECHNOLOGY_CODES.items() if tech.lower() == technology.lower()), None)
+            if code is None:
+                texts.append(technology)
+            else:
+                tagged = np.zeros(len(mask), dtype=bool)
+                tech_codes = np.frombuffer(self._tech_codes, dtype=np.int8)
+                tagged[np.frombuffer(self._tech_slots, dtype=np.int64)[tech_codes == code]] = True
+                mask &= tagged
+        if filters.get("q"):
+            texts.append(filters["q"])
+
+        for text in texts:
+            if not offer_index.ready:
+                return None
+            matched = np.zeros(len(mask), dtype=bool)
+            matched[self._slots_of(offer_index.matching_ids(text))] = True
+            mask &= matched
+        return mask
+
+    def counts(self, facets: Sequence[str], filters: dict, limit: int) -> Optional[Dict[str, List[dict]]]:
+        """
+        Counts the offers matching `filters` per facet value.
+
+        Args:
+            facets: Names of the facets to count, from FACETS.
+            filters: The search filters (q, technology, experience_level,
+                min_salary, max_salary), with company and location given as
+                lists of exact values (see trigram.resolve_filter).
+            limit: Number of values returned per facet.
+
+        Returns:
+            {facet: [{"value": ..., "count": ...}, ...]}, or None if the
+            filters cannot be evaluated in memory.
+        """
+        with self._lock:
+            mask = self._mask_locked(filters)
+            if mask is None:
+                return None
+            result = {}
+            for name, vocabulary, column in (
+                ("company", self.company_values, self._companies),
+                ("location", self.location_values, self._locations),
+            ):
+                if name in facets:
+                    codes = np.frombuffer(column, dtype='l')[mask]
+                    counts = np.bincount(codes[codes >= 0], minlength=len(vocabulary.values))
+                    result[name] = _ranked(counts, vocabulary.values, limit)
+            if "technology" in facets:
+                tech_codes = np.frombuffer(self._tech_codes, dtype=np.int8)
+                tagged = tech_codes[mask[np.frombuffer(self._tech_slots, dtype=np.int64)]]
+                result["technology"] = _ranked(np.bincount(tagged, minlength=len(TECHNOLOGIES)), TECHNOLOGIES, limit)
+            return result
+
+# Shared index, built at startup and updated as offers are ingested
+facet_index = FacetIndex()
+
+def _ranked(counts: np.ndarray, values: List[str], limit: int) -> List[dict]:
+    """The `limit` values with the highest counts, ties broken by value."""
+    nonzero = np.flatnonzero(counts)
+    if limit < len(nonzero):
+        # Keep everything tied with the limit-th count, then sort that short list
+        threshold = -np.partition(-counts[nonzero], limit - 1)[limit - 1]
+        nonzero = nonzero[counts[nonzero] >= threshold]
+    ordered = sorted(nonzero, key=lambda code: (-counts[code], values[code]))[:limit]
+    return [{"value": values[code], "count": int(counts[code])} for code in ordered]
+
+def _grouped_counts(db: Session, query: Query, facets: Sequence[str], limit: int) -> Dict[str, List[dict]]:
+    """One GROUP BY per facet over the matching offers; used until the index is built."""
+    matching = query.with_entities(models.JobOffer.id).order_by(None)
+    columns = {
+        "company": (models.JobOffer.company, models.JobOffer.id),
+        "location": (models.JobOffer.location, models.JobOffer.id),
+        "technology": (models.OfferTechnology.technology, models.OfferTechnology.offer_id),
+    }
+    result = {}
+    for name in facets:
+        column, offer_id = columns[name]
+        rows = db.query(column, func.count()).filter(offer_id.in_(matching), column.isnot(None)).group_by(
+            column
+        ).order_by(func.count().desc(), column).limit(limit).all()
+        result[name] = [{"value": value, "count": count} for value, count in rows]
+    return result
+
+def facet_counts(db: Session, query: Query, facets: Sequence[str], filters: dict, limit: int = 10) -> Dict[str, List[dict]]:
+    """
+    Counts the offers matched by a search per company, location and technology.
+
+    Served from the in-memory `facet_index` in one pass when possible,
+    otherwise with one GROUP BY query per facet.
+
+    Args:
+        db: The database session.
+        query: The filtered search query.
+        facets: Names of the facets to count, from FACETS.
+        filters: The filter values `query` was built from.
+        limit: Number of values returned per facet.
+
+    Returns:
+        {facet: [{"value": ..., "count": ...}, ...]} ordered by count.
+    """
+    if facet_index.ready:
+        result = facet_index.counts(facets, filters, limit)
+        if result is not None:
+            return result
+    return _grouped_counts(db, query, facets, limit)
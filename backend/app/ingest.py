@@ -0,0 +1,318 @@
+import logging
+from collections import Counter, namedtuple
+from datetime import datetime
+from typing import Iterable, List
+from sqlalchemy import and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from . import models
+from .analyzer import (
+    TECHNOLOGY_MATCHER, classify_experience_level, extract_salary_from_description, iter_offer_chunks, week_start
+)
+from .cache import bump_data_version
+from .facets import facet_index
+from .search_index import offer_index
+from .sketches import offer_sketches
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Ingest-time derivations for new job offers ---
+
+def prepare_offer(offer: models.JobOffer) -> models.JobOffer:
+    """
+    Derives the indexed attributes of a new job offer before it is saved.
+
+    Every code path that inserts offers (scraper, bulk loaders) must call
+    this so that the aggregate tables stay consistent with `job_offers`.
+
+    Args:
+        offer: A new, not yet flushed, JobOffer.
+    """
+    offer.scraped_at = offer.scraped_at or datetime.utcnow()
+    offer.experience_level = classify_experience_level(offer.title)
+    if offer.salary_min is None:
+        offer.salary_min, offer.salary_max = extract_salary_from_description(offer.description) or (None, None)
+    offer.technologies = [
+        models.OfferTechnology(technology=tech)
+        for tech in sorted(TECHNOLOGY_MATCHER.match(offer.description))
+    ]
+    return offer
+
+def _daily_key(scraped_at, company, location, source) -> tuple:
+    """Primary key of the daily_offer_stats row counting an offer."""
+    return (scraped_at.date(), company or "", location or "", source or "")
+
+def _daily_counts(offers: Iterable[models.JobOffer]) -> Counter:
+    return Counter(
+        _daily_key(offer.scraped_at, offer.company, offer.location, offer.source)
+        for offer in offers if offer.scraped_at
+    )
+
+_WEEKLY_KEY = ("technology", "week_start")
+_DAILY_KEY = ("day", "company", "location", "source")
+
+def _add_counts(db: Session, model, key_columns: tuple, counts: Counter):
+    """
+    Adds `counts` (primary key tuple -> offers) to a rollup table.
+
+    A single atomic upsert (ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT
+    on SQLite), so concurrent ingests neither lose increments nor collide
+    inserting the same new row. Keys are sorted so that concurrent
+    transactions lock rows in the same order.
+    """
+    if not counts:
+        return
+    rows = [dict(zip(key_columns, key), offer_count=count) for key, count in sorted(counts.items())]
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(offer_count=table.c.offer_count + statement.inserted.offer_count)
+    else:
+        statement = sqlite_insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={"offer_count": table.c.offer_count + statement.excluded.offer_count},
+        )
+    db.execute(statement)
+
+def _subtract_counts(db: Session, model, key_columns: tuple, counts: Counter):
+    """Subtracts `counts` from a rollup table in place, deleting rows that reach zero."""
+    table = model.__table__
+    for key, count in sorted(counts.items()):
+        matches_key = and_(*(table.c[column] == value for column, value in zip(key_columns, key)))
+        db.execute(table.update().where(matches_key).values(offer_count=table.c.offer_count - count))
+        db.execute(table.delete().where(matches_key, table.c.offer_count <= 0))
+
+# Plain copy of a saved offer, readable after commit without reloading the row
+OfferSnapshot = namedtuple("OfferSnapshot", [
+    "id", "title", "company", "location", "description", "scraped_at",
+    "experience_level", "salary_min", "salary_max", "technologies",
+])
+
+def record_offers(db: Session, offers: List[models.JobOffer]) -> List[OfferSnapshot]:
+    """
+    Updates the rollup tables for offers added in the current transaction.
+
+    Call it once per batch, after the offers were prepared and added and
+    before committing, so the rollups are committed atomically with them.
+    Pass the returned snapshots to `offers_committed` once the commit
+    succeeded.
+
+    Args:
+        db: Database session
+        offers: The prepared offers added in this transaction
+
+    Returns:
+        Snapshots of the offers, with their assigned ids.
+    """
+    db.flush()
+    weekly = Counter(
+        (offer_tech.technology, week_start(offer.scraped_at))
+        for offer in offers
+        for offer_tech in offer.technologies
+    )
+    _add_counts(db, models.TechnologyWeeklyCount, _WEEKLY_KEY, weekly)
+    _add_counts(db, models.DailyOfferStat, _DAILY_KEY, _daily_counts(offers))
+
+    return [
+        OfferSnapshot(
+            offer.id, offer.title, offer.company, offer.location, offer.description, offer.scraped_at,
+            offer.experience_level, offer.salary_min, offer.salary_max,
+            tuple(offer_tech.technology for offer_tech in offer.technologies),
+        )
+        for offer in offers
+    ]
+
+def forget_offers(db: Session, offers: List[models.JobOffer]):
+    """
+    Removes offers deleted in the current transaction from the daily rollup.
+
+    The weekly technology rollup is left as is: it is the history of what
+    was ingested each week, which trends keep after old offers are cleaned up.
+
+    Call it before committing the deletion, like `record_offers`.
+    """
+    _subtract_counts(db, models.DailyOfferStat, _DAILY_KEY, _daily_counts(offers))
+
+def offers_committed(snapshots: Iterable[OfferSnapshot]):
+    """Updates the in-memory indexes with offers whose transaction was committed."""
+    snapshots = list(snapshots)
+    # Indexes that are still building queue the update and replay it after their scan
+    if offer_index.accepts_updates:
+        for offer in snapshots:
+            offer_index.add(offer.id, offer.title, offer.company, offer.description)
+    if facet_index.accepts_updates:
+        facet_index.add(snapshots)
+    offer_sketches.add(snapshots)
+
+def offers_deleted(offer_ids: Iterable[int]):
+    """Removes committed deletions from the in-memory indexes."""
+    offer_ids = list(offer_ids)
+    if offer_index.accepts_updates:
+        offer_index.remove(offer_ids)
+    if facet_index.accepts_updates:
+        facet_index.remove(offer_ids)
+    # Sketches cannot subtract; they are rebuilt by the next periodic sync
+    offer_sketches.invalidate()
+
+def backfill_offer_technologies(db: Session, batch_size: int = 1000):
+    """
+    Rebuilds the offer_technologies table from the stored descriptions.
+
+    Offers are read in primary-key batches so memory stays bounded. The
+    old rows are deleted and the new ones inserted in a single transaction,
+    so readers keep seeing the previous tags until it commits.
+
+    Args:
+        db: Database session
+        batch_size: Number of offers processed per batch
+
+    Returns:
+        The number of offers processed.
+    """
+    logger.info("🔄 Rebuilding offer_technologies from job descriptions...")
+    db.query(models.OfferTechnology).delete(synchronize_session=False)
+
+    processed = 0
+    for chunk in iter_offer_chunks(db, models.JobOffer.description, chunk_size=batch_size):
+        rows = [
+            {"offer_id": offer_id, "technology": tech}
+            for offer_id, description in chunk
+            for tech in TECHNOLOGY_MATCHER.match(description)
+        ]
+        if rows:
+            db.bulk_insert_mappings(models.OfferTechnology, rows)
+
+        processed += len(chunk)
+        logger.info(f"✅ Tagged {processed} offers")
+
+    db.commit()
+    bump_data_version()
+    return processed
+
+def backfill_experience_levels(db: Session, batch_size: int = 1000):
+    """
+    Classifies the experience level of every stored offer from its title.
+
+    Args:
+        db: Database session
+        batch_size: Number of offers processed per batch
+
+    Returns:
+        The number of offers processed.
+    """
+    logger.info("🔄 Classifying experience levels of stored offers...")
+    processed = 0
+    for chunk in iter_offer_chunks(db, models.JobOffer.title, chunk_size=batch_size):
+        db.bulk_update_mappings(models.JobOffer, [
+            {"id": offer_id, "experience_level": classify_experience_level(title)}
+            for offer_id, title in chunk
+        ])
+        db.commit()
+        processed += len(chunk)
+        logger.info(f"✅ Classified {processed} offers")
+
+    bump_data_version()
+    return processed
+
+def backfill_salaries(db: Session, batch_size: int = 1000):
+    """
+    Extracts salaries mentioned in the descriptions of stored offers.
+
+    Only offers without a salary are updated; salaries parsed from the
+    listing's salary field at scrape time are kept.
+
+    Args:
+        db: Database session
+        batch_size: Number of offers processed per batch
+
+    Returns:
+        The number of offers processed.
+    """
+    logger.info("🔄 Extracting salaries from stored descriptions...")
+    processed = 0
+    for chunk in iter_offer_chunks(db, models.JobOffer.description, models.JobOffer.salary_min, chunk_size=batch_size):
+        updates = []
+        for offer_id, description, salary_min in chunk:
+            salary = None if salary_min is not None else extract_salary_from_description(description)
+            if salary:
+                updates.append({"id": offer_id, "salary_min": salary[0], "salary_max": salary[1]})
+        if updates:
+            db.bulk_update_mappings(models.JobOffer, updates)
+        db.commit()
+        processed += len(chunk)
+        logger.info(f"✅ Checked {processed} offers for salaries")
+
+    bump_data_version()
+    return processed
+
+def rebuild_technology_trends(db: Session, batch_size: int = 1000):
+    """
+    Rebuilds the technology_weekly_counts rollup from offer_technologies.
+
+    Run `backfill_offer_technologies` first if offers were never tagged.
+
+    Args:
+        db: Database session
+        batch_size: Number of offers processed per batch
+
+    Returns:
+        The number of offers processed.
+    """
+    logger.info("🔄 Rebuilding technology_weekly_counts...")
+    weekly = Counter()
+    processed = 0
+    for chunk in iter_offer_chunks(db, models.JobOffer.scraped_at, chunk_size=batch_size):
+        weeks = {offer_id: week_start(scraped_at) for offer_id, scraped_at in chunk if scraped_at}
+        tagged = db.query(
+            models.OfferTechnology.offer_id,
+            models.OfferTechnology.technology
+        ).filter(
+            models.OfferTechnology.offer_id.in_(list(weeks))
+        ).all()
+        weekly.update((tech, weeks[offer_id]) for offer_id, tech in tagged)
+        processed += len(chunk)
+
+    db.query(models.TechnologyWeeklyCount).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.TechnologyWeeklyCount, [
+        {"technology": tech, "week_start": week, "offer_count": count}
+        for (tech, week), count in weekly.items()
+    ])
+    db.commit()
+    bump_data_version()
+    logger.info(f"✅ Rolled up {processed} offers into {len(weekly)} technology-weeks")
+    return processed
+
+def rebuild_daily_offer_stats(db: Session, batch_size: int = 1000):
+    """
+    Rebuilds the daily_offer_stats rollup from the offers table.
+
+    Args:
+        db: Database session
+        batch_size: Number of offers processed per batch
+
+    Returns:
+        The number of offers processed.
+    """
+    logger.info("🔄 Rebuilding daily_offer_stats...")
+    daily = Counter()
+    processed = 0
+    for chunk in iter_offer_chunks(
+        db, models.JobOffer.scraped_at, models.JobOffer.company, models.JobOffer.location, models.JobOffer.source,
+        chunk_size=batch_size
+    ):
+        daily.update(_daily_key(*row[1:]) for row in chunk if row.scraped_at)
+        processed += len(chunk)
+
+    db.query(models.DailyOfferStat).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.DailyOfferStat, [
+        {"day": day, "company": company, "location": location, "source": source, "offer_count": count}
+        for (day, company, location, source), count in daily.items()
+    ])
+    db.commit()
+    bump_data_version()
+    logger.info(f"✅ Rolled up {processed} offers into {len(daily)} daily rows")
+    return processed
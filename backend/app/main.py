@@ -1,14 +1,19 @@
 
 import logging
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
 import json
 
-from . import models, schemas, scraper, analyzer
-from .database import engine, get_db
+from . import models, schemas, scraper, analyzer, search, pagination, trigram, dashboard, conditional, sketches
+from .cache import analysis_cache, cached, search_count_cache, search_result_cache
+from .config import settings
+from .database import SessionLocal, engine, get_db, upgrade_schema
+from .facets import FACETS, facet_counts, facet_index
+from .search_index import offer_index, relevance_page
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +23,8 @@ logger = logging.getLogger(__name__)
 
 # Create the database tables if they don't exist on startup.
 models.Base.metadata.create_all(bind=engine)
+upgrade_schema(engine, models.Base.metadata)
+search.setup_fulltext(engine)
 
 app = FastAPI(
     title="Job Market Analyzer API",
@@ -25,15 +32,76 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Add CORS middleware for frontend
+# Answer unchanged dashboard/analytics polls with 304 Not Modified
+app.middleware("http")(conditional.conditional_get)
+
+# Add CORS middleware for frontend (added last so it also wraps 304 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Last-Updated", "X-Next-Cursor"],
 )
 
+def _build_search_indexes():
+    """Loads every stored offer into the in-memory relevance and facet indexes."""
+    db = SessionLocal()
+    try:
+        offer_index.build(db)
+        facet_index.build(db)
+    except Exception as e:
+        logger.error(f"❌ Error building search indexes: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_search_indexes():
+    """
+    Builds the search indexes in the background; until they are ready,
+    relevance sorting and facet counts fall back to database queries.
+
+    They are rebuilt every SEARCH_INDEX_REBUILD_SECONDS so that offers
+    written by other processes (scripts, other workers) show up.
+    """
+    if settings.SEARCH_INDEX_ENABLED:
+        dashboard.scheduler.add_job(
+            _build_search_indexes, "interval", seconds=settings.SEARCH_INDEX_REBUILD_SECONDS,
+            id="search-index-rebuild", next_run_time=datetime.now(),
+            max_instances=1, coalesce=True, replace_existing=True,
+        )
+        if not dashboard.scheduler.running:
+            dashboard.scheduler.start()
+
+@app.on_event("startup")
+def start_dashboard_refresher():
+    """Keeps an in-memory dashboard snapshot, rebuilt on a timer and after scrapes."""
+    if settings.DASHBOARD_SNAPSHOT_ENABLED:
+        dashboard.start_refresher()
+
+@app.on_event("startup")
+def start_sketch_persister():
+    """Loads the company/location sketches and saves them periodically."""
+    if settings.SKETCHES_ENABLED:
+        sketches.start_persister(dashboard.scheduler)
+
+@app.on_event("shutdown")
+def stop_dashboard_refresher():
+    dashboard.stop_refresher()
+
+@app.on_event("shutdown")
+def close_scraper():
+    scraper.close_engine()
+
+@app.on_event("shutdown")
+def stop_analysis_workers():
+    analyzer.shutdown_process_pools()
+
+def _snapshot_headers(response: Response, snapshot: dashboard.DashboardSnapshot):
+    """Reports when the dashboard snapshot serving a response was built."""
+    response.headers["X-Last-Updated"] = snapshot.last_updated.isoformat()
+
 # --- API Endpoints ---
 
 @app.get("/", tags=["Root"], summary="Root endpoint of the API")
@@ -54,29 +122,62 @@ def trigger_scraping(pages: int = 1, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Number of pages must be between 1 and 10 for this demo.")
     
     result = scraper.scrape_job_offers(db=db, pages=pages)
+    if result.get("new_offers"):
+        dashboard.request_refresh()
     return result
 
 @app.get("/stats/technologies/", response_model=List[schemas.TechnologyStat], tags=["Statistics"], summary="Get technology demand statistics")
-def get_technology_stats(db: Session = Depends(get_db)):
+def get_technology_stats(response: Response, db: Session = Depends(get_db)):
     """
     Analyzes the stored job offers and returns a ranked list of the most in-demand technologies.
     """
-    stats = analyzer.analyze_technology_demand(db=db)
+    snapshot = dashboard.current_snapshot()
+    if snapshot is not None:
+        _snapshot_headers(response, snapshot)
+        return snapshot.technologies
+    stats = analyzer.technology_demand(db=db)
     if not stats:
         return []
     return stats
 
 @app.get("/offers/", response_model=List[schemas.JobOffer], tags=["Job Offers"], summary="Get all scraped job offers")
-def get_all_offers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_all_offers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    sort_by: str = None,  # scraped_at, title, company, location
+    sort_order: str = "desc",  # asc, desc
+    cursor: str = None,
+    db: Session = Depends(get_db)
+):
     """
     Retrieves a list of all job offers currently stored in the database.
 
-    - **skip**: Number of records to skip (for pagination).
+    - **skip**: Number of records to skip (for pagination); ignored with `cursor`.
     - **limit**: Maximum number of records to return.
+    - **sort_by**: Field to sort by (default: id, i.e. insertion order).
+    - **sort_order**: Sort order (asc/desc) when `sort_by` is given.
+    - **cursor**: Token from the `X-Next-Cursor` header of the previous page.
+      Cursor pages start with an index seek instead of skipping rows.
     """
-    offers = db.query(models.JobOffer).offset(skip).limit(limit).all()
+    sort_by, sort_order = _keyset_sort(sort_by or "id", sort_order if sort_by else "asc")
+    try:
+        offers, next_cursor = pagination.keyset_page(
+            db.query(models.JobOffer), sort_by, sort_order, limit, cursor, skip=skip
+        )
+    except pagination.InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return offers
 
+def _keyset_sort(sort_by: str, sort_order: str):
+    """Validates the sort used for cursor pagination."""
+    if sort_by not in pagination.SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Cursor pagination cannot sort by '{sort_by}'.")
+    return sort_by, "asc" if sort_order == "asc" else "desc"
+
 @app.get("/offers/search/", response_model=schemas.SearchResponse, tags=["Job Offers"], summary="Advanced search for job offers")
 def advanced_search_offers(
     q: str = None,
@@ -87,76 +188,193 @@ def advanced_search_offers(
     max_salary: float = None,
     job_type: str = None,  # full-time, part-time, contract, remote
     experience_level: str = None,  # junior, mid, senior, lead
-    sort_by: str = "scraped_at",  # scraped_at, title, company, location
+    sort_by: str = "scraped_at",  # scraped_at, title, company, location, relevance
     sort_order: str = "desc",  # asc, desc
     skip: int = 0,
     limit: int = 20,
+    cursor: str = None,
+    count: str = "exact",  # exact, cached, estimated
+    facets: List[str] = Query(None),  # company, location, technology
+    facet_limit: int = 10,
     db: Session = Depends(get_db)
 ):
     """
     Advanced search for job offers with multiple filters and sorting options.
     
     - **q**: General search term (searches in title, description, company)
-    - **company**: Filter by specific company
-    - **location**: Filter by location
+    - **company**: Filter by company (accent-insensitive, tolerates typos)
+    - **location**: Filter by location (accent-insensitive, tolerates typos)
     - **technology**: Filter by technology mentioned
-    - **min_salary**: Minimum salary filter
-    - **max_salary**: Maximum salary filter
+    - **min_salary**: Minimum monthly salary in COP (offers paying at least this)
+    - **max_salary**: Maximum monthly salary in COP (offers paying at most this)
     - **job_type**: Filter by job type
     - **experience_level**: Filter by experience level
-    - **sort_by**: Field to sort by
+    - **sort_by**: Field to sort by (`relevance` ranks full-text matches of `q`)
     - **sort_order**: Sort order (asc/desc)
     - **skip**: Number of records to skip
     - **limit**: Maximum number of records to return
-    """
+    - **cursor**: `next_cursor` of the previous page; replaces `skip` with an index seek
+    - **count**: How `total` is computed: `exact`, `cached` (short TTL per filter set)
+      or `estimated` (capped; `total_is_lower_bound` marks "N+")
+    - **facets**: Facets to count over all matching offers (repeatable):
+      `company`, `location`, `technology`
+    - **facet_limit**: Number of values returned per facet
+    """
+    if count not in pagination.COUNT_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(pagination.COUNT_STRATEGIES)}.")
+    if set(facets or []) - set(FACETS):
+        raise HTTPException(status_code=400, detail=f"facets must be among {', '.join(FACETS)}.")
+    if facet_limit < 1:
+        raise HTTPException(status_code=400, detail="facet_limit must be at least 1.")
+    
+    fingerprint = (
+        _filters_key(q, company, location, technology, experience_level, min_salary, max_salary),
+        sort_by, sort_order, None if cursor else skip, limit, cursor, count,
+        tuple(sorted(set(facets))) if facets else (), facet_limit if facets else None,
+    )
+    # Identical searches are served from memory until the next ingest commit
+    return search_result_cache.get_or_compute(fingerprint, lambda: schemas.SearchResponse.model_validate(_search_offers(
+        db, q, company, location, technology, min_salary, max_salary, experience_level,
+        sort_by, sort_order, skip, limit, cursor, count, facets, facet_limit
+    )))
+
+def _filters_key(q, company, location, technology, experience_level, min_salary, max_salary) -> tuple:
+    """Normalized search filters; searches with equal keys match the same offers."""
+    return (
+        (q or "").strip().lower(), (company or "").lower(), (location or "").lower(),
+        (technology or "").lower(), (experience_level or "").lower(), min_salary, max_salary
+    )
+
+def _search_offers(
+    db: Session, q, company, location, technology, min_salary, max_salary, experience_level,
+    sort_by, sort_order, skip, limit, cursor, count, facets, facet_limit
+) -> dict:
+    """Runs an advanced search; see `advanced_search_offers` for the parameters."""
     query = db.query(models.JobOffer)
+    relevance = None
     
     # Apply filters
-    if q:
-        search_term = f"%{q.lower()}%"
-        query = query.filter(
-            db.or_(
-                models.JobOffer.title.ilike(search_term),
-                models.JobOffer.description.ilike(search_term),
-                models.JobOffer.company.ilike(search_term)
-            )
-        )
-    
+    # Company and location are fuzzy: resolved to exact stored values, then an IN lookup
+    company_values = trigram.resolve_filter(db, "company", company) if company else None
     if company:
-        query = query.filter(models.JobOffer.company.ilike(f"%{company}%"))
+        query = query.filter(models.JobOffer.company.in_(company_values))
     
+    location_values = trigram.resolve_filter(db, "location", location) if location else None
     if location:
-        query = query.filter(models.JobOffer.location.ilike(f"%{location}%"))
+        query = query.filter(models.JobOffer.location.in_(location_values))
     
     if technology:
-        query = query.filter(models.JobOffer.description.ilike(f"%{technology}%"))
+        known_technology = next(
+            (tech for tech in analyzer.TECHNOLOGIES if tech.lower() == technology.lower()), None
+        )
+        if known_technology:
+            # Technologies are tagged at ingest, so this is an indexed lookup
+            query = query.filter(models.JobOffer.id.in_(
+                db.query(models.OfferTechnology.offer_id).filter(
+                    models.OfferTechnology.technology == known_technology
+                )
+            ))
+        else:
+            query, _ = search.get_search_backend(db).filter(query, technology)
+    
+    if experience_level:
+        query = query.filter(models.JobOffer.experience_level == experience_level.lower())
+    
+    # Salary ranges are monthly COP; both bounds are index range scans
+    if min_salary is not None:
+        query = query.filter(models.JobOffer.salary_min >= min_salary)
+    
+    if max_salary is not None:
+        query = query.filter(models.JobOffer.salary_max <= max_salary)
+    
+    # Filters other than q, for ranking q in memory
+    unranked_query = query
+    filtered = any(value not in (None, "") for value in (
+        company, location, technology, experience_level, min_salary, max_salary
+    ))
+    
+    if q:
+        query, relevance = search.get_search_backend(db).filter(query, q)
+    
+    filters_key = _filters_key(q, company, location, technology, experience_level, min_salary, max_salary)
+    total_count, total_is_lower_bound = pagination.count_results(query, count, filters_key)
+    facet_values = None
+    if facets:
+        facet_values = facet_counts(db, query, facets, {
+            "q": q, "company": company_values, "location": location_values, "technology": technology,
+            "experience_level": experience_level, "min_salary": min_salary, "max_salary": max_salary,
+        }, limit=facet_limit)
+    
+    # Cursor pagination: seek past the last row of the previous page
+    if cursor:
+        sort_by, sort_order = _keyset_sort(sort_by, sort_order)
+        try:
+            offers, next_cursor = pagination.keyset_page(query, sort_by, sort_order, limit, cursor)
+        except pagination.InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "offers": offers,
+            "total": total_count,
+            "page": None,
+            "pages": (total_count + limit - 1) // limit,
+            "has_next": next_cursor is not None,
+            "has_prev": True,
+            "next_cursor": next_cursor,
+            "count_strategy": count,
+            "total_is_lower_bound": total_is_lower_bound,
+            "facets": facet_values
+        }
+    
+    # Best matches first: ranked by the in-memory BM25 index once it is built
+    page = None
+    if sort_by == "relevance" and q and offer_index.ready and sort_order != "asc":
+        page = relevance_page(unranked_query, q, skip, limit, filtered)
+    if page is not None:
+        offers, has_next = page
+        return {
+            "offers": offers,
+            "total": total_count,
+            "page": (skip // limit) + 1,
+            "pages": (total_count + limit - 1) // limit,
+            "has_next": has_next,
+            "has_prev": skip > 0,
+            "next_cursor": None,
+            "count_strategy": count,
+            "total_is_lower_bound": total_is_lower_bound,
+            "facets": facet_values
+        }
     
     # Apply sorting
-    if sort_by == "title":
-        order_column = models.JobOffer.title
-    elif sort_by == "company":
-        order_column = models.JobOffer.company
-    elif sort_by == "location":
-        order_column = models.JobOffer.location
+    keyset_sort = not (sort_by == "relevance" and relevance is not None)
+    if keyset_sort:
+        if sort_by not in pagination.SORT_COLUMNS or sort_by == "id":
+            sort_by = "scraped_at"
+        sort_order = "asc" if sort_order == "asc" else "desc"
+        query = pagination.order_by_keyset(query, sort_by, sort_order)
     else:
-        order_column = models.JobOffer.scraped_at
+        query = query.order_by(relevance.asc() if sort_order == "asc" else relevance.desc())
     
-    if sort_order == "asc":
-        query = query.order_by(order_column.asc())
-    else:
-        query = query.order_by(order_column.desc())
+    # Apply pagination, fetching one extra row so has_next never depends on the count
+    offers = query.offset(skip).limit(limit + 1).all()
+    has_next = len(offers) > limit
+    offers = offers[:limit]
     
-    # Apply pagination
-    total_count = query.count()
-    offers = query.offset(skip).limit(limit).all()
+    # Relevance scores are not stable sort keys, so only column sorts get a cursor
+    next_cursor = None
+    if keyset_sort and has_next and offers:
+        next_cursor = pagination.encode_cursor(sort_by, sort_order, offers[-1])
     
     return {
         "offers": offers,
         "total": total_count,
         "page": (skip // limit) + 1,
         "pages": (total_count + limit - 1) // limit,
-        "has_next": skip + limit < total_count,
-        "has_prev": skip > 0
+        "has_next": has_next,
+        "has_prev": skip > 0,
+        "next_cursor": next_cursor,
+        "count_strategy": count,
+        "total_is_lower_bound": total_is_lower_bound,
+        "facets": facet_values
     }
 
 # --- Premium Dashboard Endpoints ---
@@ -165,135 +383,118 @@ def advanced_search_offers(
 def get_dashboard_stats(db: Session = Depends(get_db)):
     """
     Get comprehensive dashboard statistics including total offers, companies, and trends.
+
+    Served from the background-refreshed snapshot; `last_updated` is when it was built.
     """
+    snapshot = dashboard.current_snapshot()
+    if snapshot is not None:
+        return snapshot.stats
     try:
-        # Total offers
-        total_offers = db.query(models.JobOffer).count()
-        
-        # Unique companies
-        unique_companies = db.query(models.JobOffer.company).distinct().count()
-        
-        # Recent offers (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_offers = db.query(models.JobOffer).filter(
-            models.JobOffer.scraped_at >= week_ago
-        ).count()
-        
-        # Technology count
-        tech_stats = analyzer.analyze_technology_demand(db=db)
-        unique_technologies = len(tech_stats)
-        
-        # Monthly trend (last 6 months)
-        monthly_data = []
-        for i in range(6):
-            month_start = datetime.now().replace(day=1) - timedelta(days=30*i)
-            month_end = month_start.replace(day=28) + timedelta(days=4)
-            month_end = month_end.replace(day=1) - timedelta(days=1)
-            
-            month_offers = db.query(models.JobOffer).filter(
-                models.JobOffer.scraped_at >= month_start,
-                models.JobOffer.scraped_at <= month_end
-            ).count()
-            
-            monthly_data.append({
-                "month": month_start.strftime("%b"),
-                "offers": month_offers
-            })
-        
-        monthly_data.reverse()
-        
-        return {
-            "total_offers": total_offers,
-            "unique_companies": unique_companies,
-            "recent_offers": recent_offers,
-            "unique_technologies": unique_technologies,
-            "monthly_trend": monthly_data,
-            "last_updated": datetime.now().isoformat()
-        }
+        return dashboard.compute_stats(db)
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving dashboard statistics")
 
 @app.get("/dashboard/recent-activity/", tags=["Dashboard"], summary="Get recent job activity")
-def get_recent_activity(db: Session = Depends(get_db)):
+def get_recent_activity(response: Response, db: Session = Depends(get_db)):
     """
     Get recent job offers activity for the dashboard.
     """
+    snapshot = dashboard.current_snapshot()
+    if snapshot is not None:
+        _snapshot_headers(response, snapshot)
+        return dashboard.format_activity(snapshot.recent_offers)
     try:
         # Get recent offers (last 10)
-        recent_offers = db.query(models.JobOffer).order_by(
-            models.JobOffer.scraped_at.desc()
-        ).limit(10).all()
-        
-        activity = []
-        for offer in recent_offers:
-            time_diff = datetime.now() - offer.scraped_at
-            if time_diff.days > 0:
-                time_ago = f"{time_diff.days}d ago"
-            elif time_diff.seconds > 3600:
-                time_ago = f"{time_diff.seconds // 3600}h ago"
-            else:
-                time_ago = f"{time_diff.seconds // 60}m ago"
-            
-            activity.append({
-                "company": offer.company or "Unknown",
-                "position": offer.title,
-                "time": time_ago,
-                "url": offer.url
-            })
-        
-        return activity
+        return dashboard.format_activity(dashboard.recent_offers(db, limit=10))
     except Exception as e:
         logger.error(f"Error getting recent activity: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving recent activity")
 
+# Widgets of /dashboard/bundle/, as functions of a database session
+DASHBOARD_WIDGETS = {
+    "stats": lambda db: get_dashboard_stats(db=db),
+    "recent_activity": lambda db: get_recent_activity(response=Response(), db=db),
+    "company_stats": lambda db: get_company_stats(date_from=None, date_to=None, db=db),
+    "location_stats": lambda db: get_location_stats(date_from=None, date_to=None, db=db),
+    "experience": lambda db: get_experience_analysis(db=db),
+    "insights": lambda db: get_market_insights(db=db),
+    "notifications": lambda db: get_recent_notifications(db=db),
+}
+
+@app.get("/dashboard/bundle/", tags=["Dashboard"], summary="Get several dashboard widgets in one call")
+def get_dashboard_bundle(widgets: List[str] = Query(None), db: Session = Depends(get_db)):
+    """
+    Computes the requested dashboard and analytics widgets concurrently and
+    returns them in one response.
+
+    - **widgets**: Widgets to include (repeatable, default: all):
+      stats, recent_activity, company_stats, location_stats, experience,
+      insights, notifications
+
+    Widgets that fail are reported under `errors` instead of failing the bundle.
+    """
+    names = widgets or list(DASHBOARD_WIDGETS)
+    unknown = set(names) - set(DASHBOARD_WIDGETS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown widgets: {', '.join(sorted(unknown))}")
+
+    # Shared by stats, insights and notifications: compute it once up front
+    if {"insights", "notifications"} & set(names) or ("stats" in names and dashboard.current_snapshot() is None):
+        analyzer.technology_demand(db=db)
+
+    results, errors = dashboard.compute_widgets(
+        {name: DASHBOARD_WIDGETS[name] for name in names}, SessionLocal
+    )
+    return {"widgets": results, "errors": errors}
+
+def _check_day_range(date_from: Optional[date], date_to: Optional[date]):
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'.")
+
 @app.get("/analytics/company-stats/", tags=["Analytics"], summary="Get company statistics")
-def get_company_stats(db: Session = Depends(get_db)):
+@cached("company_stats")
+def get_company_stats(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
     """
     Get statistics grouped by company.
+
+    - **from** / **to**: First and last scrape day counted (optional, inclusive)
+
+    Summed from the daily_offer_stats rollup, so the counts are exact.
     """
+    _check_day_range(date_from, date_to)
     try:
-        # Get companies with offer counts
-        company_stats = db.query(
-            models.JobOffer.company,
-            db.func.count(models.JobOffer.id).label('offer_count')
-        ).filter(
-            models.JobOffer.company.isnot(None)
-        ).group_by(
-            models.JobOffer.company
-        ).order_by(
-            db.func.count(models.JobOffer.id).desc()
-        ).limit(20).all()
-        
         return [
             {"company": company, "offer_count": count}
-            for company, count in company_stats
+            for company, count in analyzer.rollup_top_values(db, "company", date_from, date_to, limit=20)
         ]
     except Exception as e:
         logger.error(f"Error getting company stats: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving company statistics")
 
 @app.get("/analytics/location-stats/", tags=["Analytics"], summary="Get location statistics")
-def get_location_stats(db: Session = Depends(get_db)):
+@cached("location_stats")
+def get_location_stats(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db)
+):
     """
     Get statistics grouped by location.
+
+    - **from** / **to**: First and last scrape day counted (optional, inclusive)
+
+    Summed from the daily_offer_stats rollup, so the counts are exact.
     """
+    _check_day_range(date_from, date_to)
     try:
-        # Get locations with offer counts
-        location_stats = db.query(
-            models.JobOffer.location,
-            db.func.count(models.JobOffer.id).label('offer_count')
-        ).filter(
-            models.JobOffer.location.isnot(None)
-        ).group_by(
-            models.JobOffer.location
-        ).order_by(
-            db.func.count(models.JobOffer.id).desc()
-        ).limit(15).all()
-        
         return [
             {"location": location, "offer_count": count}
-            for location, count in location_stats
+            for location, count in analyzer.rollup_top_values(db, "location", date_from, date_to, limit=15)
         ]
     except Exception as e:
         logger.error(f"Error getting location stats: {e}")
@@ -305,48 +506,41 @@ def get_salary_trends(db: Session = Depends(get_db)):
     Analyze salary trends by technology and experience level.
     """
     try:
-        # This would require salary data in the database
-        # For now, return mock data structure
-        return {
-            "average_salaries": {
-                "Python": {"junior": 3000000, "mid": 4500000, "senior": 6500000},
-                "React": {"junior": 2800000, "mid": 4200000, "senior": 6000000},
-                "Java": {"junior": 3200000, "mid": 4800000, "senior": 7000000},
-            },
-            "trends": [
-                {"month": "Jan", "avg_salary": 4200000},
-                {"month": "Feb", "avg_salary": 4350000},
-                {"month": "Mar", "avg_salary": 4500000},
-            ]
-        }
+        return analyzer.salary_trends(db=db)
     except Exception as e:
         logger.error(f"Error getting salary trends: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving salary trends")
 
 @app.get("/analytics/experience-analysis/", tags=["Analytics"], summary="Get experience level analysis")
+@cached("experience_analysis")
 def get_experience_analysis(db: Session = Depends(get_db)):
     """
     Analyze job offers by experience level requirements.
     """
     try:
-        # Analyze job titles for experience levels
-        junior_keywords = ["junior", "jr", "entry", "trainee", "intern"]
-        senior_keywords = ["senior", "sr", "lead", "principal", "architect"]
-        
-        total_offers = db.query(models.JobOffer).count()
-        
-        junior_count = 0
-        senior_count = 0
-        mid_count = 0
-        
-        for offer in db.query(models.JobOffer).all():
-            title_lower = offer.title.lower()
-            if any(keyword in title_lower for keyword in senior_keywords):
-                senior_count += 1
-            elif any(keyword in title_lower for keyword in junior_keywords):
-                junior_count += 1
+        # Experience levels are classified at ingest time, so this is one GROUP BY
+        level_counts = dict.fromkeys(analyzer.EXPERIENCE_LEVELS, 0)
+        unclassified = 0
+        for level, count in db.query(
+            models.JobOffer.experience_level,
+            func.count(models.JobOffer.id)
+        ).group_by(models.JobOffer.experience_level).all():
+            if level in level_counts:
+                level_counts[level] += count
             else:
-                mid_count += 1
+                unclassified += count
+
+        # Offers stored before the backfill ran are classified on the fly
+        if unclassified:
+            for (title,) in db.query(models.JobOffer.title).filter(
+                models.JobOffer.experience_level.is_(None)
+            ).all():
+                level_counts[analyzer.classify_experience_level(title)] += 1
+
+        total_offers = sum(level_counts.values())
+        junior_count = level_counts["junior"]
+        mid_count = level_counts["mid"]
+        senior_count = level_counts["senior"]
         
         return {
             "total_offers": total_offers,
@@ -367,7 +561,52 @@ def get_experience_analysis(db: Session = Depends(get_db)):
         logger.error(f"Error getting experience analysis: {e}")
         raise HTTPException(status_code=500, detail="Error retrieving experience analysis")
 
+@app.get("/analytics/technology-trends/", tags=["Analytics"], summary="Get weekly technology demand trends")
+def get_technology_trends(
+    technology: List[str] = Query(None),
+    weeks: int = 12,
+    db: Session = Depends(get_db)
+):
+    """
+    Weekly number of offers mentioning each technology, with growth rates.
+
+    - **technology**: Technologies to include (repeatable, default: all)
+    - **weeks**: Number of ISO weeks to return, ending with the current week
+    """
+    if not 1 <= weeks <= 104:
+        raise HTTPException(status_code=400, detail="weeks must be between 1 and 104.")
+    try:
+        return analyzer.technology_trends(
+            db=db, weeks=weeks, technologies=tuple(technology) if technology else None
+        )
+    except Exception as e:
+        logger.error(f"Error getting technology trends: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving technology trends")
+
+@app.get("/analytics/tech-cooccurrence/", tags=["Analytics"], summary="Get technologies that appear together")
+def get_tech_cooccurrence(
+    limit: int = 20,
+    min_count: int = 1,
+    technology: str = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Technology pairs that are requested together in the same offers.
+
+    - **limit**: Maximum number of pairs to return
+    - **min_count**: Minimum number of offers a pair must share
+    - **technology**: Only return pairs involving this technology
+    """
+    try:
+        return analyzer.technology_cooccurrence(
+            db=db, limit=limit, min_count=min_count, technology=technology
+        )
+    except Exception as e:
+        logger.error(f"Error getting technology co-occurrence: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving technology co-occurrence")
+
 @app.get("/analytics/market-insights/", tags=["Analytics"], summary="Get market insights and trends")
+@cached("market_insights")
 def get_market_insights(db: Session = Depends(get_db)):
     """
     Get comprehensive market insights including growth trends and predictions.
@@ -388,9 +627,19 @@ def get_market_insights(db: Session = Depends(get_db)):
         
         growth_rate = ((recent_offers - previous_offers) / previous_offers * 100) if previous_offers > 0 else 0
         
-        # Get top growing technologies
-        tech_stats = analyzer.analyze_technology_demand(db=db)
+        # Get top technologies and their growth over the last 8 weeks
+        tech_stats = analyzer.technology_demand(db=db)
         top_techs = tech_stats[:5] if tech_stats else []
+        trends = analyzer.technology_trends(
+            db=db, weeks=8, technologies=tuple(tech["technology"] for tech in top_techs)
+        )
+        growth = {trend["technology"]: trend["growth_rate"] for trend in trends["technologies"]}
+
+        def tech_trend(technology):
+            rate = growth.get(technology)
+            if rate is None:
+                return "stable"
+            return "rising" if rate > 10 else "falling" if rate < -10 else "stable"
         
         return {
             "market_growth": {
@@ -401,9 +650,10 @@ def get_market_insights(db: Session = Depends(get_db)):
             },
             "hot_technologies": [
                 {
-                    "technology": tech.technology,
-                    "demand_score": tech.percentage,
-                    "trend": "rising" if tech.percentage > 20 else "stable"
+                    "technology": tech["technology"],
+                    "demand_score": tech["percentage"],
+                    "growth_rate": growth.get(tech["technology"]),
+                    "trend": tech_trend(tech["technology"])
                 }
                 for tech in top_techs
             ],
@@ -476,6 +726,7 @@ def get_alert_jobs(alert_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Error retrieving alert jobs")
 
 @app.get("/notifications/recent/", tags=["Notifications"], summary="Get recent market notifications")
+@cached("recent_notifications")
 def get_recent_notifications(db: Session = Depends(get_db)):
     """
     Get recent market notifications and updates.
@@ -497,13 +748,13 @@ def get_recent_notifications(db: Session = Depends(get_db)):
             })
         
         # Add market insights
-        tech_stats = analyzer.analyze_technology_demand(db=db)
+        tech_stats = analyzer.technology_demand(db=db)
         if tech_stats:
             top_tech = tech_stats[0]
             notifications.append({
                 "type": "market_trend",
-                "title": f"{top_tech.technology} demand is rising",
-                "description": f"{top_tech.technology} is now the most in-demand technology with {top_tech.percentage}% of offers",
+                "title": f"{top_tech['technology']} demand is rising",
+                "description": f"{top_tech['technology']} is now the most in-demand technology with {top_tech['percentage']}% of offers",
                 "timestamp": datetime.now().isoformat(),
                 "priority": "high"
             })
@@ -539,9 +790,13 @@ def export_jobs(
             if "technology" in filter_data:
                 query = query.filter(models.JobOffer.description.ilike(f"%{filter_data['technology']}%"))
             if "company" in filter_data:
-                query = query.filter(models.JobOffer.company.ilike(f"%{filter_data['company']}%"))
+                query = query.filter(models.JobOffer.company.in_(
+                    trigram.resolve_filter(db, "company", filter_data["company"])
+                ))
             if "location" in filter_data:
-                query = query.filter(models.JobOffer.location.ilike(f"%{filter_data['location']}%"))
+                query = query.filter(models.JobOffer.location.in_(
+                    trigram.resolve_filter(db, "location", filter_data["location"])
+                ))
         
         offers = query.all()
         
@@ -592,61 +847,54 @@ def export_jobs(
         raise HTTPException(status_code=500, detail="Error exporting job data")
 
 @app.get("/reports/market-summary/", tags=["Reports"], summary="Generate market summary report")
+@cached("market_report")
 def generate_market_report(
     period: str = "30d",  # 7d, 30d, 90d
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
     db: Session = Depends(get_db)
 ):
     """
     Generate a comprehensive market summary report.
     
-    - **period**: Report period (7d, 30d, 90d)
+    - **period**: Report period (7d, 30d, 90d), ending today
+    - **from** / **to**: First and last scrape day of the report (inclusive, override `period`)
     """
+    _check_day_range(date_from, date_to)
     try:
         # Calculate period
         days = int(period.replace('d', ''))
-        start_date = datetime.now() - timedelta(days=days)
-        
-        # Get offers in period
-        period_offers = db.query(models.JobOffer).filter(
-            models.JobOffer.scraped_at >= start_date
-        ).all()
+        if date_from is None and date_to is None:
+            date_to = date.today()
+            date_from = date_to - timedelta(days=days - 1)
+            period_label = f"in the last {days} days"
+        else:
+            period_label = f"from {date_from or 'the start'} to {date_to or 'today'}"
         
-        # Get technology stats
-        tech_stats = analyzer.analyze_technology_demand(db=db)
+        # Period totals from the daily rollup
+        total_offers, unique_companies, unique_locations = analyzer.rollup_totals(db, date_from, date_to)
         
-        # Get company stats
-        company_stats = db.query(
-            models.JobOffer.company,
-            db.func.count(models.JobOffer.id).label('offer_count')
-        ).filter(
-            models.JobOffer.company.isnot(None),
-            models.JobOffer.scraped_at >= start_date
-        ).group_by(
-            models.JobOffer.company
-        ).order_by(
-            db.func.count(models.JobOffer.id).desc()
-        ).limit(10).all()
+        # Get technology stats for the period
+        tech_stats = analyzer.period_technology_demand(
+            db,
+            start=datetime.combine(date_from, datetime.min.time()) if date_from else None,
+            total_offers=total_offers,
+            end=datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to else None,
+        )
         
-        # Get location stats
-        location_stats = db.query(
-            models.JobOffer.location,
-            db.func.count(models.JobOffer.id).label('offer_count')
-        ).filter(
-            models.JobOffer.location.isnot(None),
-            models.JobOffer.scraped_at >= start_date
-        ).group_by(
-            models.JobOffer.location
-        ).order_by(
-            db.func.count(models.JobOffer.id).desc()
-        ).limit(10).all()
+        # Get company and location stats
+        company_stats = analyzer.rollup_top_values(db, "company", date_from, date_to, limit=10)
+        location_stats = analyzer.rollup_top_values(db, "location", date_from, date_to, limit=10)
         
         return {
             "report_period": period,
+            "from": date_from.isoformat() if date_from else None,
+            "to": date_to.isoformat() if date_to else None,
             "generated_at": datetime.now().isoformat(),
             "summary": {
-                "total_offers": len(period_offers),
-                "unique_companies": len(set(offer.company for offer in period_offers if offer.company)),
-                "unique_locations": len(set(offer.location for offer in period_offers if offer.location)),
+                "total_offers": total_offers,
+                "unique_companies": unique_companies,
+                "unique_locations": unique_locations,
                 "top_technologies": tech_stats[:5] if tech_stats else [],
                 "top_companies": [
                     {"company": company, "offer_count": count}
@@ -658,8 +906,8 @@ def generate_market_report(
                 ]
             },
             "insights": [
-                f"Market shows {len(period_offers)} new opportunities in the last {days} days",
-                f"Top technology demand: {tech_stats[0].technology if tech_stats else 'N/A'}",
+                f"Market shows {total_offers} new opportunities {period_label}",
+                f"Top technology demand: {tech_stats[0]['technology'] if tech_stats else 'N/A'}",
                 f"Most active company: {company_stats[0][0] if company_stats else 'N/A'}",
                 f"Most opportunities in: {location_stats[0][0] if location_stats else 'N/A'}"
             ],
@@ -673,6 +921,17 @@ def generate_market_report(
         logger.error(f"Error generating market report: {e}")
         raise HTTPException(status_code=500, detail="Error generating market report")
 
+@app.get("/cache/stats/", tags=["Health"], summary="Analysis cache statistics")
+def get_cache_stats():
+    """
+    Hit/miss counters of the in-process caches.
+    """
+    return {
+        "analysis": analysis_cache.stats(),
+        "search_count": search_count_cache.stats(),
+        "search_results": search_result_cache.stats()
+    }
+
 @app.get("/health/", tags=["Health"], summary="Health check endpoint")
 def health_check():
     """
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,16 +26,62 @@ class JobOffer(Base):
     __tablename__ = "job_offers"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(500), nullable=False)
-    company = Column(String(255))
-    location = Column(String(255))
+    title = Column(String(500), nullable=False, index=True)
+    company = Column(String(255), index=True)
+    location = Column(String(255), index=True)
     description = Column(Text)
     url = Column(String(1000))
     source = Column(String(100))
-    scraped_at = Column(DateTime, default=datetime.utcnow)
+    scraped_at = Column(DateTime, default=datetime.utcnow, index=True)
+    experience_level = Column(String(20), index=True)  # junior, mid, senior
+    salary_min = Column(Integer)  # Monthly COP
+    salary_max = Column(Integer, index=True)  # Monthly COP
+
+    __table_args__ = (
+        Index("ix_job_offers_salary_range", "salary_min", "salary_max"),
+        # Full-text search on MySQL; SQLite uses an FTS5 table instead (see search.py)
+        Index("ft_job_offers_search", "title", "description", "company", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     # Relationships
     saved_jobs = relationship("SavedJob", back_populates="job_offer")
+    technologies = relationship("OfferTechnology", back_populates="job_offer", cascade="all, delete-orphan")
+
+class OfferTechnology(Base):
+    __tablename__ = "offer_technologies"
+
+    # One row per technology mentioned in an offer, filled in at ingest time
+    offer_id = Column(Integer, ForeignKey("job_offers.id", ondelete="CASCADE"), primary_key=True)
+    technology = Column(String(50), primary_key=True, index=True)
+
+    # Relationships
+    job_offer = relationship("JobOffer", back_populates="technologies")
+
+class TechnologyWeeklyCount(Base):
+    __tablename__ = "technology_weekly_counts"
+
+    # Rollup of offers mentioning a technology per ISO week (weeks start on Monday)
+    technology = Column(String(50), primary_key=True)
+    week_start = Column(Date, primary_key=True, index=True)
+    offer_count = Column(Integer, nullable=False, default=0)
+
+class DailyOfferStat(Base):
+    __tablename__ = "daily_offer_stats"
+
+    # Rollup of offers per scrape day, company, location and source ('' stands for a missing value)
+    day = Column(Date, primary_key=True, index=True)
+    company = Column(String(255), primary_key=True, default="")
+    location = Column(String(255), primary_key=True, default="")
+    source = Column(String(100), primary_key=True, default="")
+    offer_count = Column(Integer, nullable=False, default=0)
+
+class SketchState(Base):
+    __tablename__ = "sketch_states"
+
+    # Periodically saved streaming sketches (see sketches.py), zlib-compressed JSON
+    name = Column(String(50), primary_key=True)
+    state = Column(LargeBinary(length=2 ** 24), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
 class JobAlert(Base):
     __tablename__ = "job_alerts"
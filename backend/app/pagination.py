@@ -0,0 +1,130 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Hashable, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+from . import models
+from .cache import search_count_cache
+from .config import settings
+
+# --- Keyset (cursor) pagination for job offer listings ---
+
+SORT_COLUMNS = {
+    "id": models.JobOffer.id,
+    "scraped_at": models.JobOffer.scraped_at,
+    "title": models.JobOffer.title,
+    "company": models.JobOffer.company,
+    "location": models.JobOffer.location,
+}
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token is malformed or was issued for another sort."""
+
+def encode_cursor(sort_by: str, sort_order: str, offer: models.JobOffer) -> str:
+    """
+    Encodes the position right after `offer` as an opaque cursor token.
+
+    The token holds the sort column, direction, the offer's sort value and
+    its id, so the next page can start with an index seek.
+    """
+    value = getattr(offer, sort_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_order, value, offer.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Returns the (sort value, id) stored in `token`, validating it matches the sort."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor_sort_by, cursor_order, value, offer_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if (cursor_sort_by, cursor_order) != (sort_by, sort_order) or not isinstance(offer_id, int):
+        raise InvalidCursor("Cursor does not match the requested sort")
+    if sort_by == "scraped_at" and value is not None:
+        try:
+            value = datetime.fromisoformat(value)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor("Malformed cursor") from e
+    return value, offer_id
+
+def order_by_keyset(query: Query, sort_by: str, sort_order: str) -> Query:
+    """Orders by the sort column with the id as tie-breaker, both in `sort_order`."""
+    column = SORT_COLUMNS[sort_by]
+    if sort_order == "asc":
+        return query.order_by(column.asc(), models.JobOffer.id.asc())
+    return query.order_by(column.desc(), models.JobOffer.id.desc())
+
+def seek(query: Query, sort_by: str, sort_order: str, value: Any, last_id: int) -> Query:
+    """
+    Restricts `query` to the rows after (value, last_id) in keyset order.
+
+    NULLs sort first in ascending order and last in descending order, as
+    in MySQL and SQLite.
+    """
+    column = SORT_COLUMNS[sort_by]
+    offer_id = models.JobOffer.id
+    if sort_order == "asc":
+        if value is None:
+            condition = or_(and_(column.is_(None), offer_id > last_id), column.isnot(None))
+        else:
+            condition = or_(column > value, and_(column == value, offer_id > last_id))
+    else:
+        if value is None:
+            condition = and_(column.is_(None), offer_id < last_id)
+        else:
+            condition = or_(column < value, and_(column == value, offer_id < last_id), column.is_(None))
+    return query.filter(condition)
+
+def keyset_page(query: Query, sort_by: str, sort_order: str, limit: int, cursor: Optional[str] = None, skip: int = 0):
+    """
+    Fetches one page of `query` in keyset order.
+
+    Args:
+        skip: Rows to skip on the first page; ignored when a cursor is given.
+
+    Returns:
+        (offers, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        query = seek(query, sort_by, sort_order, *decode_cursor(cursor, sort_by, sort_order))
+    query = order_by_keyset(query, sort_by, sort_order)
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    offers = rows[:limit]
+    next_cursor = encode_cursor(sort_by, sort_order, offers[-1]) if len(rows) > limit else None
+    return offers, next_cursor
+
+# --- Result counts ---
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated")
+
+def count_results(query: Query, strategy: str, filters_key: Hashable) -> Tuple[int, bool]:
+    """
+    Counts the rows matched by a search query.
+
+    - exact: a full COUNT(*) of the filtered query.
+    - cached: the exact count, reused for SEARCH_COUNT_TTL_SECONDS per
+      normalized filter set (`filters_key`) and data version.
+    - estimated: counts at most SEARCH_COUNT_CAP + 1 ids, so the database
+      stops early on large result sets.
+
+    Returns:
+        (total, is_lower_bound); is_lower_bound means "total or more".
+    """
+    if strategy == "cached":
+        return search_count_cache.get_or_compute(filters_key, query.count), False
+
+    if strategy == "estimated":
+        cap = settings.SEARCH_COUNT_CAP
+        capped = query.with_entities(models.JobOffer.id).order_by(None).limit(cap + 1).subquery()
+        total = query.session.query(func.count()).select_from(capped).scalar()
+        if total > cap:
+            return cap, True
+        return total, False
+
+    return query.count(), False
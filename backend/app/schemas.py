@@ -1,7 +1,7 @@
 
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 # --- Pydantic Schemas for API Data Validation ---
 
@@ -15,6 +15,8 @@ class JobOfferBase(BaseModel):
     description: str
     url: str
     source: str
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
 
 class JobOfferCreate(JobOfferBase):
     """
@@ -30,6 +32,7 @@ class JobOffer(JobOfferBase):
     """
     id: int
     scraped_at: datetime
+    experience_level: Optional[str] = None
 
     class Config:
         # This allows Pydantic to read the data even if it is not a dict,
@@ -42,6 +45,14 @@ class TechnologyStat(BaseModel):
     """
     technology: str
     count: int
+    percentage: Optional[float] = None
+
+class FacetCount(BaseModel):
+    """
+    Schema for one value of a search facet and its number of matching offers.
+    """
+    value: str
+    count: int
 
 class SearchResponse(BaseModel):
     """
@@ -49,7 +60,11 @@ class SearchResponse(BaseModel):
     """
     offers: List[JobOffer]
     total: int
-    page: int
+    page: Optional[int] = None  # None for cursor pages
     pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    count_strategy: str = "exact"  # exact, cached, estimated
+    total_is_lower_bound: bool = False  # True: render as "10,000+"
+    facets: Optional[Dict[str, List[FacetCount]]] = None  # only when requested
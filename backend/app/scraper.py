@@ -1,13 +1,22 @@
 
+import asyncio
 import logging
+import random
+import threading
 import time
-import requests
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
 from bs4 import BeautifulSoup
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
-from . import models, schemas
+from datetime import datetime, timezone
+from . import models, schemas, ingest
+from .analyzer import parse_salary
+from .cache import bump_data_version
 from .config import settings
+from .sketches import offer_sketches
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -18,6 +27,208 @@ logger = logging.getLogger(__name__)
 BASE_URL = settings.BASE_URL
 HEADERS = settings.HEADERS
 
+# --- Concurrent page fetching ---
+
+# Responses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Asyncio token bucket: up to `burst` requests at once, then one every `interval` seconds.
+
+    Waiters are served in arrival order. An interval of 0 disables the
+    limit, but `pause` (a 429 from the host) is always honored. `clock` and
+    `sleep` default to time.monotonic and asyncio.sleep; tests pass fakes.
+    """
+
+    def __init__(self, interval: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.interval = interval
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Holds every request to the host for `seconds`, e.g. on Retry-After."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    await self._sleep(self._paused_until - now)
+                    continue
+                if self.interval <= 0:
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                # Tolerate rounding: refilling after exactly the requested wait
+                # can land a hair below one token, which would wait ~0s forever
+                if self._tokens >= 1 - 1e-9:
+                    self._tokens = max(0.0, self._tokens - 1)
+                    return
+                await self._sleep((1 - self._tokens) * self.interval)
+
+class HostRateLimiter:
+    """
+    One token bucket per host, so each site is rate limited separately.
+
+    Its `sleep` also times the retry backoff of fetch_page, so one fake
+    clock controls every wait of a download in tests.
+    """
+
+    def __init__(self, interval: float, burst: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.interval, self.burst, self.clock, self.sleep)
+        return bucket
+
+    async def acquire(self, url: str):
+        await self.bucket(url).acquire()
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(max, base * 2**(attempt - 1))]."""
+    return random.uniform(0, min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait according to the Retry-After header (delay or HTTP date), if any."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+async def fetch_page(
+    client: httpx.AsyncClient, url: str, limiter: HostRateLimiter, concurrency: asyncio.Semaphore
+) -> Optional[bytes]:
+    """
+    Downloads one page, retrying transient failures.
+
+    Connection errors, timeouts and RETRY_STATUSES are retried up to
+    RETRY_ATTEMPTS times, after an exponential backoff with jitter. When
+    the response has a Retry-After header (429, 503), the requested time is
+    waited instead and the whole host is paused for it, unless it exceeds
+    RETRY_AFTER_MAX (then the page is given up). Other 4xx responses are
+    not retried.
+
+    Returns:
+        The page body, or None if it could not be fetched.
+    """
+    attempts = settings.RETRY_ATTEMPTS + 1
+    for attempt in range(1, attempts + 1):
+        await limiter.acquire(url)
+        delay = None
+        try:
+            async with concurrency:
+                response = await client.get(url)
+        except httpx.TransportError as e:
+            error = e
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                try:
+                    response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
+                except httpx.HTTPStatusError as e:
+                    logger.error(f"❌ Error fetching {url}: {e}")
+                    return None
+                return response.content
+            error = f"HTTP {response.status_code}"
+            delay = retry_after(response)
+            if delay is not None:
+                if delay > settings.RETRY_AFTER_MAX:
+                    logger.error(f"❌ Giving up on {url}: {error}, Retry-After {delay:.0f}s")
+                    return None
+                limiter.bucket(url).pause(delay)
+
+        if attempt == attempts:
+            logger.error(f"❌ Error fetching {url} after {attempts} attempts: {error}")
+            return None
+        delay = backoff_delay(attempt) if delay is None else delay
+        logger.warning(f"🔁 Retrying {url} in {delay:.1f}s (attempt {attempt}/{attempts}): {error}")
+        await limiter.sleep(delay)
+
+async def fetch_pages(urls: List[str], client: httpx.AsyncClient, limiter: HostRateLimiter) -> List[Optional[bytes]]:
+    """
+    Downloads pages concurrently, politely.
+
+    At most SCRAPER_CONCURRENCY requests are in flight and every request
+    first takes a token from its host's bucket in `limiter`.
+
+    Returns:
+        The body of each page, in the order of `urls`; None for pages that
+        could not be fetched.
+    """
+    concurrency = asyncio.Semaphore(settings.SCRAPER_CONCURRENCY)
+    return await asyncio.gather(*(fetch_page(client, url, limiter, concurrency) for url in urls))
+
+# The scraper's event loop runs in a background thread for the life of the
+# process, so its pooled client (keep-alive connections) and per-host
+# buckets are shared by every scrape.
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_engine_lock = threading.Lock()
+_client: Optional[httpx.AsyncClient] = None
+_limiter: Optional[HostRateLimiter] = None
+
+def _engine() -> asyncio.AbstractEventLoop:
+    global _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            _engine_loop = asyncio.new_event_loop()
+            threading.Thread(target=_engine_loop.run_forever, name="scraper-engine", daemon=True).start()
+        return _engine_loop
+
+async def _fetch_shared(urls: List[str]) -> List[Optional[bytes]]:
+    global _client, _limiter
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=settings.REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.SCRAPER_CONCURRENCY,
+                max_keepalive_connections=settings.SCRAPER_CONCURRENCY,
+                keepalive_expiry=settings.SCRAPER_KEEPALIVE_SECONDS,
+            ),
+        )
+        _limiter = HostRateLimiter(settings.DELAY_BETWEEN_REQUESTS, settings.SCRAPER_HOST_BURST)
+    return await fetch_pages(urls, _client, _limiter)
+
+def download_pages(urls: List[str]) -> List[Optional[bytes]]:
+    """Downloads pages with the shared client and rate limiter (see fetch_pages)."""
+    return asyncio.run_coroutine_threadsafe(_fetch_shared(urls), _engine()).result()
+
+def close_engine():
+    """Closes the shared client's connections and stops the scraper's event loop."""
+    global _engine_loop, _client
+    with _engine_lock:
+        loop, _engine_loop = _engine_loop, None
+    if loop is None:
+        return
+    if _client is not None:
+        asyncio.run_coroutine_threadsafe(_client.aclose(), loop).result()
+        _client = None
+    loop.call_soon_threadsafe(loop.stop)
+
+# --- Scraping and persistence ---
+
 def scrape_job_offers(db: Session, pages: int = 1):
     """
     Scrapes job offers from Computrabajo and saves them to MySQL database.
@@ -31,19 +242,18 @@ def scrape_job_offers(db: Session, pages: int = 1):
     
     logger.info(f"🚀 Starting scraping process for {pages} pages...")
     
-    for page in range(1, pages + 1):
-        # Construct the URL for the current page
-        url = f"{BASE_URL}?p={page}"
+    # Download every page concurrently, then parse and save them in order
+    urls = [f"{BASE_URL}?p={page}" for page in range(1, pages + 1)]
+    contents = download_pages(urls)
+    
+    for page, (url, content) in enumerate(zip(urls, contents), start=1):
         logger.info(f"📄 Scraping page {page}/{pages}: {url}")
 
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=settings.REQUEST_TIMEOUT)
-            response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-        except requests.RequestException as e:
-            logger.error(f"❌ Error fetching page {page}: {e}")
+        if content is None:
+            logger.error(f"❌ Error fetching page {page}, skipping it")
             continue # Skip to the next page
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
 
         # Find all job offer cards. The class name might change, this needs to be robust.
         offers = soup.find_all('article', class_='box_offer')
@@ -53,6 +263,7 @@ def scrape_job_offers(db: Session, pages: int = 1):
             break
 
         page_count = 0
+        page_offers = []
         for offer in offers:
             total_processed += 1
             
@@ -61,6 +272,7 @@ def scrape_job_offers(db: Session, pages: int = 1):
                 company_element = offer.find('a', class_='it-blank')
                 location_element = offer.find('span', class_='list-location')
                 description_element = offer.find('p', class_='parrafo')
+                salary_icon = offer.find('span', class_='i_salary')
 
                 if not all([title_element, description_element]):
                     logger.debug(f"⏭️ Skipping offer {total_processed}: missing essential data")
@@ -74,18 +286,24 @@ def scrape_job_offers(db: Session, pages: int = 1):
                     logger.debug(f"⏭️ Job already exists: {title_element.get_text(strip=True)}")
                     continue # Skip if we already have this offer
 
+                # The salary sits next to its icon, e.g. "$ 2.500.000,00 (Mensual)"
+                salary = parse_salary(salary_icon.parent.get_text(" ", strip=True)) if salary_icon else None
+
                 job_data = schemas.JobOfferCreate(
                     title=title_element.get_text(strip=True),
                     company=company_element.get_text(strip=True) if company_element else "N/A",
                     location=location_element.get_text(strip=True) if location_element else "N/A",
                     description=description_element.get_text(strip=True),
                     url=offer_url,
-                    source="Computrabajo"
+                    source="Computrabajo",
+                    salary_min=salary[0] if salary else None,
+                    salary_max=salary[1] if salary else None
                 )
 
                 # Create and save the job offer
-                db_offer = models.JobOffer(**job_data.dict())
+                db_offer = ingest.prepare_offer(models.JobOffer(**job_data.dict()))
                 db.add(db_offer)
+                page_offers.append(db_offer)
                 scraped_count += 1
                 page_count += 1
                 
@@ -97,16 +315,16 @@ def scrape_job_offers(db: Session, pages: int = 1):
 
         # Commit after each page to avoid losing all data if there's an error
         try:
+            snapshots = ingest.record_offers(db, page_offers)
             db.commit()
+            if page_count:
+                bump_data_version()
+                ingest.offers_committed(snapshots)
             logger.info(f"✅ Page {page} completed: {page_count} new offers saved")
         except SQLAlchemyError as e:
             logger.error(f"❌ Database error on page {page}: {e}")
             db.rollback()
             continue
-
-        # Add delay between pages to be respectful to the server
-        if page < pages:
-            time.sleep(settings.DELAY_BETWEEN_REQUESTS)
     
     logger.info(f"🎉 Scraping complete! Processed {total_processed} offers, saved {scraped_count} new job offers to MySQL.")
     return {
@@ -126,6 +344,7 @@ def save_job_offers_to_mysql(job_data_list: list, db: Session):
     """
     saved_count = 0
     skipped_count = 0
+    new_offers = []
     
     logger.info(f"💾 Saving {len(job_data_list)} job offers to MySQL...")
     
@@ -135,8 +354,9 @@ def save_job_offers_to_mysql(job_data_list: list, db: Session):
             existing = db.query(models.JobOffer).filter(models.JobOffer.url == job_data["url"]).first()
             
             if not existing:
-                job_offer = models.JobOffer(**job_data)
+                job_offer = ingest.prepare_offer(models.JobOffer(**job_data))
                 db.add(job_offer)
+                new_offers.append(job_offer)
                 saved_count += 1
                 logger.debug(f"✅ Saved: {job_data['title']} at {job_data['company']}")
             else:
@@ -148,7 +368,11 @@ def save_job_offers_to_mysql(job_data_list: list, db: Session):
             continue
     
     try:
+        snapshots = ingest.record_offers(db, new_offers)
         db.commit()
+        if saved_count:
+            bump_data_version()
+            ingest.offers_committed(snapshots)
         logger.info(f"✅ Successfully saved {saved_count} new job offers to MySQL (skipped {skipped_count})")
         return saved_count
     except SQLAlchemyError as e:
@@ -165,7 +389,6 @@ def get_database_stats(db: Session):
     """
     try:
         total_offers = db.query(models.JobOffer).count()
-        unique_companies = db.query(models.JobOffer.company).distinct().count()
         
         # Recent offers (last 24 hours)
         yesterday = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -173,24 +396,34 @@ def get_database_stats(db: Session):
             models.JobOffer.scraped_at >= yesterday
         ).count()
         
-        # Top companies
-        from sqlalchemy import func
-        top_companies = db.query(
-            models.JobOffer.company,
-            func.count(models.JobOffer.id).label('count')
-        ).filter(
-            models.JobOffer.company.isnot(None)
-        ).group_by(
-            models.JobOffer.company
-        ).order_by(
-            func.count(models.JobOffer.id).desc()
-        ).limit(5).all()
+        sketched = offer_sketches.ready
+        if sketched:
+            # Estimates from the HyperLogLog and Space-Saving sketches
+            unique_companies = offer_sketches.unique_companies()
+            top_companies = offer_sketches.top("company", 5)
+        else:
+            unique_companies = db.query(models.JobOffer.company).distinct().count()
+            
+            # Top companies
+            from sqlalchemy import func
+            top_companies = db.query(
+                models.JobOffer.company,
+                func.count(models.JobOffer.id).label('count')
+            ).filter(
+                models.JobOffer.company.isnot(None)
+            ).group_by(
+                models.JobOffer.company
+            ).order_by(
+                func.count(models.JobOffer.id).desc()
+            ).limit(5).all()
         
         return {
             "total_offers": total_offers,
             "unique_companies": unique_companies,
             "recent_offers_24h": recent_offers,
             "top_companies": [{"company": company, "count": count} for company, count in top_companies],
+            # unique_companies and top_companies are sketch estimates
+            "approximate": sketched,
             "last_updated": datetime.now().isoformat()
         }
         
@@ -215,10 +448,15 @@ def cleanup_old_offers(db: Session, days: int = 30):
         ).all()
         
         count = len(old_offers)
+        old_ids = [offer.id for offer in old_offers]
+        ingest.forget_offers(db, old_offers)
         for offer in old_offers:
             db.delete(offer)
         
         db.commit()
+        if count:
+            bump_data_version()
+            ingest.offers_deleted(old_ids)
         logger.info(f"🗑️ Cleaned up {count} old job offers (older than {days} days)")
         return count
         
@@ -0,0 +1,127 @@
+import logging
+import re
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query, Session
+from . import models
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Full-text search backends for job offers ---
+
+def _terms(q: str) -> list:
+    """Splits a user query into word terms, dropping full-text operators."""
+    return re.findall(r'\w+', q.lower())
+
+class LikeSearch:
+    """
+    Substring search with ILIKE over title, description and company.
+
+    Used for databases without a full-text backend. Leading wildcards
+    cannot use indexes, so every search scans the table.
+    """
+    name = "like"
+
+    def filter(self, query: Query, q: str):
+        """Returns the filtered query and a relevance expression (None: unranked)."""
+        search_term = f"%{q.lower()}%"
+        return query.filter(
+            or_(
+                models.JobOffer.title.ilike(search_term),
+                models.JobOffer.description.ilike(search_term),
+                models.JobOffer.company.ilike(search_term)
+            )
+        ), None
+
+class MySQLFullTextSearch:
+    """
+    MATCH ... AGAINST over the `ft_job_offers_search` FULLTEXT index.
+
+    Every term is required and matched as a prefix (`+term*` in boolean
+    mode), which mirrors the previous substring semantics for whole words.
+    """
+    name = "mysql_fulltext"
+
+    def filter(self, query: Query, q: str):
+        terms = _terms(q)
+        if not terms:
+            return query, None
+        relevance = match(
+            models.JobOffer.title,
+            models.JobOffer.description,
+            models.JobOffer.company,
+            against=" ".join(f"+{term}*" for term in terms)
+        ).in_boolean_mode()
+        return query.filter(relevance > 0), relevance
+
+class SQLiteFullTextSearch:
+    """
+    FTS5 search over the `job_offers_fts` external-content table.
+
+    Terms are quoted prefix queries joined with AND; relevance is the
+    negated `bm25()` rank so that higher is better, as with MySQL.
+    """
+    name = "sqlite_fts5"
+
+    def filter(self, query: Query, q: str):
+        terms = _terms(q)
+        if not terms:
+            return query, None
+        matches = text(
+            "SELECT rowid AS offer_id, -bm25(job_offers_fts) AS relevance "
+            "FROM job_offers_fts WHERE job_offers_fts MATCH :fts_query"
+        ).bindparams(
+            fts_query=" AND ".join(f'"{term}"*' for term in terms)
+        ).columns(offer_id=Integer, relevance=Float).subquery("fts_matches")
+        query = query.join(matches, matches.c.offer_id == models.JobOffer.id)
+        return query, matches.c.relevance
+
+SQLITE_FTS_SETUP = [
+    """CREATE VIRTUAL TABLE job_offers_fts USING fts5(
+        title, description, company, content='job_offers', content_rowid='id'
+    )""",
+    """CREATE TRIGGER job_offers_fts_insert AFTER INSERT ON job_offers BEGIN
+        INSERT INTO job_offers_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END""",
+    """CREATE TRIGGER job_offers_fts_delete AFTER DELETE ON job_offers BEGIN
+        INSERT INTO job_offers_fts(job_offers_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+    END""",
+    """CREATE TRIGGER job_offers_fts_update AFTER UPDATE OF title, description, company ON job_offers BEGIN
+        INSERT INTO job_offers_fts(job_offers_fts, rowid, title, description, company)
+        VALUES ('delete', old.id, old.title, old.description, old.company);
+        INSERT INTO job_offers_fts(rowid, title, description, company)
+        VALUES (new.id, new.title, new.description, new.company);
+    END""",
+    "INSERT INTO job_offers_fts(job_offers_fts) VALUES ('rebuild')",
+]
+
+def setup_fulltext(engine):
+    """
+    Creates the full-text structures the search backend of `engine` needs.
+
+    MySQL's FULLTEXT index is declared on the model and created with the
+    schema. SQLite gets an FTS5 table kept in sync by triggers; it is
+    populated from the existing rows the first time it is created.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_offers_fts'"
+        )).first()
+        if not exists:
+            logger.info("🔎 Creating SQLite FTS5 index for job offers...")
+            for statement in SQLITE_FTS_SETUP:
+                conn.execute(text(statement))
+
+_BACKENDS = {
+    "mysql": MySQLFullTextSearch(),
+    "sqlite": SQLiteFullTextSearch(),
+}
+
+def get_search_backend(db: Session):
+    """Returns the full-text backend for the session's database."""
+    return _BACKENDS.get(db.get_bind().dialect.name, LikeSearch())
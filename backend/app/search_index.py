@@ -0,0 +1,280 @@
+import bisect
+import logging
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Query, Session
+from . import models
+from .analyzer import _normalize_text, iter_offer_chunks
+from .config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- In-memory BM25 index over job offers ---
+
+# Title words say more about an offer than the same words in its description
+TITLE_WEIGHT = 2
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased, accent-free word tokens, like SQLite FTS5's unicode61 tokenizer."""
+    if not text:
+        return []
+    return re.findall(r'\w+', _normalize_text(text))
+
+class InvertedIndex:
+    """
+    BM25-ranked inverted index over the title, company and description of offers.
+
+    Postings are compact arrays: per term, an `array('l')` of document
+    ordinals and a parallel `array('H')` of (title-weighted) term
+    frequencies. Documents are appended in insertion order; removed ones are
+    flagged dead and skipped when scoring.
+
+    Query terms are matched as prefixes and all of them are required, the
+    same semantics as the SQL full-text backends in search.py.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, array] = {}
+        self._frequencies: Dict[str, array] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix lookups
+        self._offer_ids = array('l')
+        self._lengths = array('l')
+        self._alive = array('b')
+        self._ordinals: Dict[int, int] = {}
+        self._live_count = 0
+        self._total_length = 0
+        self._lock = threading.Lock()
+        # Updates received while a build runs, replayed onto the new contents
+        self._pending: Optional[list] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @property
+    def accepts_updates(self) -> bool:
+        """Whether committed offers should be passed on: the index is built or being built."""
+        return self.ready or self._pending is not None
+
+    def _add_locked(self, offer_id: int, title: str, company: str, description: str, sort_vocabulary: bool):
+        if offer_id in self._ordinals:
+            self._remove_locked(offer_id)
+
+        frequencies = Counter(tokenize(description))
+        frequencies.update(tokenize(company))
+        for token in tokenize(title):
+            frequencies[token] += TITLE_WEIGHT
+
+        ordinal = len(self._offer_ids)
+        self._offer_ids.append(offer_id)
+        length = sum(frequencies.values())
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._ordinals[offer_id] = ordinal
+        self._live_count += 1
+        self._total_length += length
+
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = array('l')
+                self._frequencies[term] = array('H')
+                if sort_vocabulary:
+                    bisect.insort(self._vocabulary, term)
+                else:
+                    self._vocabulary.append(term)
+            postings.append(ordinal)
+            self._frequencies[term].append(min(frequency, 65535))
+
+    def _remove_locked(self, offer_id: int):
+        ordinal = self._ordinals.pop(offer_id, None)
+        if ordinal is not None and self._alive[ordinal]:
+            self._alive[ordinal] = 0
+            self._live_count -= 1
+            self._total_length -= self._lengths[ordinal]
+
+    def add(self, offer_id: int, title: str, company: Optional[str], description: Optional[str]):
+        """Indexes (or re-indexes) one offer."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((offer_id, title, company, description))
+            self._add_locked(offer_id, title, company, description, sort_vocabulary=True)
+
+    def remove(self, offer_ids: Iterable[int]):
+        """Removes offers from the index."""
+        with self._lock:
+            for offer_id in offer_ids:
+                if self._pending is not None:
+                    self._pending.append((offer_id, None))
+                self._remove_locked(offer_id)
+
+    def build(self, db: Session, chunk_size: int = 5000):
+        """
+        Replaces the index contents with every offer in the database.
+
+        The new index is built on the side and swapped in at the end, so
+        searches keep being served while a rebuild runs. Offers added or
+        removed meanwhile, which the scan may have missed, are replayed onto
+        the new contents before the swap.
+        """
+        with self._lock:
+            self._pending = []
+        fresh = InvertedIndex(self.k1, self.b)
+        try:
+            for chunk in iter_offer_chunks(
+                db, models.JobOffer.title, models.JobOffer.company, models.JobOffer.description, chunk_size=chunk_size
+            ):
+                for offer_id, title, company, description in chunk:
+                    fresh._add_locked(offer_id, title, company, description, sort_vocabulary=False)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        fresh._vocabulary.sort()
+
+        with self._lock:
+            for update in self._pending:
+                if len(update) == 2:
+                    fresh._remove_locked(update[0])
+                else:
+                    fresh._add_locked(*update, sort_vocabulary=True)
+            self._pending = None
+            for name in ("_postings", "_frequencies", "_vocabulary", "_offer_ids", "_lengths",
+                         "_alive", "_ordinals", "_live_count", "_total_length"):
+                setattr(self, name, getattr(fresh, name))
+            self.ready = True
+        logger.info(f"🔎 Search index built with {len(self)} offers and {len(self._vocabulary)} terms")
+
+    def _expand(self, prefix: str, max_terms: int = 200) -> List[str]:
+        """Vocabulary terms starting with `prefix` (at most `max_terms`)."""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + max_terms]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, q: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Ranks the offers matching every term of `q` by BM25.
+
+        Args:
+            q: The user query.
+            limit: Return only the top `limit` results (default: all matches).
+
+        Returns:
+            (offer_id, score) pairs, best first.
+        """
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms:
+            return []
+        with self._lock:
+            return self._search_locked(terms, limit)
+
+    def matching_ids(self, q: str) -> np.ndarray:
+        """Ids of the offers matching every term of `q`, unranked."""
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        with self._lock:
+            _, candidates = self._score_locked(terms)
+            return np.frombuffer(self._offer_ids, dtype='l')[candidates].astype(np.int64)
+
+    def _search_locked(self, terms: List[str], limit: Optional[int]) -> List[Tuple[int, float]]:
+        scores, candidates = self._score_locked(terms)
+        if limit is not None and limit < len(candidates):
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        offer_ids = np.frombuffer(self._offer_ids, dtype='l')
+        return [(int(offer_ids[ordinal]), float(scores[ordinal])) for ordinal in ranked]
+
+    def _score_locked(self, terms: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 scores of every ordinal and the live ordinals matching all `terms`."""
+        # Views over the arrays must not outlive the lock: arrays cannot grow while exported
+        documents = len(self._offer_ids)
+        if not self._live_count:
+            return np.zeros(documents), np.zeros(0, dtype=np.int64)
+        lengths = np.frombuffer(self._lengths, dtype='l')
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        average_length = self._total_length / self._live_count
+        norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+
+        scores = np.zeros(documents)
+        matched_terms = np.zeros(documents, dtype=np.int32)
+        for term in terms:
+            term_hits = np.zeros(documents, dtype=bool)
+            for expansion in self._expand(term):
+                ordinals = np.frombuffer(self._postings[expansion], dtype='l')
+                frequencies = np.frombuffer(self._frequencies[expansion], dtype=np.uint16).astype(float)
+                document_frequency = len(ordinals)
+                idf = math.log(1 + (self._live_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                scores[ordinals] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[ordinals])
+                term_hits[ordinals] = True
+            matched_terms += term_hits
+
+        return scores, np.flatnonzero((matched_terms == len(terms)) & alive)
+
+# Shared index, built at startup and updated as offers are ingested
+offer_index = InvertedIndex()
+
+def relevance_page(query: Query, q: str, skip: int, limit: int, filtered: bool):
+    """
+    Serves one page of `query` ordered by BM25 relevance of `q`.
+
+    Filtered pages rank at most SEARCH_RELEVANCE_CANDIDATE_FACTOR times the
+    rows they need (up to SEARCH_RELEVANCE_MAX_CANDIDATES) and check those
+    against the SQL filters, instead of ranking and checking every match.
+
+    Args:
+        query: The offers query with every filter except `q` applied.
+        q: The search terms, ranked by `offer_index`.
+        skip, limit: The page window.
+        filtered: Whether `query` has filters; if not, the ranking alone
+            decides the page and the database only loads its rows.
+
+    Returns:
+        (offers, has_next), or None if the filters keep too few of the
+        ranked candidates to fill the page; the caller then orders in SQL.
+    """
+    wanted = skip + limit + 1
+    if not filtered:
+        page_ids = [offer_id for offer_id, _ in offer_index.search(q, limit=wanted)]
+    else:
+        cap = min(wanted * settings.SEARCH_RELEVANCE_CANDIDATE_FACTOR, settings.SEARCH_RELEVANCE_MAX_CANDIDATES)
+        if wanted > cap:
+            return None
+        ranked = [offer_id for offer_id, _ in offer_index.search(q, limit=cap + 1)]
+        truncated = len(ranked) > cap
+        ranked = ranked[:cap]
+        # Walk the ranking in batches, keeping ids that pass the SQL filters
+        page_ids = []
+        for start in range(0, len(ranked), 1000):
+            batch = ranked[start:start + 1000]
+            passing = {
+                offer_id for (offer_id,) in query.with_entities(models.JobOffer.id).order_by(None).filter(
+                    models.JobOffer.id.in_(batch)
+                )
+            }
+            page_ids.extend(offer_id for offer_id in batch if offer_id in passing)
+            if len(page_ids) >= wanted:
+                break
+        if len(page_ids) < wanted and truncated:
+            return None
+
+    has_next = len(page_ids) > skip + limit
+    page_ids = page_ids[skip:skip + limit]
+    if not page_ids:
+        return [], has_next
+    offers = {offer.id: offer for offer in query.order_by(None).filter(models.JobOffer.id.in_(page_ids))}
+    return [offers[offer_id] for offer_id in page_ids if offer_id in offers], has_next
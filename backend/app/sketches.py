@@ -0,0 +1,349 @@
+import base64
+import hashlib
+import heapq
+import json
+import logging
+import math
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from . import models
+from .analyzer import iter_offer_chunks
+from .config import settings
+from .database import SessionLocal
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# --- Streaming sketches of the offer table ---
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process, so it cannot be persisted)."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HyperLogLog:
+    """
+    Cardinality estimate of a stream of strings in 2**precision bytes.
+
+    The relative standard error is 1.04 / sqrt(2**precision): 0.81% with the
+    default precision of 14 (16 KiB), so 95% of estimates are within 1.6%.
+    Small cardinalities use linear counting and are close to exact.
+    """
+
+    def __init__(self, precision: int = 14, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+        self._estimate: Optional[int] = None
+
+    def add(self, value: str):
+        h = _hash64(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._estimate = None
+
+    def merge(self, other: "HyperLogLog"):
+        """Adds the values counted by another sketch of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8), np.frombuffer(other.registers, dtype=np.uint8))
+        self.registers = bytearray(merged.tobytes())
+        self._estimate = None
+
+    def count(self) -> int:
+        """The estimated number of distinct values added."""
+        if self._estimate is None:
+            registers = np.frombuffer(self.registers, dtype=np.uint8)
+            alpha = 0.7213 / (1 + 1.079 / self.m)
+            estimate = alpha * self.m * self.m / float(np.sum(np.exp2(-registers.astype(np.float64))))
+            zeros = int(np.count_nonzero(registers == 0))
+            if estimate <= 2.5 * self.m and zeros:
+                estimate = self.m * math.log(self.m / zeros)
+            self._estimate = int(round(estimate))
+        return self._estimate
+
+class SpaceSaving:
+    """
+    Heavy hitters of a stream with at most `capacity` counters (Metwally et al.).
+
+    When the stream holds more distinct values than counters, the least
+    counted value is replaced and its count inherited as the newcomer's
+    `error`. With N values added:
+
+    - every value occurring more than N / capacity times is tracked;
+    - a tracked value's count overestimates its true count by at most its
+      `error`, itself at most N / capacity;
+    - counts are exact (error 0) while there are no more distinct values than counters.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = {}  # value -> [count, error]
+        # Lazy min-heap of (count, value); entries whose count is stale are skipped
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, value: str, weight: int = 1):
+        counter = self.counters.get(value)
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = self.counters[value] = [0, 0]
+            else:
+                evicted, floor = self._pop_min()
+                del self.counters[evicted]
+                counter = self.counters[value] = [floor, floor]
+        counter[0] += weight
+        heapq.heappush(self._heap, (counter[0], value))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, value) for value, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, int]:
+        while True:
+            count, value = heapq.heappop(self._heap)
+            counter = self.counters.get(value)
+            if counter is not None and counter[0] == count:
+                return value, count
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """The `k` most counted values as (value, count, error), ties broken by value."""
+        ranked = heapq.nsmallest(k, self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(value, count, error) for value, (count, error) in ranked]
+
+    def to_list(self) -> List[list]:
+        return [[value, count, error] for value, (count, error) in self.counters.items()]
+
+    @classmethod
+    def from_list(cls, items: List[list], capacity: int) -> "SpaceSaving":
+        sketch = cls(capacity)
+        for value, count, error in items:
+            sketch.counters[value] = [count, error]
+        sketch._heap = [(count, value) for value, count, _ in items]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+def _count_bits(bitmap: bytearray, last: int) -> int:
+    """Number of bits set among bits 0..last of a little-endian bitmap."""
+    bits = np.unpackbits(np.frombuffer(bytes(bitmap), dtype=np.uint8), bitorder="little")
+    return int(np.count_nonzero(bits[:last + 1]))
+
+class OfferSketches:
+    """
+    Distinct counts and top-K of the companies and locations of all offers.
+
+    Updated with every offer committed by this process (see
+    ingest.offers_committed) and caught up from the table by a periodic job
+    (`sync_sketches`), which also saves them to the `sketch_states` table, so
+    a restart loads the saved state and replays only the offers added since.
+    A bitmap of the counted offer ids keeps an offer from being counted twice
+    whichever way it arrives, in any order. These sketches cannot subtract:
+    deleting offers marks them stale until the next periodic run rebuilds
+    them from the table. Callers fall back to SQL while `ready` is False.
+    """
+
+    STATE_NAME = "offers"
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.companies = HyperLogLog()
+        self.locations = HyperLogLog()
+        self.top_companies = SpaceSaving(capacity)
+        self.top_locations = SpaceSaving(capacity)
+        self.offers = 0
+        self.max_offer_id = 0
+        # Bit i is set once offer i was counted
+        self.counted = bytearray()
+        # The periodic catch-up rescans ids above replay_from, which trails
+        # the counted ids by one run, so offers committed out of id order
+        # (concurrent scrapes, other processes) are still picked up
+        self.replay_from = 0
+        self._next_replay_from = 0
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def _add_locked(self, offer_id: int, company: Optional[str], location: Optional[str]):
+        index, bit = offer_id >> 3, 1 << (offer_id & 7)
+        if index >= len(self.counted):
+            self.counted.extend(bytes(max(index + 1 - len(self.counted), len(self.counted) // 2)))
+        elif self.counted[index] & bit:
+            return
+        self.counted[index] |= bit
+        if company is not None:
+            self.companies.add(company)
+            self.top_companies.add(company)
+        if location is not None:
+            self.locations.add(location)
+            self.top_locations.add(location)
+        self.offers += 1
+        self.max_offer_id = max(self.max_offer_id, offer_id)
+
+    def add(self, offers: Iterable):
+        """
+        Counts committed offers (ingest.OfferSnapshot). Ignored while the
+        sketches are stale: the next build or load replays them from the table.
+        """
+        with self._lock:
+            if not self.ready:
+                return
+            for offer in offers:
+                self._add_locked(offer.id, offer.company, offer.location)
+
+    def invalidate(self):
+        """Marks the sketches stale, e.g. after offers were deleted."""
+        self.ready = False
+
+    def _replay(self, db: Session, chunk_size: int):
+        """Counts the offers above `replay_from` that were not counted yet."""
+        columns = (models.JobOffer.company, models.JobOffer.location)
+        last_id = self.replay_from
+        while True:
+            chunk = db.query(models.JobOffer.id, *columns).filter(
+                models.JobOffer.id > last_id
+            ).order_by(models.JobOffer.id).limit(chunk_size).all()
+            if not chunk:
+                break
+            for row in chunk:
+                self._add_locked(*row)
+            last_id = chunk[-1].id
+        self.replay_from, self._next_replay_from = self._next_replay_from, self.max_offer_id
+
+    def catch_up(self, db: Session, chunk_size: int = 50000):
+        """Counts the offers committed since the last run, by any process."""
+        # A new read transaction sees everything committed so far
+        db.commit()
+        with self._lock:
+            self._replay(db, chunk_size)
+
+    def _swap(self, fresh: "OfferSketches", db: Session, chunk_size: int):
+        with self._lock:
+            # Offers committed since the scan were not counted by add() while
+            # stale; end the read transaction and catch up before swapping in
+            db.commit()
+            fresh._replay(db, chunk_size)
+            self.__dict__.update({name: value for name, value in fresh.__dict__.items() if name != "_lock"})
+            self.ready = True
+
+    def build(self, db: Session, chunk_size: int = 50000):
+        """Recounts every offer in the database and swaps the result in."""
+        fresh = OfferSketches(self.capacity)
+        for chunk in iter_offer_chunks(db, models.JobOffer.company, models.JobOffer.location, chunk_size=chunk_size):
+            for row in chunk:
+                fresh._add_locked(*row)
+        fresh.replay_from = fresh._next_replay_from = fresh.max_offer_id
+        self._swap(fresh, db, chunk_size)
+        logger.info(f"📐 Offer sketches built from {self.offers} offers")
+
+    def load(self, db: Session, chunk_size: int = 50000) -> bool:
+        """
+        Restores the saved sketches and replays the offers added since.
+
+        Returns:
+            False if there is no usable saved state (none saved, another
+            capacity or format, or offers deleted since), in which case
+            nothing changes.
+        """
+        row = db.get(models.SketchState, self.STATE_NAME)
+        if row is None:
+            return False
+        state = json.loads(zlib.decompress(row.state))
+        if state["capacity"] != self.capacity or "counted" not in state:
+            return False
+        # Deletions since the save cannot be replayed; detect them by count
+        # below the replay mark, where every committed offer was counted
+        counted = bytearray(base64.b64decode(state["counted"]))
+        stored_offers = db.query(func.count(models.JobOffer.id)).filter(
+            models.JobOffer.id <= state["replay_from"]
+        ).scalar()
+        if stored_offers != _count_bits(counted, state["replay_from"]):
+            return False
+
+        fresh = OfferSketches(self.capacity)
+        fresh.companies = HyperLogLog(registers=base64.b64decode(state["companies"]))
+        fresh.locations = HyperLogLog(registers=base64.b64decode(state["locations"]))
+        fresh.top_companies = SpaceSaving.from_list(state["top_companies"], self.capacity)
+        fresh.top_locations = SpaceSaving.from_list(state["top_locations"], self.capacity)
+        fresh.offers, fresh.max_offer_id = state["offers"], state["max_offer_id"]
+        fresh.counted = counted
+        fresh.replay_from = fresh._next_replay_from = state["replay_from"]
+        self._swap(fresh, db, chunk_size)
+        logger.info(f"📐 Offer sketches loaded ({self.offers} offers, saved {row.updated_at})")
+        return True
+
+    def save(self, db: Session):
+        """Writes the current sketches to the sketch_states table."""
+        with self._lock:
+            state = {
+                "capacity": self.capacity,
+                "offers": self.offers,
+                "max_offer_id": self.max_offer_id,
+                "replay_from": self.replay_from,
+                "counted": base64.b64encode(bytes(self.counted)).decode("ascii"),
+                "companies": base64.b64encode(bytes(self.companies.registers)).decode("ascii"),
+                "locations": base64.b64encode(bytes(self.locations.registers)).decode("ascii"),
+                "top_companies": self.top_companies.to_list(),
+                "top_locations": self.top_locations.to_list(),
+            }
+        payload = zlib.compress(json.dumps(state).encode("utf-8"))
+        row = db.get(models.SketchState, self.STATE_NAME)
+        if row is None:
+            db.add(models.SketchState(name=self.STATE_NAME, state=payload, updated_at=datetime.now()))
+        else:
+            row.state, row.updated_at = payload, datetime.now()
+        db.commit()
+
+    def unique_companies(self) -> int:
+        with self._lock:
+            return self.companies.count()
+
+    def unique_locations(self) -> int:
+        with self._lock:
+            return self.locations.count()
+
+    def top(self, column: str, k: int) -> List[Tuple[str, int]]:
+        """
+        The `k` most frequent companies or locations with their estimated
+        offer counts, without the empty value (as analyzer.rollup_top_values).
+        """
+        sketch = self.top_companies if column == "company" else self.top_locations
+        with self._lock:
+            return [(value, count) for value, count, _ in sketch.top(k + 1) if value][:k]
+
+# Shared sketches, loaded at startup and updated as offers are ingested
+offer_sketches = OfferSketches(capacity=settings.SKETCH_TOP_K_CAPACITY)
+
+def sync_sketches(session_factory=SessionLocal):
+    """
+    Periodic job: counts the offers committed since the last run (including
+    by other processes) and saves the sketches, or rebuilds them first if
+    they are stale (never loaded, or offers were deleted).
+    """
+    db = session_factory()
+    try:
+        if not offer_sketches.ready:
+            if not offer_sketches.load(db):
+                offer_sketches.build(db)
+        else:
+            offer_sketches.catch_up(db)
+        offer_sketches.save(db)
+    except Exception as e:
+        logger.error(f"❌ Error saving offer sketches: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def start_persister(scheduler):
+    """Loads or builds the sketches right away, then saves them every SKETCH_PERSIST_SECONDS."""
+    scheduler.add_job(
+        sync_sketches, "interval", seconds=settings.SKETCH_PERSIST_SECONDS,
+        id="sketch-persist", next_run_time=datetime.now(),
+        max_instances=1, coalesce=True, replace_existing=True,
+    )
+    if not scheduler.running:
+        scheduler.start()
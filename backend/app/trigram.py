@@ -0,0 +1,104 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Set
+from sqlalchemy.orm import Session
+from . import models
+from .analyzer import _normalize_text
+from .cache import cached
+from .config import settings
+
+# --- Fuzzy matching of company and location filters ---
+
+FUZZY_COLUMNS = {
+    "company": models.JobOffer.company,
+    "location": models.JobOffer.location,
+}
+
+def normalize_value(text: str) -> str:
+    """Lowercase, accent-free text with punctuation collapsed to single spaces."""
+    return " ".join(re.findall(r'\w+', _normalize_text(text)))
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of each word, padded like pg_trgm: "  bo", " bog", ..., "ta "."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramIndex:
+    """
+    Trigram index over a small vocabulary of distinct column values.
+
+    A filter matches a value when its normalized form is a substring of the
+    value (accent- and case-insensitive ILIKE), or, to tolerate typos, when
+    at least `threshold` of the filter's trigrams occur in the value.
+    """
+
+    def __init__(self, values: List[str], threshold: float = 0.5):
+        self.values = values
+        self.threshold = threshold
+        self._normalized = [normalize_value(value) for value in values]
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for position, normalized in enumerate(self._normalized):
+            for gram in trigrams(normalized):
+                self._postings[gram].append(position)
+
+    def resolve(self, needle: str) -> List[str]:
+        """
+        Returns the canonical values matching `needle`.
+
+        Args:
+            needle: The user's filter text, e.g. "Bogota" or "bogta".
+
+        Returns:
+            The matching stored values, exact substring matches first, then
+            fuzzy matches by decreasing similarity.
+        """
+        normalized = normalize_value(needle)
+        if not normalized:
+            return []
+        needle_grams = trigrams(normalized)
+
+        shared = Counter()
+        for gram in needle_grams:
+            shared.update(self._postings.get(gram, ()))
+        if min(len(word) for word in normalized.split()) < 3:
+            # Words this short have no inner trigram, so substrings may share none
+            shared.update(
+                position for position, value in enumerate(self._normalized)
+                if normalized in value and position not in shared
+            )
+
+        substring, fuzzy = [], []
+        for position, count in shared.items():
+            if normalized in self._normalized[position]:
+                substring.append(position)
+            else:
+                similarity = count / len(needle_grams)
+                if similarity >= self.threshold:
+                    fuzzy.append((-similarity, position))
+        ranked = sorted(substring) + [position for _, position in sorted(fuzzy)]
+        return [self.values[position] for position in ranked]
+
+@cached("trigram_index")
+def trigram_index(db: Session, column: str) -> TrigramIndex:
+    """
+    Builds the trigram index of the distinct values of a JobOffer column.
+
+    Args:
+        db: The database session.
+        column: One of FUZZY_COLUMNS.
+    """
+    attribute = FUZZY_COLUMNS[column]
+    values = [value for (value,) in db.query(attribute).filter(attribute.isnot(None)).distinct()]
+    return TrigramIndex(values, threshold=settings.FUZZY_MATCH_THRESHOLD)
+
+def resolve_filter(db: Session, column: str, needle: str) -> List[str]:
+    """
+    Resolves a company or location filter to the exact values it matches.
+
+    The query then filters with `column IN (...)`, an index lookup, instead
+    of an `ILIKE '%needle%'` scan.
+    """
+    return trigram_index(db, column).resolve(needle)
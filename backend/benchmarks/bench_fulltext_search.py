@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Latency Benchmark
+Compares p50/p99 latency of the ILIKE search path with the SQLite FTS5
+backend and the in-memory BM25 index on synthetic tables of increasing size.
+
+Usage:
+    python benchmarks/bench_fulltext_search.py --sizes 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models, search, search_index
+from benchmarks.bench_technology_matcher import FILLER_WORDS
+from app.analyzer import TECHNOLOGIES
+
+QUERIES = ["python", "react typescript", "kubernetes", "desarrollador remoto", "terraform aws", "scala"]
+COMPANIES = [f"Empresa {i}" for i in range(2000)]
+
+
+def build_database(path: str, size: int, seed: int = 7):
+    """Creates a SQLite database with `size` short synthetic offers and its FTS index."""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, size, 20_000):
+            conn.execute(insert(models.JobOffer), [
+                {
+                    "title": f"Desarrollador {rng.choice(TECHNOLOGIES)}",
+                    "company": rng.choice(COMPANIES),
+                    "description": " ".join(rng.choices(FILLER_WORDS, k=25) + rng.sample(TECHNOLOGIES, k=3)),
+                    "url": f"https://example.com/{i}",
+                    "source": "benchmark",
+                }
+                for i in range(start, min(start + 20_000, size))
+            ])
+    search.setup_fulltext(engine)
+    return engine
+
+
+def run_search(db, backend, q: str, sort_by_relevance: bool):
+    """One search as the endpoint runs it: filtered count plus the first page."""
+    query, relevance = backend.filter(db.query(models.JobOffer), q)
+    order = relevance if sort_by_relevance and relevance is not None else models.JobOffer.scraped_at
+    query.count()
+    return query.order_by(order.desc()).limit(20).all()
+
+
+def run_ranked_search(db, backend, q: str):
+    """A relevance-sorted search with the page ranked by the in-memory index."""
+    backend.filter(db.query(models.JobOffer), q)[0].count()
+    return search_index.relevance_page(db.query(models.JobOffer), q, 0, 20, filtered=False)
+
+
+def latencies(db, backend, rounds: int, sort_by_relevance: bool = False, search_fn=None) -> list:
+    search_fn = search_fn or (lambda db, backend, q: run_search(db, backend, q, sort_by_relevance))
+    samples = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            start = time.perf_counter()
+            search_fn(db, backend, q)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    cuts = statistics.quantiles(samples, n=100)
+    print(f"{label:>28}: p50 {cuts[49]:9.1f} ms   p99 {cuts[98]:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ILIKE vs full-text search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions of the query set")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_database(os.path.join(tmp, "bench.db"), size)
+            db = sessionmaker(bind=engine)()
+            print(f"--- {size:,} offers ---")
+            report("ILIKE", latencies(db, search.LikeSearch(), args.rounds))
+            report("FTS5", latencies(db, search.SQLiteFullTextSearch(), args.rounds))
+            report("FTS5 (relevance order)", latencies(db, search.SQLiteFullTextSearch(), args.rounds, True))
+
+            start = time.perf_counter()
+            search_index.offer_index.build(db)
+            print(f"{'BM25 index build':>28}: {time.perf_counter() - start:9.1f} s")
+            report("FTS5 count + BM25 page", latencies(
+                db, search.SQLiteFullTextSearch(), args.rounds, search_fn=run_ranked_search
+            ))
+            report("BM25 page only", latencies(
+                db, None, args.rounds,
+                search_fn=lambda db, backend, q: search_index.relevance_page(db.query(models.JobOffer), q, 0, 20, False)
+            ))
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
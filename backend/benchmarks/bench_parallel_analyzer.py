@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Parallel Analyzer Scaling Benchmark
+Times count_technologies on a synthetic corpus with 1..N worker processes.
+
+Usage:
+    python benchmarks/bench_parallel_analyzer.py --offers 200000 --max-workers 16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analyzer import count_technologies
+from app.config import settings
+from benchmarks.bench_technology_matcher import build_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel technology analysis")
+    parser.add_argument("--offers", type=int, default=200_000, help="Corpus size")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    # Always take the parallel path when more than one worker is requested
+    settings.PARALLEL_ANALYSIS_THRESHOLD = 0
+
+    print(f"Building corpus of {args.offers:,} offers ({os.cpu_count()} CPUs available)...")
+    corpus = build_corpus(args.offers)
+
+    worker_counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    baseline = None
+    expected = None
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'identical':>10}")
+    for workers in worker_counts:
+        # Warm up the pool so process start-up is not timed
+        count_technologies(corpus[:1000], workers=workers)
+
+        start = time.perf_counter()
+        counts = count_technologies(corpus, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline, expected = elapsed, counts
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x {str(counts == expected):>10}")
+
+
+if __name__ == "__main__":
+    main()
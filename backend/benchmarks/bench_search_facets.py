@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Search Facet Counting Benchmark
+Compares one GROUP BY query per facet with the one-pass counts of the
+in-memory facet index (app/facets.py) on a synthetic table.
+
+Usage:
+    python benchmarks/bench_search_facets.py --size 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import facets, models
+from app.analyzer import TECHNOLOGIES
+
+COMPANIES = [f"Empresa {i}" for i in range(5000)]
+LOCATIONS = [f"Ciudad {i}" for i in range(200)]
+
+
+def build_database(path: str, size: int, seed: int = 7):
+    """Creates a SQLite database with `size` offers tagged with 3 technologies each."""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, size, 50_000):
+            ids = range(start + 1, min(start + 50_000, size) + 1)
+            conn.execute(insert(models.JobOffer), [
+                {
+                    "id": i,
+                    "title": "Desarrollador",
+                    "company": rng.choice(COMPANIES),
+                    "location": rng.choice(LOCATIONS),
+                    "experience_level": rng.choice(["junior", "mid", "senior"]),
+                    "url": f"https://example.com/{i}",
+                    "source": "benchmark",
+                }
+                for i in ids
+            ])
+            conn.execute(insert(models.OfferTechnology), [
+                {"offer_id": i, "technology": tech} for i in ids for tech in rng.sample(TECHNOLOGIES, k=3)
+            ])
+    return engine
+
+
+def group_by_facets(db, query):
+    """The straightforward approach: one GROUP BY per facet."""
+    subquery = query.with_entities(models.JobOffer.id)
+    for column in (models.JobOffer.company, models.JobOffer.location):
+        db.query(column, func.count()).filter(models.JobOffer.id.in_(subquery)).group_by(column) \
+            .order_by(func.count().desc()).limit(10).all()
+    db.query(models.OfferTechnology.technology, func.count()).filter(
+        models.OfferTechnology.offer_id.in_(subquery)
+    ).group_by(models.OfferTechnology.technology).order_by(func.count().desc()).limit(10).all()
+
+
+def timed(fn, rounds: int) -> list:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark facet counting strategies")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_database(os.path.join(tmp, "bench.db"), args.size)
+        db = sessionmaker(bind=engine)()
+        query = db.query(models.JobOffer).filter(models.JobOffer.experience_level == "senior")
+        filters = {"experience_level": "senior"}
+
+        index = facets.FacetIndex()
+        start = time.perf_counter()
+        index.build(db)
+        print(f"--- {args.size:,} offers (facet index built in {time.perf_counter() - start:.1f} s) ---")
+
+        for label, fn in [
+            ("GROUP BY per facet", lambda: group_by_facets(db, query)),
+            ("facet index, filtered", lambda: index.counts(facets.FACETS, filters, limit=10)),
+            ("facet index, 2 filters", lambda: index.counts(
+                facets.FACETS, dict(filters, location="ciudad 1", min_salary=0), limit=10
+            )),
+            ("facet index, unfiltered", lambda: index.counts(facets.FACETS, {}, limit=10)),
+        ]:
+            print(f"{label:>24}: p50 {statistics.median(timed(fn, args.rounds)):8.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Streaming Analysis Memory Benchmark
+Measures the tracemalloc peak of analyze_technology_demand loading every
+description at once versus streaming them in fixed-size chunks.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py --sizes 10000 100000 --chunk-size 1000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models
+from app.analyzer import analyze_technology_demand
+from benchmarks.bench_technology_matcher import build_corpus
+
+
+def build_database(path: str, size: int):
+    """Creates a SQLite database at `path` holding `size` synthetic offers."""
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    corpus = build_corpus(size)
+    with engine.begin() as conn:
+        for start in range(0, size, 10_000):
+            conn.execute(insert(models.JobOffer), [
+                {"title": "Developer", "description": description,
+                 "url": f"https://example.com/{start + i}", "source": "benchmark"}
+                for i, description in enumerate(corpus[start:start + 10_000])
+            ])
+    return engine
+
+
+def measure(session_factory, chunk_size):
+    """Returns (peak bytes, seconds, result) for one analysis run."""
+    db = session_factory()
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = analyze_technology_demand(db, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return peak, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming analysis memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'offers':>10} {'mode':>12} {'peak MiB':>10} {'seconds':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_database(os.path.join(tmp, "bench.db"), size)
+            session_factory = sessionmaker(bind=engine)
+
+            full_peak, full_time, full_result = measure(session_factory, None)
+            stream_peak, stream_time, stream_result = measure(session_factory, args.chunk_size)
+            engine.dispose()
+
+        print(f"{size:>10,} {'load all':>12} {full_peak / 2**20:>10.1f} {full_time:>9.2f}")
+        print(f"{size:>10,} {'streaming':>12} {stream_peak / 2**20:>10.1f} {stream_time:>9.2f}")
+        print(f"{'':>10} results identical: {full_result == stream_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Backfill Script for Job Market Analyzer
+Rebuilds the ingest-time derived data for offers that are already stored.
+
+Usage:
+    python scripts/backfill.py technologies [--batch-size 1000]
+    python scripts/backfill.py trends
+    python scripts/backfill.py daily
+    python scripts/backfill.py experience
+    python scripts/backfill.py salaries
+"""
+
+import argparse
+import os
+import sys
+import logging
+
+# Add the parent directory to the path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import ingest, models
+from app.database import SessionLocal, engine, upgrade_schema
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKFILLS = {
+    "technologies": ingest.backfill_offer_technologies,
+    "trends": ingest.rebuild_technology_trends,
+    "daily": ingest.rebuild_daily_offer_stats,
+    "experience": ingest.backfill_experience_levels,
+    "salaries": ingest.backfill_salaries,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill derived job offer data")
+    parser.add_argument("target", choices=sorted(BACKFILLS), help="What to rebuild")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Offers per batch")
+    args = parser.parse_args()
+
+    # Make sure the derived tables and columns exist before filling them
+    models.Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine, models.Base.metadata)
+
+    db = SessionLocal()
+    try:
+        processed = BACKFILLS[args.target](db, batch_size=args.batch_size)
+        logger.info(f"🎉 Backfill '{args.target}' complete: {processed} offers processed")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
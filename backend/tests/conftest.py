@@ -0,0 +1,40 @@
+import os
+
+# Keep the app from connecting to MySQL when test modules import it.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.cache import analysis_cache, search_count_cache, search_result_cache
+from app.models import Base
+
+
+@pytest.fixture
+def db():
+    """An in-memory SQLite session with all tables created."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clear_analysis_cache():
+    """Each test starts with empty in-process caches."""
+    analysis_cache.clear()
+    search_count_cache.clear()
+    search_result_cache.clear()
+    yield
+    analysis_cache.clear()
+    search_count_cache.clear()
+    search_result_cache.clear()
@@ -1,7 +1,16 @@
+import re
+from datetime import date, datetime, timedelta
 import pytest
+from sqlalchemy import text
 from unittest.mock import Mock, patch
-from app.analyzer import analyze_technology_demand
-from app.models import JobOffer
+from app import analyzer, ingest
+from app.analyzer import (
+    analyze_technology_demand, count_technologies, period_technology_demand, technology_cooccurrence,
+    technology_demand, technology_trends, rollup_top_values, rollup_totals,
+    classify_experience_level, parse_salary, salary_trends, TechnologyMatcher, TECHNOLOGIES
+)
+from app.config import settings
+from app.models import DailyOfferStat, JobOffer, OfferTechnology, TechnologyWeeklyCount
 
 class TestAnalyzer:
     """Test cases for the analyzer module."""
@@ -44,4 +53,396 @@ class TestAnalyzer:
         result = analyze_technology_demand(mock_db)
         python_count = next((item['count'] for item in result if item['technology'] == 'Python'), 0)
         
-        assert python_count == 1 
\ No newline at end of file
+        assert python_count == 1 
+
+    def test_parallel_count_matches_serial(self):
+        """Test that the process-pool path returns the serial counts."""
+        descriptions = ["Python y Django", "React con TypeScript", "Go, Docker y AWS", None] * 50
+
+        with patch.object(settings, 'PARALLEL_ANALYSIS_THRESHOLD', 10):
+            parallel = count_technologies(descriptions, workers=2)
+
+        assert parallel == count_technologies(descriptions, workers=1)
+
+    def test_process_pools_are_shut_down(self):
+        """Test that shutting the pools down stops their workers and later counts start new ones."""
+        descriptions = ["Python y Django"] * 20
+        with patch.object(settings, 'PARALLEL_ANALYSIS_THRESHOLD', 10):
+            count_technologies(descriptions, workers=2)
+            pool = analyzer._process_pools[2]
+            analyzer.shutdown_process_pools()
+
+            assert analyzer._process_pools == {}
+            assert count_technologies(descriptions, workers=2)['Python'] == 20
+        assert analyzer._process_pools[2] is not pool
+        analyzer.shutdown_process_pools()
+
+class TestTechnologyMatcher:
+    """Test cases for the single-pass technology matcher."""
+
+    def test_matches_tokens_with_punctuation(self):
+        """Test that C#, C++, ASP.NET and Node.js are recognised."""
+        matcher = TechnologyMatcher(['C#', 'C++', 'ASP.NET', 'Node.js'])
+
+        result = matcher.match("Stack: C#, C++ y ASP.NET; backend en Node.js.")
+
+        assert result == {'C#', 'C++', 'ASP.NET', 'Node.js'}
+
+    def test_respects_word_boundaries(self):
+        """Test that technologies are not matched inside other words."""
+        matcher = TechnologyMatcher(['Go', 'Java', 'JavaScript', 'SQL', 'MySQL'])
+
+        assert matcher.match("Google busca experto en JavaScript y MySQL") == {'JavaScript', 'MySQL'}
+        assert matcher.match("Go and Java, plus some SQL") == {'Go', 'Java', 'SQL'}
+
+    def test_count_is_per_description(self):
+        """Test that repeated mentions in one description count once."""
+        matcher = TechnologyMatcher(['Python', 'Docker'])
+
+        counts = matcher.count(["Python python PYTHON", "Docker and Python", None])
+
+        assert counts == {'Python': 2, 'Docker': 1}
+
+    def test_matches_legacy_per_technology_scan(self):
+        """Test that results agree with one regex scan per technology."""
+        descriptions = [
+            "Senior Python developer with Django and PostgreSQL",
+            "Frontend: React, TypeScript, Vue.js. Nice to have: Node.js",
+            "DevOps with AWS, Docker, Kubernetes, Terraform and Jenkins",
+            "Java Spring engineer; Git; Google Cloud / GCP",
+            "Golang is not Go; Reactive is not React",
+        ]
+        matcher = TechnologyMatcher(TECHNOLOGIES)
+
+        for description in descriptions:
+            legacy = {
+                tech for tech in TECHNOLOGIES
+                if re.search(r'\b' + re.escape(tech.lower()) + r'\b', description.lower())
+            }
+            assert matcher.match(description) == legacy
+
+
+class TestTechnologyDemand:
+    """Test cases for the offer_technologies based demand query."""
+
+    def _add_offer(self, db, url, description):
+        db.add(ingest.prepare_offer(JobOffer(
+            title="Developer", description=description, url=url, source="test"
+        )))
+
+    def test_ingest_tags_offers(self, db):
+        """Test that technologies are stored when an offer is prepared."""
+        self._add_offer(db, "u1", "Python and Docker")
+        db.commit()
+
+        stored = {row.technology for row in db.query(OfferTechnology).all()}
+        assert stored == {'Python', 'Docker'}
+
+    def test_matches_description_scan(self, db):
+        """Test that the GROUP BY agrees with scanning descriptions."""
+        self._add_offer(db, "u1", "Python and Docker")
+        self._add_offer(db, "u2", "Python, React and TypeScript")
+        self._add_offer(db, "u3", "Sales position")
+        db.commit()
+
+        result = technology_demand(db)
+
+        assert [(r['technology'], r['count']) for r in result] == [
+            (r['technology'], r['count']) for r in analyze_technology_demand(db)
+        ]
+        assert result[0] == {'technology': 'Python', 'count': 2, 'percentage': 66.7}
+
+    def test_period_demand_ignores_older_offers(self, db):
+        """Test that the period-scoped count only sees offers scraped since the start."""
+        self._add_offer(db, "u1", "Python and Docker")
+        self._add_offer(db, "u2", "Python")
+        db.add(ingest.prepare_offer(JobOffer(
+            title="Developer", description="Java", url="u3", source="test",
+            scraped_at=datetime.now() - timedelta(days=60)
+        )))
+        db.commit()
+
+        result = period_technology_demand(db, datetime.now() - timedelta(days=30))
+
+        assert result == [
+            {'technology': 'Python', 'count': 2, 'percentage': 100.0},
+            {'technology': 'Docker', 'count': 1, 'percentage': 50.0},
+        ]
+
+    def test_backfill_rebuilds_table(self, db):
+        """Test that the backfill tags offers inserted without technologies."""
+        db.add(JobOffer(title="Dev", description="Java and AWS", url="u1", source="test"))
+        db.commit()
+
+        processed = ingest.backfill_offer_technologies(db, batch_size=1)
+
+        assert processed == 1
+        assert {r.technology for r in db.query(OfferTechnology)} == {'Java', 'AWS'}
+
+    def test_untagged_offers_are_scanned(self, db):
+        """Test that demand is counted from the descriptions, on worker processes, until offers are tagged."""
+        for i, description in enumerate(["Java and AWS", "Java", "React"] * 5):
+            db.add(JobOffer(title="Dev", description=description, url=f"u{i}", source="test"))
+        db.commit()
+
+        with patch.object(settings, 'ANALYZER_WORKERS', 2), patch.object(settings, 'PARALLEL_ANALYSIS_THRESHOLD', 10):
+            scanned = technology_demand(db)
+        analyzer.shutdown_process_pools()
+        ingest.backfill_offer_technologies(db)
+
+        assert scanned == technology_demand(db)
+        assert scanned[0] == {'technology': 'Java', 'count': 10, 'percentage': 66.7}
+
+    def test_backfill_commits_once(self, db, monkeypatch):
+        """Test that stale tags are replaced in one transaction, not batch by batch."""
+        for i in range(3):
+            db.add(JobOffer(title="Dev", description="Java", url=f"u{i}", source="test"))
+        db.flush()
+        db.add(OfferTechnology(offer_id=1, technology="Cobol"))
+        db.commit()
+        commits = []
+        commit = db.commit
+        monkeypatch.setattr(db, "commit", lambda: commits.append(1) or commit())
+
+        assert ingest.backfill_offer_technologies(db, batch_size=1) == 3
+
+        assert len(commits) == 1
+        assert [(r['technology'], r['count']) for r in technology_demand(db)] == [('Java', 3)]
+
+    def test_streaming_matches_full_scan(self, db):
+        """Test that chunked streaming adds up to the same counts."""
+        for i, description in enumerate(["Python", "Python y Go", "React", "Go", None]):
+            db.add(JobOffer(title="Dev", description=description, url=f"u{i}", source="test"))
+        db.commit()
+
+        assert analyze_technology_demand(db, chunk_size=2) == analyze_technology_demand(db)
+
+
+class TestDailyOfferStats:
+    """Test cases for the daily company/location rollup."""
+
+    def _ingest(self, db, offers):
+        prepared = [
+            ingest.prepare_offer(JobOffer(
+                title="Dev", company=company, location=location, url=f"u{i}", source="test",
+                scraped_at=datetime(2026, 3, day, 12),
+            ))
+            for i, (company, location, day) in enumerate(offers)
+        ]
+        db.add_all(prepared)
+        ingest.record_offers(db, prepared)
+        db.commit()
+        return prepared
+
+    def _rollup(self, db):
+        return {
+            (row.day, row.company, row.location, row.source): row.offer_count
+            for row in db.query(DailyOfferStat).all()
+        }
+
+    def test_ranges_sum_the_rollup(self, db):
+        """Test that date ranges only count the offers scraped on those days."""
+        self._ingest(db, [("Acme", "Cali", 1), ("Acme", "Cali", 1), ("Initech", None, 2), ("Globex", "Cali", 5)])
+
+        assert rollup_top_values(db, "company") == [("Acme", 2), ("Globex", 1), ("Initech", 1)]
+        assert rollup_top_values(db, "company", date(2026, 3, 2), date(2026, 3, 5)) == [("Globex", 1), ("Initech", 1)]
+        assert rollup_top_values(db, "location", end=date(2026, 3, 2)) == [("Cali", 2)]
+        assert rollup_totals(db, date(2026, 3, 1), date(2026, 3, 2)) == (3, 2, 1)
+        assert rollup_totals(db, date(2026, 4, 1)) == (0, 0, 0)
+
+    def test_increments_are_applied_in_the_database(self, db):
+        """Test that increments made by another writer since a row was read are not overwritten."""
+        self._ingest(db, [("Acme", "Cali", 1)])
+        key = (date(2026, 3, 1), "Acme", "Cali", "test")
+        row = db.get(DailyOfferStat, key)
+        assert row.offer_count == 1
+        # Another ingest commits in between, behind this session's back
+        table = DailyOfferStat.__table__
+        db.execute(table.update().values(offer_count=table.c.offer_count + 1))
+
+        self._ingest(db, [("Acme", "Cali", 1), ("Initech", "Cali", 1)])
+
+        assert self._rollup(db) == {key: 3, (date(2026, 3, 1), "Initech", "Cali", "test"): 1}
+
+    def test_forget_and_rebuild(self, db):
+        """Test that deletions are subtracted and that a rebuild gives the incremental rollup."""
+        offers = self._ingest(db, [("Acme", "Cali", 1), ("Acme", "Cali", 1), ("Initech", None, 2)])
+        ingest.forget_offers(db, offers[1:])
+        for offer in offers[1:]:
+            db.delete(offer)
+        db.commit()
+        incremental = self._rollup(db)
+
+        ingest.rebuild_daily_offer_stats(db, batch_size=2)
+
+        assert incremental == self._rollup(db) == {(date(2026, 3, 1), "Acme", "Cali", "test"): 1}
+
+class TestTechnologyTrends:
+    """Test cases for the weekly technology rollup."""
+
+    def _ingest(self, db, offers):
+        prepared = []
+        for i, (description, weeks_ago) in enumerate(offers):
+            offer = ingest.prepare_offer(JobOffer(
+                title="Dev", description=description, url=f"u{i}", source="test",
+                scraped_at=datetime.utcnow() - timedelta(weeks=weeks_ago),
+            ))
+            db.add(offer)
+            prepared.append(offer)
+        ingest.record_offers(db, prepared)
+        db.commit()
+        return prepared
+
+    def test_weekly_series_and_growth(self, db):
+        """Test that ingest updates the rollup served by technology_trends."""
+        self._ingest(db, [("React", 3), ("React", 0), ("React y Python", 0), ("Python", 1)])
+
+        trends = technology_trends(db, weeks=4)
+        react = next(t for t in trends["technologies"] if t["technology"] == "React")
+
+        assert [point["offers"] for point in react["series"]] == [1, 0, 0, 2]
+        assert react["growth_rate"] == 100.0
+        assert react["series"][-1]["week"] == trends["weeks"][-1]
+
+    def test_rebuild_matches_incremental(self, db):
+        """Test that rebuilding from scratch gives the incremental rollup."""
+        self._ingest(db, [("Java", 2), ("Java y AWS", 2), ("AWS", 0)])
+        incremental = {
+            (row.technology, row.week_start): row.offer_count
+            for row in db.query(TechnologyWeeklyCount).all()
+        }
+
+        ingest.rebuild_technology_trends(db, batch_size=2)
+
+        assert incremental == {
+            (row.technology, row.week_start): row.offer_count
+            for row in db.query(TechnologyWeeklyCount).all()
+        }
+
+    def test_forget_keeps_the_weekly_history(self, db):
+        """Test that deleting offers leaves the weeks they were ingested in."""
+        offers = self._ingest(db, [("Java", 2), ("Java y AWS", 2), ("AWS", 0)])
+        before = {(row.technology, row.week_start): row.offer_count for row in db.query(TechnologyWeeklyCount).all()}
+        ingest.forget_offers(db, offers[:2])
+        for offer in offers[:2]:
+            db.delete(offer)
+        db.commit()
+
+        assert {(row.technology, row.week_start): row.offer_count for row in db.query(TechnologyWeeklyCount).all()} == before
+
+
+class TestTechnologyCooccurrence:
+    """Test cases for the sparse co-occurrence analysis."""
+
+    def test_pairs_counts_and_lift(self, db):
+        """Test co-occurrence counts and lift against hand-computed values."""
+        for i, description in enumerate([
+            "React y TypeScript", "React y TypeScript", "React", "Python y Django", "Sales",
+        ]):
+            db.add(ingest.prepare_offer(JobOffer(title="Dev", description=description, url=f"u{i}", source="test")))
+        db.commit()
+
+        result = technology_cooccurrence(db, limit=10)
+
+        assert result["total_offers"] == 5
+        assert result["pairs"][0] == {
+            "technologies": ["TypeScript", "React"],
+            "count": 2,
+            "support": 0.4,
+            "lift": round(2 * 5 / (3 * 2), 2),
+        }
+        assert {tuple(p["technologies"]) for p in result["pairs"]} == {("TypeScript", "React"), ("Python", "Django")}
+
+    def test_filter_by_technology(self, db):
+        """Test that only pairs involving the requested technology are returned."""
+        for i, description in enumerate(["React y TypeScript", "Python y Django"]):
+            db.add(ingest.prepare_offer(JobOffer(title="Dev", description=description, url=f"u{i}", source="test")))
+        db.commit()
+
+        pairs = technology_cooccurrence(db, technology="Django")["pairs"]
+
+        assert [p["technologies"] for p in pairs] == [["Python", "Django"]]
+
+    def test_large_counts_do_not_overflow(self, db):
+        """Test that lift stays exact when count * total_offers exceeds 32 bits."""
+        db.execute(text(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000) "
+            "INSERT INTO job_offers (id, title, source) SELECT i, 'Dev', 'test' FROM n"
+        ))
+        for tech in ("Python", "Docker"):
+            db.execute(text(
+                "INSERT INTO offer_technologies (offer_id, technology) SELECT id, :tech FROM job_offers WHERE id <= 60000"
+            ), {"tech": tech})
+        db.commit()
+
+        pair = technology_cooccurrence(db)["pairs"][0]
+
+        assert pair["count"] == 60000
+        assert pair["lift"] == round(60000 * 100000 / (60000 * 60000), 2)
+
+
+class TestExperienceLevel:
+    """Test cases for the shared experience level classifier."""
+
+    def test_classification(self):
+        """Test that senior keywords win over junior ones."""
+        assert classify_experience_level("Senior Python Developer") == "senior"
+        assert classify_experience_level("Tech Lead (antes Junior)") == "senior"
+        assert classify_experience_level("Desarrollador Jr") == "junior"
+        assert classify_experience_level("Desarrollador Backend") == "mid"
+        assert classify_experience_level(None) == "mid"
+
+    def test_ingest_and_backfill(self, db):
+        """Test that offers are classified at ingest and by the backfill."""
+        db.add(ingest.prepare_offer(JobOffer(title="Senior Dev", description="", url="u1", source="test")))
+        db.add(JobOffer(title="Junior Dev", description="", url="u2", source="test"))
+        db.commit()
+
+        assert {o.url: o.experience_level for o in db.query(JobOffer)} == {"u1": "senior", "u2": None}
+
+        ingest.backfill_experience_levels(db, batch_size=1)
+        db.expire_all()
+
+        assert {o.url: o.experience_level for o in db.query(JobOffer)} == {"u1": "senior", "u2": "junior"}
+
+
+class TestSalary:
+    """Test cases for salary parsing and salary trends."""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("$ 2.500.000,00 (Mensual)", (2500000, 2500000)),
+        ("$ 1.160.000,00 a $ 1.500.000,00", (1160000, 1500000)),
+        ("3 a 4 millones", (3000000, 4000000)),
+        ("Entre 4,5 y 6 millones", (4500000, 6000000)),
+        ("COP 60.000.000 anual", (5000000, 5000000)),
+        ("COP 60.000.000 anuales", (5000000, 5000000)),
+        ("$48.000.000/año", (4000000, 4000000)),
+        ("$ 36.000.000 / ano", (3000000, 3000000)),
+        ("48 millones al año", (4000000, 4000000)),
+        ("$ 60.000.000 por año", (5000000, 5000000)),
+        ("$ 3'000.000", (3000000, 3000000)),
+        ("$ 2'500.000,00 a $ 3'000.000,00", (2500000, 3000000)),
+        ("$4M", (4000000, 4000000)),
+        ("A convenir", None),
+        ("3 años de experiencia", None),
+    ])
+    def test_parse_salary(self, text, expected):
+        """Test the supported salary formats."""
+        assert parse_salary(text) == expected
+
+    def test_salary_trends(self, db):
+        """Test averages by technology and level from ingested offers."""
+        for i, (title, description) in enumerate([
+            ("Senior Python Dev", "Python. Salario: 8 millones"),
+            ("Senior Python Dev", "Python. Salario: 10 a 12 millones"),
+            ("Junior Python Dev", "Python. Salario: $ 3.000.000"),
+            ("Java Dev", "Java, salario a convenir"),
+        ]):
+            db.add(ingest.prepare_offer(JobOffer(title=title, description=description, url=f"u{i}", source="test")))
+        db.commit()
+
+        result = salary_trends(db)
+
+        assert result["sample_size"] == 3
+        assert result["average_salaries"] == {"Python": {"senior": 9500000, "junior": 3000000}}
+        assert result["trends"][-1]["avg_salary"] == round((8e6 + 11e6 + 3e6) / 3)
@@ -0,0 +1,90 @@
+import threading
+import time
+from app.cache import VersionedCache, bump_data_version
+
+class TestVersionedCache:
+    """Test cases for the versioned analysis cache."""
+
+    def test_hits_and_misses(self):
+        """Test that a second lookup is served from the cache."""
+        cache = VersionedCache(ttl_seconds=60, max_entries=10)
+        calls = []
+
+        for _ in range(3):
+            value = cache.get_or_compute("key", lambda: calls.append(1) or 42)
+
+        assert value == 42
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 1
+
+    def test_data_version_bump_invalidates(self):
+        """Test that committing new data makes old entries unreachable."""
+        cache = VersionedCache(ttl_seconds=60, max_entries=10)
+        cache.get_or_compute("key", lambda: "old")
+
+        bump_data_version()
+
+        assert cache.get_or_compute("key", lambda: "new") == "new"
+
+    def test_ttl_expiry(self):
+        """Test that entries are recomputed after the TTL."""
+        cache = VersionedCache(ttl_seconds=0.01, max_entries=10)
+        cache.get_or_compute("key", lambda: "old")
+        time.sleep(0.02)
+
+        assert cache.get_or_compute("key", lambda: "new") == "new"
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = VersionedCache(ttl_seconds=60, max_entries=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("c", lambda: 3)
+
+        assert cache.get_or_compute("a", lambda: "recomputed") == 1
+        assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+        assert cache.stats()["evictions"] >= 1
+
+    def test_byte_budget_eviction(self):
+        """Test that entries are evicted to keep their total size under max_bytes."""
+        cache = VersionedCache(ttl_seconds=60, max_entries=10, max_bytes=10, sizeof=len)
+        cache.get_or_compute("a", lambda: "aaaa")
+        cache.get_or_compute("b", lambda: "bbbb")
+        cache.get_or_compute("c", lambda: "cccc")
+        cache.get_or_compute("huge", lambda: "x" * 11)
+
+        assert cache.stats()["bytes"] == 8
+        assert cache.get_or_compute("a", lambda: "recomputed") == "recomputed"
+        assert cache.get_or_compute("huge", lambda: "recomputed") == "recomputed"
+
+    def test_single_flight(self):
+        """Test that concurrent misses compute the value only once."""
+        cache = VersionedCache(ttl_seconds=60, max_entries=10)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("key", slow)))
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == [1]
+        assert results == ["value"] * 5
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+from app import conditional, main
+from app.database import get_db
+from app.models import JobOffer
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """A test client whose endpoints use the test database session."""
+    monkeypatch.setattr(main.dashboard, "_snapshot", None)
+    monkeypatch.setattr(conditional, "session_factory", sessionmaker(bind=db.get_bind()))
+    # A fixed cache period, so responses do not expire between requests
+    monkeypatch.setattr(conditional, "_current_cache_period", lambda: datetime(2026, 3, 1, tzinfo=timezone.utc))
+    main.app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+class TestConditionalResponses:
+    """Test cases for ETag / Last-Modified handling."""
+
+    def test_not_modified_skips_the_endpoint(self, client, db, monkeypatch):
+        """Test that a matching If-None-Match gets an empty 304 without running queries."""
+        db.add(JobOffer(title="Dev", company="Acme", url="u1", source="test"))
+        db.commit()
+        first = client.get("/analytics/tech-cooccurrence/")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        calls = []
+        monkeypatch.setattr(db, "query", lambda *args: calls.append(args))
+        second = client.get("/analytics/tech-cooccurrence/", headers={"If-None-Match": etag})
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+        assert calls == []
+
+    def test_etag_changes_with_data_and_query(self, client, db):
+        """Test that new data or other query parameters get a new ETag."""
+        etag = client.get("/analytics/salary-trends/").headers["etag"]
+
+        assert client.get("/analytics/salary-trends/", params={"months": 3}).headers["etag"] != etag
+        # Committed without bumping this process's data version, as another worker would
+        db.add(JobOffer(title="Dev", company="Acme", url="u1", source="test"))
+        db.commit()
+        response = client.get("/analytics/salary-trends/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_etag_expires_with_the_cache_period(self, client, monkeypatch):
+        """Test that unchanged data still gets a new ETag once the cache TTL period ends."""
+        monkeypatch.setattr(conditional, "_current_cache_period", lambda: datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc))
+        etag = client.get("/dashboard/stats/").headers["etag"]
+        assert client.get("/dashboard/stats/", headers={"If-None-Match": etag}).status_code == 304
+
+        monkeypatch.setattr(conditional, "_current_cache_period", lambda: datetime(2026, 3, 1, 12, 5, tzinfo=timezone.utc))
+
+        assert client.get("/dashboard/stats/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_if_modified_since(self, client):
+        """Test that Last-Modified can be used as a validator too."""
+        last_modified = client.get("/analytics/salary-trends/").headers["last-modified"]
+
+        response = client.get("/analytics/salary-trends/", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+
+    def test_other_paths_are_untouched(self, client):
+        """Test that search results carry no validators."""
+        assert "etag" not in client.get("/offers/search/").headers
+
+    def test_clock_windows_expire_with_the_day(self, client, monkeypatch):
+        """Test that a moving time window gets a new ETag when the day changes."""
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        monkeypatch.setitem(conditional.TIME_BUCKETS, "/analytics/market-insights/", lambda: today)
+        etag = client.get("/analytics/market-insights/").headers["etag"]
+        assert client.get("/analytics/market-insights/", headers={"If-None-Match": etag}).status_code == 304
+
+        tomorrow = today + timedelta(days=1)
+        monkeypatch.setitem(conditional.TIME_BUCKETS, "/analytics/market-insights/", lambda: tomorrow)
+        response = client.get("/analytics/market-insights/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["last-modified"] == format_datetime(tomorrow, usegmt=True)
+
+    def test_relative_times_are_never_cached(self, client):
+        """Test that responses rendered relative to now carry no validators."""
+        assert "etag" not in client.get("/dashboard/recent-activity/").headers
+        assert "etag" not in client.get("/dashboard/bundle/", params={"widgets": "recent_activity"}).headers
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from app import analyzer, dashboard, ingest, main
+from app.models import JobOffer
+
+@contextmanager
+def count_statements(db):
+    """Counts the SQL statements executed on the session's engine."""
+    statements = []
+    engine = db.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+class TestDashboardStats:
+    """Test cases for the dashboard statistics endpoint."""
+
+    def _add_offer(self, db, i, scraped_at, company="Acme", description="Python"):
+        db.add(ingest.prepare_offer(JobOffer(
+            title="Dev", company=company, description=description, url=f"u{i}", source="test", scraped_at=scraped_at
+        )))
+
+    def test_statement_count(self, db):
+        """Test that the endpoint issues a summary and a monthly query, nothing else."""
+        now = datetime.now()
+        for i in range(12):
+            self._add_offer(db, i, now - timedelta(days=20 * i), company=f"Company {i % 3}")
+        db.commit()
+
+        with count_statements(db) as statements:
+            stats = dashboard.compute_stats(db)
+
+        assert len(statements) == 2
+        assert stats["total_offers"] == 12
+        assert stats["unique_companies"] == 3
+        assert stats["recent_offers"] == 1
+        assert stats["unique_technologies"] == 1
+
+    def test_monthly_counts_use_calendar_months(self, db):
+        """Test that offers fall in their calendar month, including month edges."""
+        for i, scraped_at in enumerate([
+            datetime(2026, 1, 31, 23, 59), datetime(2026, 2, 1), datetime(2026, 3, 31, 12), datetime(2025, 9, 30),
+        ]):
+            self._add_offer(db, i, scraped_at)
+        db.commit()
+
+        trend = analyzer.monthly_offer_counts(db, months=6, today=date(2026, 3, 15))
+
+        assert trend == [
+            {"month": "Oct", "offers": 0},
+            {"month": "Nov", "offers": 0},
+            {"month": "Dec", "offers": 0},
+            {"month": "Jan", "offers": 1},
+            {"month": "Feb", "offers": 1},
+            {"month": "Mar", "offers": 1},
+        ]
+
+class TestDashboardSnapshot:
+    """Test cases for the background-refreshed dashboard snapshot."""
+
+    def test_endpoints_serve_the_snapshot(self, db, monkeypatch):
+        """Test that once a snapshot exists the endpoints run no SQL."""
+        monkeypatch.setattr(dashboard, "_snapshot", None)
+        db.add(ingest.prepare_offer(JobOffer(
+            title="Dev", company="Acme", description="Python", url="u1", source="test",
+            scraped_at=datetime.now() - timedelta(hours=2)
+        )))
+        db.commit()
+        snapshot = dashboard.refresh_snapshot(sessionmaker(bind=db.get_bind()))
+
+        db.add(JobOffer(title="Later", company="Initech", url="u2", source="test", scraped_at=datetime.now()))
+        db.commit()
+        with count_statements(db) as statements:
+            stats = main.get_dashboard_stats(db=db)
+            activity = main.get_recent_activity(response=main.Response(), db=db)
+            technologies = main.get_technology_stats(response=main.Response(), db=db)
+
+        assert statements == []
+        assert stats["total_offers"] == 1
+        assert stats["last_updated"] == snapshot.last_updated.isoformat()
+        assert activity == [{"company": "Acme", "position": "Dev", "time": "2h ago", "url": "u1"}]
+        assert [tech["technology"] for tech in technologies] == ["Python"]
+
+    def test_failed_refresh_keeps_previous_snapshot(self, db, monkeypatch):
+        """Test that an error while refreshing does not drop the served snapshot."""
+        monkeypatch.setattr(dashboard, "_snapshot", None)
+        previous = dashboard.refresh_snapshot(sessionmaker(bind=db.get_bind()))
+
+        def broken_session():
+            session = sessionmaker(bind=db.get_bind())()
+            session.query = None  # every query raises TypeError
+            return session
+
+        assert dashboard.refresh_snapshot(broken_session) is previous
+
+class TestDashboardBundle:
+    """Test cases for the combined dashboard endpoint."""
+
+    def test_bundle_returns_every_widget(self, db, monkeypatch):
+        """Test that all widgets are computed, each with its own session."""
+        # The test database has a single connection, so run widgets one at a time
+        monkeypatch.setattr(dashboard, "_widget_pool", ThreadPoolExecutor(max_workers=1))
+        monkeypatch.setattr(dashboard, "_snapshot", None)
+        sessions = []
+        factory = sessionmaker(bind=db.get_bind())
+        monkeypatch.setattr(main, "SessionLocal", lambda: sessions.append(1) or factory())
+        offer = ingest.prepare_offer(JobOffer(
+            title="Senior Python Developer", company="Acme", location="Bogotá", description="Python",
+            url="u1", source="test", scraped_at=datetime.now()
+        ))
+        db.add(offer)
+        ingest.record_offers(db, [offer])
+        db.commit()
+
+        bundle = main.get_dashboard_bundle(widgets=None, db=db)
+
+        assert bundle["errors"] == {}
+        assert set(bundle["widgets"]) == set(main.DASHBOARD_WIDGETS)
+        assert len(sessions) == len(main.DASHBOARD_WIDGETS)
+        assert bundle["widgets"]["company_stats"] == [{"company": "Acme", "offer_count": 1}]
+        assert bundle["widgets"]["experience"]["senior"]["count"] == 1
+
+    def test_failing_widget_is_reported(self, monkeypatch):
+        """Test that one failing widget does not fail the others."""
+        monkeypatch.setattr(dashboard, "_widget_pool", ThreadPoolExecutor(max_workers=2))
+
+        results, errors = dashboard.compute_widgets(
+            {"ok": lambda db: 1, "broken": lambda db: 1 / 0}, session_factory=lambda: Mock()
+        )
+
+        assert results == {"ok": 1}
+        assert errors == {"broken": "Error computing widget"}
+
+class TestMarketReport:
+    """Test cases for the market summary report."""
+
+    def test_report_is_scoped_to_the_period(self, db):
+        """Test that totals, distinct counts and technologies only cover the period."""
+        now = datetime.now()
+        offers = []
+        for i, (company, location, description, days_ago) in enumerate([
+            ("Acme", "Cali", "Python", 1),
+            ("Acme", "Bogotá", "Python y React", 2),
+            ("Initech", None, "React", 3),
+            ("Globex", "Medellín", "Java", 40),
+        ]):
+            offers.append(ingest.prepare_offer(JobOffer(
+                title="Dev", company=company, location=location, description=description,
+                url=f"u{i}", source="test", scraped_at=now - timedelta(days=days_ago)
+            )))
+        db.add_all(offers)
+        ingest.record_offers(db, offers)
+        db.commit()
+
+        with count_statements(db) as statements:
+            report = main.generate_market_report(period="30d", date_from=None, date_to=None, db=db)
+
+        summary = report["summary"]
+        assert len(statements) == 4
+        assert (summary["total_offers"], summary["unique_companies"], summary["unique_locations"]) == (3, 2, 2)
+        assert [(tech["technology"], tech["count"]) for tech in summary["top_technologies"]] == [
+            ("Python", 2), ("React", 2)
+        ]
+        assert summary["top_companies"][0] == {"company": "Acme", "offer_count": 2}
@@ -0,0 +1,26 @@
+from sqlalchemy import create_engine, inspect, text
+from app.database import upgrade_schema
+from app.models import Base
+
+class TestUpgradeSchema:
+    """Test cases for upgrading databases created by older versions."""
+
+    def test_adds_missing_columns_and_indexes(self, tmp_path):
+        """Test that new model columns are added to an existing table."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE job_offers (id INTEGER PRIMARY KEY, title VARCHAR(500) NOT NULL, "
+                "company VARCHAR(255), location VARCHAR(255), description TEXT, url VARCHAR(1000), "
+                "source VARCHAR(100), scraped_at DATETIME)"
+            ))
+            conn.execute(text("INSERT INTO job_offers (title, url) VALUES ('Senior Dev', 'u1')"))
+
+        Base.metadata.create_all(bind=engine)
+        upgrade_schema(engine, Base.metadata)
+        upgrade_schema(engine, Base.metadata)  # idempotent
+
+        inspector = inspect(engine)
+        assert "experience_level" in {c["name"] for c in inspector.get_columns("job_offers")}
+        assert "ix_job_offers_experience_level" in {i["name"] for i in inspector.get_indexes("job_offers")}
+        engine.dispose()
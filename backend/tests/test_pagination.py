@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import Response
+from app import main, pagination
+from app.cache import bump_data_version
+from app.models import JobOffer
+
+def _page_through(db, sort_by, sort_order, limit):
+    pages, cursor = [], None
+    while True:
+        offers, cursor = pagination.keyset_page(db.query(JobOffer), sort_by, sort_order, limit, cursor)
+        pages.extend(offer.id for offer in offers)
+        if cursor is None:
+            return pages
+
+class TestKeysetPagination:
+    """Test cases for cursor pagination."""
+
+    @pytest.fixture
+    def offers(self, db):
+        base = datetime(2026, 1, 1)
+        rows = [
+            ("Dev", "Acme", "Bogotá", 3), ("Dev", None, "Cali", 1), ("Ops", "Acme", None, 3),
+            ("Analyst", "Globex", "Bogotá", 2), ("Dev", None, None, 0), ("QA", "Initech", "Cali", 2),
+        ]
+        for i, (title, company, location, days) in enumerate(rows):
+            db.add(JobOffer(
+                title=title, company=company, location=location, description="",
+                url=f"u{i}", source="test", scraped_at=base + timedelta(days=days)
+            ))
+        db.commit()
+
+    @pytest.mark.parametrize("sort_by", ["scraped_at", "title", "company", "location", "id"])
+    @pytest.mark.parametrize("sort_order", ["asc", "desc"])
+    def test_pages_match_offset_order(self, db, offers, sort_by, sort_order):
+        """Test that walking cursors visits every row in ORDER BY order, NULLs included."""
+        expected = [
+            offer.id for offer in pagination.order_by_keyset(db.query(JobOffer), sort_by, sort_order)
+        ]
+
+        assert _page_through(db, sort_by, sort_order, limit=2) == expected
+
+    def test_sorted_offers_honour_skip(self, db, offers):
+        """Test that /offers/ skips rows on the first sorted page and continues from its cursor."""
+        expected = [offer.id for offer in pagination.order_by_keyset(db.query(JobOffer), "title", "asc")]
+        response = Response()
+
+        first = main.get_all_offers(response, skip=2, limit=2, sort_by="title", sort_order="asc", db=db)
+        cursor = response.headers["X-Next-Cursor"]
+        second = main.get_all_offers(Response(), skip=2, limit=2, sort_by="title", sort_order="asc", cursor=cursor, db=db)
+
+        assert [offer.id for offer in first + second] == expected[2:6]
+
+    def test_default_listing_is_ordered_by_id(self, db, offers):
+        """Test that /offers/ without a sort pages by id and always offers a cursor."""
+        response = Response()
+        first = main.get_all_offers(response, skip=1, limit=3, db=db)
+        second = main.get_all_offers(Response(), limit=3, cursor=response.headers["X-Next-Cursor"], db=db)
+
+        assert [offer.id for offer in first + second] == [2, 3, 4, 5, 6]
+
+    def test_cursor_must_match_sort(self, db, offers):
+        """Test that a cursor issued for one sort is rejected for another."""
+        _, cursor = pagination.keyset_page(db.query(JobOffer), "title", "asc", 2)
+
+        with pytest.raises(pagination.InvalidCursor):
+            pagination.keyset_page(db.query(JobOffer), "company", "asc", 2, cursor)
+        with pytest.raises(pagination.InvalidCursor):
+            pagination.keyset_page(db.query(JobOffer), "title", "asc", 2, "not-a-cursor")
+
+class TestCountStrategies:
+    """Test cases for search result count strategies."""
+
+    def test_exact_and_estimated(self, db, monkeypatch):
+        """Test that estimated counts stop at the cap and flag a lower bound."""
+        for i in range(5):
+            db.add(JobOffer(title="Dev", description="", url=f"u{i}", source="test"))
+        db.commit()
+        query = db.query(JobOffer).filter(JobOffer.title == "Dev")
+
+        assert pagination.count_results(query, "exact", None) == (5, False)
+
+        monkeypatch.setattr(pagination.settings, "SEARCH_COUNT_CAP", 3)
+        assert pagination.count_results(query, "estimated", None) == (3, True)
+
+        monkeypatch.setattr(pagination.settings, "SEARCH_COUNT_CAP", 10)
+        assert pagination.count_results(query, "estimated", None) == (5, False)
+
+    def test_cached_count_reused_per_filter_set(self, db):
+        """Test that cached counts are reused until the data version changes."""
+        db.add(JobOffer(title="Dev", description="", url="u1", source="test"))
+        db.commit()
+        query = db.query(JobOffer)
+        assert pagination.count_results(query, "cached", ("dev",)) == (1, False)
+
+        db.add(JobOffer(title="Dev", description="", url="u2", source="test"))
+        db.commit()
+        assert pagination.count_results(query, "cached", ("dev",)) == (1, False)
+
+        bump_data_version()
+        assert pagination.count_results(query, "cached", ("dev",)) == (2, False)
@@ -0,0 +1,189 @@
+import asyncio
+import httpx
+import pytest
+from app import scraper
+from app.config import settings
+from app.models import JobOffer
+
+def listing(*titles):
+    """A results page with one offer card per title."""
+    cards = "".join(
+        f'<article class="box_offer"><a class="js-o-link" href="/oferta-{title}">{title}</a>'
+        f'<a class="it-blank">Acme</a><span class="list-location">Bogotá</span>'
+        f'<p class="parrafo">Buscamos {title} con Python</p></article>'
+        for title in titles
+    )
+    return f"<html><body>{cards}</body></html>"
+
+class FakeClock:
+    """A monotonic clock that only advances when a coroutine sleeps on it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+class TestRateLimiting:
+    """Test cases for the per-host token buckets."""
+
+    def test_burst_then_interval(self):
+        """Test that a bucket allows a burst, then one request per interval."""
+        clock = FakeClock()
+
+        async def run():
+            bucket = scraper.TokenBucket(interval=0.05, burst=2, clock=clock, sleep=clock.sleep)
+            times = []
+            for _ in range(4):
+                await bucket.acquire()
+                times.append(clock())
+            return times
+
+        assert asyncio.run(run()) == pytest.approx([0, 0, 0.05, 0.1])
+        assert clock.sleeps == pytest.approx([0.05, 0.05])
+
+    def test_hosts_are_limited_separately(self):
+        """Test that a busy host does not delay requests to another one."""
+        clock = FakeClock()
+
+        async def run():
+            limiter = scraper.HostRateLimiter(interval=1, burst=1, clock=clock, sleep=clock.sleep)
+            await limiter.acquire("https://a.example/1")
+            await limiter.acquire("https://b.example/1")
+            await limiter.acquire("https://a.example/2")
+
+        asyncio.run(run())
+        assert clock.sleeps == [1]
+
+def fetch_with(handler, urls, interval=0, clock=None):
+    """Runs fetch_pages against a mock transport, waiting on a fake clock."""
+    clock = clock or FakeClock()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            limiter = scraper.HostRateLimiter(interval, clock=clock, sleep=clock.sleep)
+            return await scraper.fetch_pages(urls, client, limiter)
+    return asyncio.run(run())
+
+class TestFetchPages:
+    """Test cases for the concurrent page downloads."""
+
+    def test_concurrency_limit_and_order(self, monkeypatch):
+        """Test that requests overlap up to the limit and results keep the URL order."""
+        monkeypatch.setattr(settings, "SCRAPER_CONCURRENCY", 3)
+        in_flight, peak = 0, 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Let the other downloads run before this one finishes
+            for _ in range(5):
+                await asyncio.sleep(0)
+            in_flight -= 1
+            return httpx.Response(200, text=f"page {request.url.params['p']}")
+
+        contents = fetch_with(handler, [f"https://example.com/?p={page}" for page in range(1, 7)])
+
+        assert contents == [f"page {page}".encode() for page in range(1, 7)]
+        assert peak == 3
+
+    def test_transient_errors_are_retried(self, monkeypatch):
+        """Test that 5xx and connection errors are retried up to RETRY_ATTEMPTS times."""
+        monkeypatch.setattr(settings, "RETRY_ATTEMPTS", 2)
+        monkeypatch.setattr(settings, "RETRY_BACKOFF_BASE", 1)
+        monkeypatch.setattr(settings, "RETRY_BACKOFF_MAX", 60)
+        clock = FakeClock()
+        calls = {}
+
+        def handler(request):
+            page = request.url.params["p"]
+            calls[page] = calls.get(page, 0) + 1
+            if page == "1" and calls[page] == 1:
+                raise httpx.ConnectError("connection reset")
+            if page == "2" and calls[page] < 3:
+                return httpx.Response(503)
+            if page == "3":
+                return httpx.Response(502)
+            if page == "4":
+                return httpx.Response(404)
+            return httpx.Response(200, text="ok")
+
+        contents = fetch_with(handler, [f"https://example.com/?p={page}" for page in range(1, 5)], clock=clock)
+
+        assert contents == [b"ok", b"ok", None, None]
+        assert calls == {"1": 2, "2": 3, "3": 3, "4": 1}
+        # One jittered backoff per retry: pages 2 and 3 wait after attempts 1 and 2
+        assert len(clock.sleeps) == 5 and all(0 <= delay <= 2 for delay in clock.sleeps)
+
+    def test_retry_after_pauses_the_host(self, monkeypatch):
+        """Test that a 429 waits for Retry-After and holds the host's other requests."""
+        monkeypatch.setattr(settings, "RETRY_AFTER_MAX", 1)
+        clock = FakeClock()
+        requests = []
+
+        def handler(request):
+            requests.append((request.url.params["p"], clock()))
+            if len(requests) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.2"})
+            if request.url.params["p"] == "3":
+                return httpx.Response(429, headers={"Retry-After": "120"})
+            return httpx.Response(200, text="ok")
+
+        contents = fetch_with(handler, [f"https://example.com/?p={page}" for page in range(1, 4)], interval=0.05, clock=clock)
+
+        assert contents == [b"ok", b"ok", None]
+        assert [page for page, _ in requests].count("1") == 2
+        assert all(moment >= 0.2 for _, moment in requests[1:])
+        assert 0.2 in clock.sleeps and 120 not in clock.sleeps
+
+    def test_retry_after_dates_and_backoff(self, monkeypatch):
+        """Test the Retry-After formats and the bounds of the jittered backoff."""
+        assert scraper.retry_after(httpx.Response(429, headers={"Retry-After": "3"})) == 3
+        assert scraper.retry_after(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+        assert scraper.retry_after(httpx.Response(429)) is None
+
+        monkeypatch.setattr(settings, "RETRY_BACKOFF_BASE", 1)
+        monkeypatch.setattr(settings, "RETRY_BACKOFF_MAX", 5)
+        assert all(0 <= scraper.backoff_delay(2) <= 2 for _ in range(100))
+        assert all(0 <= scraper.backoff_delay(10) <= 5 for _ in range(100))
+
+class TestScrapeJobOffers:
+    """Test cases for parsing and saving scraped pages."""
+
+    def test_pages_are_saved_in_order(self, db, monkeypatch):
+        """Test that offers are saved once and scraping stops at the first empty page."""
+        monkeypatch.setattr(scraper, "BASE_URL", "https://example.com/ofertas/")
+        pages = {"1": listing("Backend", "Frontend"), "2": listing("Backend", "Data"), "3": listing(), "4": listing("Late")}
+        handler = lambda request: httpx.Response(200, text=pages[request.url.params["p"]])
+        monkeypatch.setattr(scraper, "download_pages", lambda urls: fetch_with(handler, urls))
+
+        result = scraper.scrape_job_offers(db, pages=4)
+
+        assert result["new_offers"] == 3
+        assert [offer.title for offer in db.query(JobOffer).order_by(JobOffer.id)] == ["Backend", "Frontend", "Data"]
+
+    def test_shared_engine_reuses_the_client(self, monkeypatch):
+        """Test that consecutive downloads share one pooled client on the engine loop."""
+        monkeypatch.setattr(settings, "DELAY_BETWEEN_REQUESTS", 0)
+        clients = []
+
+        async def fake_fetch(urls, client, limiter):
+            clients.append(client)
+            return [b"ok" for _ in urls]
+
+        monkeypatch.setattr(scraper, "fetch_pages", fake_fetch)
+        try:
+            assert scraper.download_pages(["https://example.com/?p=1"]) == [b"ok"]
+            assert scraper.download_pages(["https://example.com/?p=2"]) == [b"ok"]
+        finally:
+            scraper.close_engine()
+
+        assert clients[0] is clients[1]
+        assert clients[0].is_closed
@@ -0,0 +1,277 @@
+from app import facets, ingest, search, search_index, trigram
+from app.config import settings
+from app.models import JobOffer
+
+class TestSQLiteFullTextSearch:
+    """Test cases for the FTS5 search backend."""
+
+    def _add_offers(self, db, offers):
+        for i, (title, description) in enumerate(offers):
+            db.add(ingest.prepare_offer(JobOffer(
+                title=title, description=description, company="Acme", url=f"u{i}", source="test"
+            )))
+        db.commit()
+
+    def test_prefix_terms_and_relevance(self, db):
+        """Test that all terms are required and relevance ranks matches."""
+        search.setup_fulltext(db.get_bind())
+        self._add_offers(db, [
+            ("Backend", "Python y Django"),
+            ("Data", "Python python python pandas"),
+            ("Frontend", "React"),
+        ])
+
+        query, relevance = search.SQLiteFullTextSearch().filter(db.query(JobOffer), "pyth")
+        ranked = [offer.title for offer in query.order_by(relevance.desc())]
+        assert ranked == ["Data", "Backend"]
+
+        query, _ = search.SQLiteFullTextSearch().filter(db.query(JobOffer), "python django")
+        assert [offer.title for offer in query] == ["Backend"]
+
+    def test_index_follows_updates_and_deletes(self, db):
+        """Test that the triggers keep the FTS table in sync."""
+        search.setup_fulltext(db.get_bind())
+        self._add_offers(db, [("Backend", "Python"), ("Frontend", "React")])
+
+        db.query(JobOffer).filter(JobOffer.title == "Backend").one().description = "Golang"
+        db.delete(db.query(JobOffer).filter(JobOffer.title == "Frontend").one())
+        db.commit()
+
+        backend = search.SQLiteFullTextSearch()
+        assert backend.filter(db.query(JobOffer), "python")[0].count() == 0
+        assert backend.filter(db.query(JobOffer), "react")[0].count() == 0
+        assert backend.filter(db.query(JobOffer), "golang")[0].count() == 1
+
+    def test_existing_rows_are_indexed_on_setup(self, db):
+        """Test that creating the FTS table indexes rows already stored."""
+        self._add_offers(db, [("Backend", "Kotlin")])
+
+        search.setup_fulltext(db.get_bind())
+
+        assert search.SQLiteFullTextSearch().filter(db.query(JobOffer), "kotlin")[0].count() == 1
+
+class TestInvertedIndex:
+    """Test cases for the in-memory BM25 index."""
+
+    def _index(self, offers):
+        index = search_index.InvertedIndex()
+        for offer_id, (title, description) in enumerate(offers, start=1):
+            index.add(offer_id, title, "Acme", description)
+        return index
+
+    def test_prefix_terms_and_bm25_ranking(self):
+        """Test that all terms are required and more frequent terms rank higher."""
+        index = self._index([
+            ("Backend", "Python y Django"),
+            ("Data", "Python python python pandas"),
+            ("Frontend", "React"),
+        ])
+
+        assert [offer_id for offer_id, _ in index.search("pyth")] == [2, 1]
+        assert [offer_id for offer_id, _ in index.search("python django")] == [1]
+        assert [offer_id for offer_id, _ in index.search("Pythón", limit=1)] == [2]
+        assert index.search("golang") == []
+
+    def test_title_matches_outrank_description_matches(self):
+        """Test that a term in the title weighs more than in the description."""
+        index = self._index([("Backend", "Desarrollador Kotlin"), ("Kotlin", "Desarrollador backend")])
+
+        assert [offer_id for offer_id, _ in index.search("kotlin")] == [2, 1]
+
+    def test_removed_and_reindexed_offers(self):
+        """Test that deletions are skipped and re-adding an offer replaces it."""
+        index = self._index([("Backend", "Python"), ("Data", "Python")])
+
+        index.remove([1])
+        index.add(2, "Data", "Acme", "Scala")
+
+        assert index.search("python") == []
+        assert [offer_id for offer_id, _ in index.search("scala")] == [2]
+        assert len(index) == 1
+
+    def test_updates_during_a_build_are_kept(self, db, monkeypatch):
+        """Test that offers committed while the build scans the table survive the swap."""
+        db.add(ingest.prepare_offer(JobOffer(title="Python", description="Backend", url="u1", source="test")))
+        db.commit()
+        index = search_index.InvertedIndex()
+        scan = search_index.iter_offer_chunks
+
+        def scan_then_ingest(*args, **kwargs):
+            yield from scan(*args, **kwargs)
+            # Committed after the scan read the table
+            assert index.accepts_updates
+            index.add(2, "Python", "Acme", "Django")
+            index.remove([1])
+
+        monkeypatch.setattr(search_index, "iter_offer_chunks", scan_then_ingest)
+        index.build(db)
+
+        assert [offer_id for offer_id, _ in index.search("python")] == [2]
+        assert not index._pending
+
+    def test_relevance_page_applies_sql_filters(self, db, monkeypatch):
+        """Test that ranked pages only contain offers passing the other filters."""
+        for i, (title, company) in enumerate([("Python", "Acme"), ("Python Python", "Initech"), ("Python", "Initech")]):
+            db.add(ingest.prepare_offer(JobOffer(
+                title=title, description="Backend", company=company, url=f"u{i}", source="test"
+            )))
+        db.commit()
+        index = search_index.InvertedIndex()
+        index.build(db)
+        monkeypatch.setattr(search_index, "offer_index", index)
+
+        query = db.query(JobOffer).filter(JobOffer.company == "Initech")
+        offers, has_next = search_index.relevance_page(query, "python", skip=0, limit=1, filtered=True)
+
+        assert [offer.title for offer in offers] == ["Python Python"]
+        assert has_next
+
+    def test_relevance_page_caps_the_ranked_candidates(self, db, monkeypatch):
+        """Test that selective filters beyond the candidate cap fall back to SQL ordering."""
+        for i, (title, company) in enumerate([("Python Python", "Initech"), ("Python Python", "Initech"), ("Python", "Acme")]):
+            db.add(ingest.prepare_offer(JobOffer(
+                title=title, description="Backend", company=company, url=f"u{i}", source="test"
+            )))
+        db.commit()
+        index = search_index.InvertedIndex()
+        index.build(db)
+        monkeypatch.setattr(search_index, "offer_index", index)
+        query = db.query(JobOffer).filter(JobOffer.company == "Acme")
+
+        monkeypatch.setattr(settings, "SEARCH_RELEVANCE_CANDIDATE_FACTOR", 1)
+        assert search_index.relevance_page(query, "python", skip=0, limit=1, filtered=True) is None
+
+        monkeypatch.setattr(settings, "SEARCH_RELEVANCE_CANDIDATE_FACTOR", 2)
+        offers, has_next = search_index.relevance_page(query, "python", skip=0, limit=1, filtered=True)
+        assert [offer.company for offer in offers] == ["Acme"]
+        assert not has_next
+
+class TestFacetCounts:
+    """Test cases for one-pass facet counting."""
+
+    def _add_offers(self, db):
+        for i, (company, location, description) in enumerate([
+            ("Acme", "Bogotá", "Python y Django"),
+            ("Acme", "Medellín", "Python"),
+            ("Initech", "Bogotá", "React"),
+            ("Initech", None, "Python y React"),
+        ]):
+            db.add(ingest.prepare_offer(JobOffer(
+                title="Dev", company=company, location=location, description=description, url=f"u{i}", source="test"
+            )))
+        db.commit()
+
+    def _index(self, db):
+        index = facets.FacetIndex()
+        index.build(db)
+        return index
+
+    def test_unfiltered_counts(self, db):
+        """Test that every offer is counted and missing values are skipped."""
+        self._add_offers(db)
+
+        result = self._index(db).counts(facets.FACETS, {}, limit=10)
+
+        assert result["company"] == [{"value": "Acme", "count": 2}, {"value": "Initech", "count": 2}]
+        assert result["location"] == [{"value": "Bogotá", "count": 2}, {"value": "Medellín", "count": 1}]
+        assert result["technology"] == [
+            {"value": "Python", "count": 3}, {"value": "React", "count": 2}, {"value": "Django", "count": 1}
+        ]
+
+    def test_counts_follow_filters_and_limit(self, db, monkeypatch):
+        """Test that only the matching offers are counted."""
+        self._add_offers(db)
+        text_index = search_index.InvertedIndex()
+        text_index.build(db)
+        monkeypatch.setattr(facets, "offer_index", text_index)
+        index = self._index(db)
+
+        assert index.counts(["company", "technology"], {"location": ["Bogotá"]}, limit=1) == {
+            "company": [{"value": "Acme", "count": 1}],
+            "technology": [{"value": "Django", "count": 1}],
+        }
+        assert index.counts(["company"], {"q": "react", "technology": "python"}, limit=10) == {
+            "company": [{"value": "Initech", "count": 1}],
+        }
+
+    def test_incremental_updates(self, db):
+        """Test that committed and deleted offers are reflected without a rebuild."""
+        self._add_offers(db)
+        index = self._index(db)
+
+        offer = ingest.prepare_offer(JobOffer(
+            title="Dev", company="Globex", location="Cali", description="Python", url="u9", source="test"
+        ))
+        db.add(offer)
+        snapshots = ingest.record_offers(db, [offer])
+        db.commit()
+        index.add(snapshots)
+        index.remove([1, 2])
+
+        assert index.counts(["company"], {"technology": "Python"}, limit=10) == {
+            "company": [{"value": "Globex", "count": 1}, {"value": "Initech", "count": 1}],
+        }
+
+    def test_updates_during_a_build_are_kept(self, db, monkeypatch):
+        """Test that offers committed while the build scans the table survive the swap."""
+        self._add_offers(db)
+        index = facets.FacetIndex()
+        offer = ingest.prepare_offer(JobOffer(
+            title="Dev", company="Globex", location="Cali", description="Python", url="u9", source="test"
+        ))
+        scan = facets.iter_offer_chunks
+
+        def scan_then_ingest(*args, **kwargs):
+            yield from scan(*args, **kwargs)
+            # Committed after the scan read the table
+            db.add(offer)
+            snapshots = ingest.record_offers(db, [offer])
+            db.commit()
+            assert index.accepts_updates
+            index.add(snapshots)
+            index.remove([1])
+
+        monkeypatch.setattr(facets, "iter_offer_chunks", scan_then_ingest)
+        index.build(db)
+
+        assert index.counts(["company"], {"technology": "Python"}, limit=10) == {
+            "company": [{"value": "Acme", "count": 1}, {"value": "Globex", "count": 1}, {"value": "Initech", "count": 1}],
+        }
+
+    def test_grouped_fallback_matches_index(self, db):
+        """Test that the GROUP BY fallback returns the same counts."""
+        self._add_offers(db)
+        query = db.query(JobOffer).filter(JobOffer.company == "Initech")
+
+        expected = self._index(db).counts(facets.FACETS, {"company": ["Initech"]}, limit=10)
+
+        assert facets.facet_counts(db, query, facets.FACETS, {"company": ["Initech"]}) == expected
+
+class TestTrigramIndex:
+    """Test cases for fuzzy company and location filters."""
+
+    LOCATIONS = ["Bogotá, D.C.", "Bogotá", "Medellín, Antioquia", "Cali", "Barranquilla"]
+
+    def test_accent_insensitive_substrings(self):
+        """Test that substrings match regardless of accents, case and punctuation."""
+        index = trigram.TrigramIndex(self.LOCATIONS)
+
+        assert index.resolve("bogota") == ["Bogotá, D.C.", "Bogotá"]
+        assert index.resolve("D.C") == ["Bogotá, D.C."]
+        assert index.resolve("al") == ["Cali"]
+
+    def test_typos(self):
+        """Test that misspelled filters still resolve to the closest values."""
+        index = trigram.TrigramIndex(self.LOCATIONS)
+
+        assert index.resolve("medelin") == ["Medellín, Antioquia"]
+        assert index.resolve("barranqilla") == ["Barranquilla"]
+        assert index.resolve("pereira") == []
+
+    def test_resolve_filter_reads_distinct_values(self, db):
+        """Test that the index is built from the stored values of the column."""
+        for i, company in enumerate(["Globant", "Globant", "Initech", None]):
+            db.add(JobOffer(title="Dev", company=company, url=f"u{i}", source="test"))
+        db.commit()
+
+        assert trigram.resolve_filter(db, "company", "globan") == ["Globant"]
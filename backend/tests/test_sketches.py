@@ -0,0 +1,178 @@
+import random
+from sqlalchemy.orm import sessionmaker
+from app import dashboard, ingest, main, sketches
+from app.models import JobOffer
+
+class TestHyperLogLog:
+    """Test cases for the distinct count sketch."""
+
+    def test_small_cardinalities_are_near_exact(self):
+        """Test that linear counting handles small sets and duplicates."""
+        hll = sketches.HyperLogLog()
+        for i in range(500):
+            hll.add(f"Company {i % 50}")
+        assert hll.count() == 50
+
+    def test_error_within_bound(self):
+        """Test that a large cardinality is within 3 standard errors."""
+        hll = sketches.HyperLogLog()
+        for i in range(200_000):
+            hll.add(f"value-{i}")
+        assert abs(hll.count() - 200_000) / 200_000 < 3 * 0.0081
+
+    def test_merge_is_a_union(self):
+        """Test that merging counts the union of both streams."""
+        left, right, union = sketches.HyperLogLog(), sketches.HyperLogLog(), sketches.HyperLogLog()
+        for i in range(300):
+            left.add(str(i))
+            right.add(str(i + 200))
+        for i in range(500):
+            union.add(str(i))
+        left.merge(right)
+        assert left.registers == union.registers
+        assert abs(left.count() - 500) <= 5
+
+class TestSpaceSaving:
+    """Test cases for the heavy hitters sketch."""
+
+    def test_exact_within_capacity(self):
+        """Test that counts are exact while every value has a counter."""
+        sketch = sketches.SpaceSaving(capacity=10)
+        for value in "aaabbc":
+            sketch.add(value)
+        assert sketch.top(2) == [("a", 3, 0), ("b", 2, 0)]
+
+    def test_heavy_hitters_survive_eviction(self):
+        """Test that frequent values are kept and overestimated by at most N / capacity."""
+        rng = random.Random(3)
+        stream = ["heavy-1"] * 3000 + ["heavy-2"] * 2000 + [f"rare-{rng.randrange(5000)}" for _ in range(15000)]
+        rng.shuffle(stream)
+        sketch = sketches.SpaceSaving(capacity=100)
+        for value in stream:
+            sketch.add(value)
+
+        (first, first_count, _), (second, second_count, _) = sketch.top(2)
+        assert (first, second) == ("heavy-1", "heavy-2")
+        assert 3000 <= first_count <= 3000 + len(stream) / 100
+        assert 2000 <= second_count <= 2000 + len(stream) / 100
+
+class TestOfferSketches:
+    """Test cases for the persisted company/location sketches."""
+
+    def _add_offers(self, db, companies):
+        offers = [
+            ingest.prepare_offer(JobOffer(title="Dev", company=company, location="Bogotá", url="u", source="test"))
+            for company in companies
+        ]
+        db.add_all(offers)
+        snapshots = ingest.record_offers(db, offers)
+        db.commit()
+        return snapshots
+
+    def test_build_and_ingest(self, db):
+        """Test that committed offers update a built sketch."""
+        self._add_offers(db, ["Acme", "Acme", "Initech", None])
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        offer_sketches.build(db)
+
+        offer_sketches.add(self._add_offers(db, ["Globex", "Acme"]))
+
+        assert offer_sketches.unique_companies() == 3
+        assert offer_sketches.unique_locations() == 1
+        assert offer_sketches.top("company", 2) == [("Acme", 3), ("Globex", 1)]
+
+    def test_offers_committed_during_a_build_are_kept(self, db, monkeypatch):
+        """Test that offers committed while a stale sketch rebuilds are counted once."""
+        self._add_offers(db, ["Acme", "Initech"])
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        scan = sketches.iter_offer_chunks
+
+        def scan_then_ingest(*args, **kwargs):
+            yield from scan(*args, **kwargs)
+            offer_sketches.add(self._add_offers(db, ["Globex"]))
+
+        monkeypatch.setattr(sketches, "iter_offer_chunks", scan_then_ingest)
+        offer_sketches.build(db)
+        offer_sketches.add(self._add_offers(db, ["Acme"]))
+
+        assert offer_sketches.offers == 4
+        assert offer_sketches.top("company", 3) == [("Acme", 2), ("Globex", 1), ("Initech", 1)]
+
+    def test_top_skips_the_empty_value(self, db):
+        """Test that offers without a location do not rank as an empty location."""
+        self._add_offers(db, ["Acme"])
+        db.add_all([ingest.prepare_offer(JobOffer(title="Dev", company="Acme", location="", url="u", source="test")) for _ in range(3)])
+        db.commit()
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        offer_sketches.build(db)
+
+        assert offer_sketches.top("location", 2) == [("Bogotá", 1)]
+
+    def test_load_replays_offers_added_after_save(self, db):
+        """Test that a saved state is restored and caught up with newer offers."""
+        self._add_offers(db, ["Acme", "Initech"])
+        saved = sketches.OfferSketches(capacity=10)
+        saved.build(db)
+        saved.save(db)
+        self._add_offers(db, ["Acme", "Globex"])
+
+        restored = sketches.OfferSketches(capacity=10)
+        assert restored.load(db)
+        assert restored.offers == 4
+        assert restored.unique_companies() == 3
+        assert restored.top("company", 1) == [("Acme", 2)]
+
+    def test_deletions_invalidate_the_saved_state(self, db):
+        """Test that a state saved before offers were deleted is not loaded."""
+        self._add_offers(db, ["Acme", "Initech"])
+        saved = sketches.OfferSketches(capacity=10)
+        saved.build(db)
+        saved.save(db)
+        db.delete(db.query(JobOffer).filter(JobOffer.company == "Initech").one())
+        db.commit()
+
+        assert not sketches.OfferSketches(capacity=10).load(db)
+
+    def test_out_of_order_commits_are_counted_once(self, db):
+        """Test that an offer committed after a newer one is still counted, and only once."""
+        older, newer = self._add_offers(db, ["Acme", "Initech"])
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        offer_sketches.build(db)
+        late = self._add_offers(db, ["Globex", "Globex"])
+
+        offer_sketches.add(late[1:])
+        offer_sketches.add(late[:1])
+        offer_sketches.add([older, newer] + late)
+
+        assert offer_sketches.offers == 4
+        assert offer_sketches.top("company", 1) == [("Globex", 2)]
+
+    def test_sync_catches_up_with_other_processes(self, db, monkeypatch):
+        """Test that the periodic sync counts offers committed without add(), e.g. by another worker."""
+        self._add_offers(db, ["Acme"])
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        monkeypatch.setattr(sketches, "offer_sketches", offer_sketches)
+        sync = lambda: sketches.sync_sketches(sessionmaker(bind=db.get_bind()))
+        sync()
+        self._add_offers(db, ["Initech", "Acme"])
+
+        sync()
+        sync()
+
+        assert offer_sketches.offers == 3
+        assert offer_sketches.top("company", 2) == [("Acme", 2), ("Initech", 1)]
+
+    def test_estimates_are_labelled(self, db, monkeypatch):
+        """Test that the dashboard flags sketch estimates while company stats stay exact."""
+        self._add_offers(db, ["Acme", "Acme", "Initech"])
+        offer_sketches = sketches.OfferSketches(capacity=10)
+        monkeypatch.setattr(sketches, "offer_sketches", offer_sketches)
+        monkeypatch.setattr(dashboard, "offer_sketches", offer_sketches)
+        sketches.sync_sketches(sessionmaker(bind=db.get_bind()))
+
+        assert offer_sketches.ready
+        assert main.get_company_stats(date_from=None, date_to=None, db=db) == [
+            {"company": "Acme", "offer_count": 2}, {"company": "Initech", "offer_count": 1}
+        ]
+        stats = dashboard.compute_stats(db)
+        assert (stats["unique_companies"], stats["approximate"]) == (2, True)
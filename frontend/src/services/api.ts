@@ -19,6 +19,8 @@ export interface TechnologyStat {
 export interface DashboardStats {
   total_offers: number;
   unique_companies: number;
+  // unique_companies is a sketch estimate
+  approximate: boolean;
   recent_offers: number;
   unique_technologies: number;
   monthly_trend: Array<{